@@ -0,0 +1,190 @@
+# Library/batch_runner.py
+"""
+Non-interactive execution of OpenNCL commands.
+
+Used for `OpenNCL.py -c "cmd"`, `OpenNCL.py script.ncl` and `OpenNCL.py -`
+(read commands from stdin line by line). No banner or prompt is printed;
+every command produces exactly one JSON object on its own line:
+
+    {"line": 3, "command": "date", "ok": true, "output": "...", "error": null, "elapsed_ms": 0.4}
+
+A command fails ("ok": false) when it raises, including a usage error, or
+when its handler returns a nonzero status, as handlers do after printing an
+error they have caught. Output printed by the command is captured per command
+(ANSI colours stripped).
+Programs started by a command (dir, git, python, ...) are not captured. While
+a batch runs, file descriptor 1 is pointed at stderr, so their output goes to
+stderr and the result stream on stdout stays one JSON object per line.
+
+With jobs > 1 lines run on a thread pool; results are still written in input
+order. Commands that would need interactive input (x++, mode pro, linux) fail
+with an error instead of reading from the command stream.
+"""
+import io
+import json
+import os
+import re
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+
+class UnknownCommand(Exception):
+    pass
+
+
+class _NoInput(io.TextIOBase):
+    """stdin replacement: commands asking for input get EOF immediately."""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        return ""
+
+    def readline(self, size=-1):
+        return ""
+
+
+class _ThreadLocalStdout(io.TextIOBase):
+    """Routes writes to the calling thread's capture buffer, or to the real stream."""
+
+    def __init__(self, real):
+        self.real = real
+        self.local = threading.local()
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        if buffer is None:
+            return self.real.write(text)
+        return buffer.write(text)
+
+    def flush(self):
+        if getattr(self.local, "buffer", None) is None:
+            self.real.flush()
+
+
+def iter_commands(lines):
+    """Yield (line number, command) for non-empty, non-comment lines until `exit`."""
+    for number, raw in enumerate(lines, start=1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.lower() == "exit":
+            return
+        yield number, line
+
+
+class BatchRunner:
+
+    def __init__(self, dispatch, jobs=1, out=None):
+        """
+        dispatch(line) runs one command. It fails by raising UnknownCommand / any
+        exception, or by returning a nonzero int status.
+        """
+        self.dispatch = dispatch
+        self.jobs = max(1, int(jobs))
+        self.out = out or sys.stdout
+        self.failures = 0
+
+    def run_one(self, number, line, capture):
+        capture.local.buffer = io.StringIO()
+        start = perf_counter()
+        error = None
+        try:
+            status = self.dispatch(line)
+            if isinstance(status, int) and status:
+                error = f"failed with status {status}"
+        except EOFError:
+            error = "command needs interactive input"
+        except UnknownCommand:
+            error = f"Unknown command {line}"
+        except SystemExit as e:
+            error = f"exited with status {e.code}" if e.code else None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            output = capture.local.buffer.getvalue()
+            capture.local.buffer = None
+        return {
+            "line": number,
+            "command": line,
+            "ok": error is None,
+            "output": ANSI_ESCAPE.sub("", output),
+            "error": error,
+            "elapsed_ms": round((perf_counter() - start) * 1000, 3),
+        }
+
+    def emit(self, result):
+        if not result["ok"]:
+            self.failures += 1
+        self.out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.out.flush()
+
+    def _redirect_fd1(self):
+        """
+        Point fd 1 at stderr for child processes. Returns the saved copy of fd 1,
+        or None when it cannot be duplicated; if results were going to fd 1,
+        self.out is switched to a stream on the saved copy.
+        """
+        try:
+            sys.stdout.flush()
+            self.out.flush()
+            saved = os.dup(1)
+        except (AttributeError, OSError, ValueError):
+            return None
+        try:
+            to_fd1 = self.out.fileno() == 1
+        except (AttributeError, OSError, ValueError):
+            to_fd1 = False
+        if to_fd1:
+            self.out = open(saved, "w", encoding=self.out.encoding, closefd=False)
+        os.dup2(2, 1)
+        return saved
+
+    def _restore_fd1(self, saved, out):
+        if saved is None:
+            return
+        if self.out is not out:
+            self.out.close()        # flushes; the fd itself is closed below
+        os.dup2(saved, 1)
+        os.close(saved)
+
+    def run(self, lines):
+        """Run every command from `lines` (any iterable, consumed lazily). Returns the failure count."""
+        out = self.out
+        saved_fd = self._redirect_fd1()
+        capture = _ThreadLocalStdout(sys.stdout)
+        saved_stdout, saved_stdin = sys.stdout, sys.stdin
+        sys.stdout, sys.stdin = capture, _NoInput()
+        try:
+            commands = iter_commands(lines)
+            if self.jobs == 1:
+                for number, line in commands:
+                    self.emit(self.run_one(number, line, capture))
+            else:
+                self._run_parallel(commands, capture)
+        finally:
+            sys.stdout, sys.stdin = saved_stdout, saved_stdin
+            self._restore_fd1(saved_fd, out)
+            self.out = out
+        return self.failures
+
+    def _run_parallel(self, commands, capture):
+        # bounded window so a long stdin stream is never read ahead unboundedly
+        window = deque()
+        limit = self.jobs * 4
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            for number, line in commands:
+                window.append(pool.submit(self.run_one, number, line, capture))
+                while len(window) >= limit or (window and window[0].done()):
+                    self.emit(window.popleft().result())
+            while window:
+                self.emit(window.popleft().result())
@@ -0,0 +1,221 @@
+# Library/command_registry.py
+"""
+Table-driven command dispatch for the OpenNCL shell.
+
+Commands are registered against a verb (`date`, `encrypt`, `mode pro`, ...) and
+looked up with a dict, so dispatch cost does not grow with the number of
+commands. Verbs are case-insensitive; arguments keep their original case.
+Commands that are recognised by a leading prefix rather than a verb
+(`{search:google}:`, `{open:`) live in a small character trie.
+
+Each command declares how its arguments are parsed and which lazily imported
+modules it needs; those are loaded right before the handler runs.
+
+Plugins are plain .py files in a plugins folder exposing `register(registry)`.
+"""
+import importlib.util
+import os
+import shlex
+
+from Library import lazy_import
+
+EXIT = object()     # returned by a handler to leave the shell loop
+
+
+class UsageError(Exception):
+    """Raised by argument parsers when a command line is malformed."""
+
+
+def usage_message(command, error):
+    """What to print for a UsageError: its message, if any, then the command's usage."""
+    lines = [f"{command.name}: {error}"] if str(error) else []
+    if command.usage:
+        lines.append(command.usage)
+    return "\n".join(lines) or f"{command.name}: invalid arguments"
+
+
+# ---------------- argument parsers ----------------
+def parse_none(rest):
+    if rest:
+        raise UsageError("this command takes no arguments")
+    return ()
+
+
+def parse_text(rest):
+    return (rest,)
+
+
+def parse_words(rest):
+    return (rest.split(),)
+
+
+def parse_argv(rest):
+    """Shell-style words for argparse-like commands: quotes group words with spaces."""
+    lexer = shlex.shlex(rest, posix=True)
+    lexer.whitespace_split = True
+    if os.name == "nt":
+        lexer.escape = ""       # keep backslashes in Windows paths
+    try:
+        return (list(lexer),)
+    except ValueError as e:
+        raise UsageError(e) from None
+
+
+def parse_call(rest):
+    """`color(red, blue)` style: the text between the parentheses, split on commas."""
+    rest = rest.strip()
+    if not (rest.startswith("(") and rest.endswith(")")):
+        raise UsageError("expected (arg, ...)")
+    return tuple(part.strip() for part in rest[1:-1].split(","))
+
+
+ARG_PARSERS = {
+    None: parse_none,
+    "text": parse_text,
+    "words": parse_words,
+    "argv": parse_argv,
+    "call": parse_call,
+}
+
+
+class Command:
+    __slots__ = ("name", "handler", "parse", "deps", "usage")
+
+    def __init__(self, name, handler, args=None, deps=(), usage=None):
+        self.name = name
+        self.handler = handler
+        self.parse = ARG_PARSERS[args] if args in ARG_PARSERS else args
+        self.deps = tuple(deps)
+        self.usage = usage
+
+    def __call__(self, rest):
+        args = self.parse(rest)
+        if self.deps:
+            lazy_import.preload(*self.deps)
+        return self.handler(*args)
+
+
+# ---------------- prefix trie ----------------
+class PrefixTrie:
+    """Maps string prefixes to values; lookup returns the longest registered prefix of a string."""
+
+    _END = "\0"
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, prefix, value):
+        node = self.root
+        for ch in prefix:
+            node = node.setdefault(ch, {})
+        node[self._END] = value
+
+    def longest_match(self, text):
+        node = self.root
+        found = None
+        for i, ch in enumerate(text):
+            node = node.get(ch)
+            if node is None:
+                break
+            if self._END in node:
+                found = (i + 1, node[self._END])
+        return found
+
+
+# ---------------- registry ----------------
+class CommandRegistry:
+
+    def __init__(self):
+        self.commands = {}
+        self.prefixes = PrefixTrie()
+        self.prefix_starts = set()
+
+    def register(self, names, handler, args=None, deps=(), usage=None):
+        if isinstance(names, str):
+            names = (names,)
+        for name in names:
+            self.commands[name.lower()] = Command(name, handler, args, deps, usage)
+        return handler
+
+    def command(self, *names, args=None, deps=(), usage=None):
+        """Decorator form of register()."""
+        def decorator(handler):
+            return self.register(names, handler, args, deps, usage)
+        return decorator
+
+    def register_prefix(self, prefix, handler, deps=(), usage=None):
+        """`handler(rest)` receives the text after the prefix with its original case."""
+        prefix = prefix.lower()
+        self.prefixes.insert(prefix, Command(prefix, handler, "text", deps, usage))
+        self.prefix_starts.add(prefix[0])
+        return handler
+
+    def prefix(self, prefix, deps=(), usage=None):
+        def decorator(handler):
+            return self.register_prefix(prefix, handler, deps, usage)
+        return decorator
+
+    def resolve(self, line):
+        """
+        Return (command, argument_text) for an input line, or (None, line).
+        Lookup order: prefix trie (only when the first char can start a prefix),
+        whole line (multi-word verbs such as `mode pro`), then the first word.
+        """
+        line = line.strip()
+        if not line:
+            return None, ""
+        lowered = line.lower()
+        if lowered[0] in self.prefix_starts:
+            match = self.prefixes.longest_match(lowered)
+            if match:
+                end, command = match
+                return command, line[end:]
+        command = self.commands.get(lowered)
+        if command is not None:
+            return command, ""
+        cut = len(line)
+        for sep in (" ", "\t", "("):
+            pos = lowered.find(sep)
+            if 0 < pos < cut:
+                cut = pos
+        command = self.commands.get(lowered[:cut])
+        if command is None:
+            return None, line
+        rest = line[cut:] if lowered[cut:cut + 1] == "(" else line[cut:].strip()
+        return command, rest
+
+    def dispatch(self, line, on_unknown=None):
+        command, rest = self.resolve(line)
+        if command is None:
+            if on_unknown is not None:
+                return on_unknown(rest)
+            return None
+        try:
+            return command(rest)
+        except UsageError as e:
+            print(usage_message(command, e))
+        except ImportError as e:
+            print(f"{command.name}: required module is not available ({e})")
+
+    def names(self):
+        return sorted(self.commands)
+
+
+def load_plugins(registry, directory):
+    """Import every plugins/*.py and call its register(registry). Returns the loaded names."""
+    loaded = []
+    if not os.path.isdir(directory):
+        return loaded
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".py") or filename.startswith("_"):
+            continue
+        name = filename[:-3]
+        try:
+            spec = importlib.util.spec_from_file_location(f"openncl_plugin_{name}", os.path.join(directory, filename))
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            module.register(registry)
+            loaded.append(name)
+        except Exception as e:
+            print(f"Plugin {name} failed to load: {e}")
+    return loaded
@@ -1,28 +1,122 @@
 # dependency_checker.py
-import importlib
+"""
+Startup dependency check.
+
+Packages are located with importlib.util.find_spec (nothing gets imported or
+executed) and the result is cached in Date/dependency_cache.json. The cache is
+keyed on a fingerprint of the interpreter path, sys.path and the mtimes of the
+sys.path directories, so a warm start only costs a few stat() calls and one
+small JSON read. Installing or removing a package touches site-packages, which
+changes the fingerprint and triggers a fresh check.
+"""
+import hashlib
+import importlib.util
+import json
+import os
 import sys
 import subprocess
 
-def check_and_install(packages):
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Date")
+CACHE_PATH = os.path.join(CACHE_DIR, "dependency_cache.json")
+
+# import name -> distribution name (used for version lookup and pip install)
+REQUIRED_PACKAGES = {
+    "colorama": "colorama",
+    "PIL": "Pillow",
+    "cryptography": "cryptography",
+    "googletrans": "googletrans",
+    "requests": "requests",
+    "qrcode": "qrcode",
+}
+
+
+def environment_fingerprint():
+    h = hashlib.sha1()
+    h.update(sys.executable.encode())
+    h.update(sys.version.encode())
+    for entry in sys.path:
+        h.update(entry.encode(errors="surrogateescape"))
+        # only package directories: the script folder changes far too often to be useful
+        if os.path.basename(entry.rstrip("/\\")) not in ("site-packages", "dist-packages"):
+            continue
+        try:
+            h.update(str(os.stat(entry).st_mtime_ns).encode())
+        except OSError:
+            h.update(b"-")
+    h.update(repr(sorted(REQUIRED_PACKAGES.items())).encode())
+    return h.hexdigest()
+
+
+def load_cache():
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cache(fingerprint, missing, versions):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = CACHE_PATH + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint, "missing": missing, "versions": versions}, f, indent=2)
+        os.replace(tmp, CACHE_PATH)
+    except OSError:
+        pass
+
+
+def find_missing(packages):
+    """Return the import names in `packages` that cannot be located (without importing them)."""
     missing = []
     for pkg in packages:
         try:
-            importlib.import_module(pkg)
-        except ImportError:
+            if importlib.util.find_spec(pkg) is None:
+                missing.append(pkg)
+        except (ImportError, ValueError):
             missing.append(pkg)
+    return missing
+
+
+def installed_versions(packages):
+    from importlib import metadata
+    versions = {}
+    for pkg, dist in packages.items():
+        try:
+            versions[pkg] = metadata.version(dist)
+        except metadata.PackageNotFoundError:
+            versions[pkg] = None
+    return versions
+
+
+def check_and_install(packages):
+    """
+    packages: dict of import name -> distribution name (a plain list is also accepted).
+    Returns the list of import names that are still missing.
+    """
+    if not isinstance(packages, dict):
+        packages = {pkg: pkg for pkg in packages}
+    missing = find_missing(packages)
     if missing:
         print(f"Missing modules detected: {', '.join(missing)}")
         print("Installing required modules...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", *missing])
-        print("Installation complete. Please restart the program if necessary.")
-
-def run():
-    required_packages = [
-        "colorama",
-        "PIL",          # Pillow
-        "cryptography",
-        "googletrans",
-        "requests",
-        "qrcode"
-    ]
-    check_and_install(required_packages)
+        try:
+            subprocess.check_call([sys.executable, "-m", "pip", "install", *[packages[m] for m in missing]])
+            importlib.invalidate_caches()
+            missing = find_missing(missing)
+            print("Installation complete. Please restart the program if necessary.")
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Automatic installation failed: {e}")
+    return missing
+
+
+def run(force=False):
+    fingerprint = environment_fingerprint()
+    if not force:
+        cache = load_cache()
+        if cache and cache.get("fingerprint") == fingerprint and not cache.get("missing"):
+            return []
+    missing = check_and_install(REQUIRED_PACKAGES)
+    # pip may have changed site-packages, so fingerprint again before saving
+    save_cache(environment_fingerprint(), missing, installed_versions(REQUIRED_PACKAGES))
+    return missing
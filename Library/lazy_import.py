@@ -0,0 +1,139 @@
+# Library/lazy_import.py
+"""
+On-demand module loading for OpenNCL.
+
+Heavy dependencies (tkinter, PIL, qrcode, cryptography, googletrans, requests,
+ascii_magic) are wrapped in a LazyModule proxy and only imported the first time
+an attribute is looked up, i.e. the first time a command actually uses them.
+
+The ImportProfiler records how long every import takes so the shell can print
+a per-module cost table (`OpenNCL.py --import-profile`).
+"""
+import builtins
+import importlib
+import sys
+from time import perf_counter
+
+
+# ---------------- profiler ----------------
+class ImportProfiler:
+    """
+    Times imports by wrapping builtins.__import__.
+    Only first-time imports are recorded (modules already in sys.modules cost nothing).
+    For each module we keep the inclusive time and the self time (inclusive minus
+    the nested imports it triggered).
+    """
+
+    def __init__(self):
+        self.records = {}      # name -> [inclusive, self, lazy]
+        self.active = False
+        self._original_import = None
+        self._stack = []
+
+    def start(self):
+        if self.active:
+            return
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+        self.active = True
+
+    def stop(self):
+        if not self.active:
+            return
+        builtins.__import__ = self._original_import
+        self.active = False
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        self._stack.append(0.0)
+        start = perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = perf_counter() - start
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.record(name, elapsed, elapsed - nested)
+
+    def record(self, name, inclusive, self_time=None, lazy=False):
+        if self_time is None:
+            self_time = inclusive
+        entry = self.records.setdefault(name, [0.0, 0.0, lazy])
+        entry[0] += inclusive
+        entry[1] += self_time
+        entry[2] = entry[2] or lazy
+
+    def report(self, title="Import profile", top=None, lazy_only=False):
+        rows = [(n, r[0], r[1], r[2]) for n, r in self.records.items() if r[2] or not lazy_only]
+        rows.sort(key=lambda r: r[2], reverse=True)     # self time: the modules that are slow themselves
+        if top:
+            rows = rows[:top]
+        total = sum(r[2] for r in rows)
+        lines = [title, f"{'module':<40} {'self ms':>10} {'cumul ms':>10}  loaded"]
+        lines.append("-" * 72)
+        for name, inclusive, self_time, lazy in rows:
+            when = "on demand" if lazy else "startup"
+            lines.append(f"{name:<40} {self_time * 1000:>10.2f} {inclusive * 1000:>10.2f}  {when}")
+        lines.append("-" * 72)
+        lines.append(f"{'total (self)':<40} {total * 1000:>10.2f}")
+        return "\n".join(lines)
+
+
+profiler = ImportProfiler()
+
+
+# ---------------- lazy proxy ----------------
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+    After loading, the real module is cached and every lookup is forwarded to it.
+    """
+
+    def __init__(self, name):
+        self.__dict__["_lazy_name"] = name
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            name = self.__dict__["_lazy_name"]
+            already = name in sys.modules
+            start = perf_counter()
+            module = importlib.import_module(name)
+            if not already:
+                profiler.record(name, perf_counter() - start, lazy=True)
+            self.__dict__["_lazy_module"] = module
+        return module
+
+    @property
+    def is_loaded(self):
+        return self.__dict__["_lazy_module"] is not None
+
+    def __getattr__(self, item):
+        return getattr(self._load(), item)
+
+    def __setattr__(self, item, value):
+        setattr(self._load(), item, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module '{self.__dict__['_lazy_name']}' ({state})>"
+
+
+def lazy_module(name):
+    """Return a proxy that imports `name` the first time it is used."""
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+
+def preload(*modules):
+    """Force-load lazy modules (e.g. before handing them to a worker thread)."""
+    for module in modules:
+        if isinstance(module, LazyModule):
+            module._load()
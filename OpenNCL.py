@@ -10,46 +10,70 @@
 
 import sys
 import os
+from time import perf_counter
 
+_STARTUP_BEGIN = perf_counter()
+
+from Library import lazy_import
+IMPORT_PROFILE = "--import-profile" in sys.argv
+if IMPORT_PROFILE:
+    sys.argv.remove("--import-profile")
+    lazy_import.profiler.start()
 
 from Library import dependency_checker
 dependency_checker.run()
+from Library import command_registry, batch_runner
 sys.path.append(os.path.join(os.path.dirname(__file__), "tools"))
 
 
 
 
 import subprocess
-from tkinter import ttk, messagebox, filedialog, scrolledtext
-from colorama import Fore, init
-import os
+from colorama import Fore, Back, Style, init
 import webbrowser
 import urllib.parse
 from configparser import ConfigParser
 import re
-import tkinter as tk
-from tkinter import font
 import math
-from time import strftime
-from PIL import ImageGrab, ImageTk, ImageDraw, Image
-import qrcode
 import json
 from datetime import datetime
 from time import strftime, time
-from cryptography.fernet import Fernet
-from googletrans import Translator
 import ctypes
-import sys
 import shutil
-import requests
+import threading
 import platform
-import ctypes.wintypes
-from tools.linux_subsystem import linux_subsystem as linux_sub
-from colorama import Fore, Back, Style, init
+from tools.xplusplus import Interpreter as XplusplusInterpreter, VMInterpreter as XplusplusVMInterpreter
+from tools.xplusplus import cli as xpp_cli
 init(autoreset=True)
-import platform
-import datetime
-import tools.ascii_logo.converter as ascii_logo
+
+# Heavy dependencies are only imported the first time a command needs them
+# (calculator, screenshot, qrcode, encrypt, translate, logo, ip, linux).
+lazy = lazy_import.lazy_module
+tk = lazy("tkinter")
+ttk = lazy("tkinter.ttk")
+messagebox = lazy("tkinter.messagebox")
+filedialog = lazy("tkinter.filedialog")
+scrolledtext = lazy("tkinter.scrolledtext")
+font = lazy("tkinter.font")
+Image = lazy("PIL.Image")
+ImageGrab = lazy("PIL.ImageGrab")
+ImageTk = lazy("PIL.ImageTk")
+qrcode = lazy("qrcode")
+fernet = lazy("cryptography.fernet")
+file_crypto = lazy("tools.file_crypto")
+tomlang_modules = lazy("tools.tomlang_modules")
+disk_usage = lazy("tools.disk_usage")
+qr_tools = lazy("tools.qr")
+qr_cli = lazy("tools.qr.cli")
+googletrans = lazy("googletrans")
+requests = lazy("requests")
+wintypes = lazy("ctypes.wintypes")
+linux_sub = lazy("tools.linux_subsystem.linux_subsystem")
+ascii_logo = lazy("tools.ascii_logo.converter")
+
+STARTUP_TIME = perf_counter() - _STARTUP_BEGIN
+if IMPORT_PROFILE:
+    lazy_import.profiler.stop()
 
 
 
@@ -66,7 +90,7 @@ def _try_dwm_mica(hwnd: int, dark: bool = True) -> bool:
         for backdrop in BACKDROP_CANDIDATES:
             val = ctypes.c_int(backdrop)
             res = dwmapi.DwmSetWindowAttribute(
-                ctypes.wintypes.HWND(hwnd),
+                wintypes.HWND(hwnd),
                 ctypes.c_uint(DWMWA_SYSTEMBACKDROP_TYPE),
                 ctypes.byref(val),
                 ctypes.sizeof(val),
@@ -76,7 +100,7 @@ def _try_dwm_mica(hwnd: int, dark: bool = True) -> bool:
                     try:
                         dark_val = ctypes.c_int(1 if dark else 0)
                         dwmapi.DwmSetWindowAttribute(
-                            ctypes.wintypes.HWND(hwnd),
+                            wintypes.HWND(hwnd),
                             ctypes.c_uint(attr),
                             ctypes.byref(dark_val),
                             ctypes.sizeof(dark_val),
@@ -123,7 +147,7 @@ def _try_acrylic_blur(hwnd: int, gradient_color: int = None) -> bool:
             set_wca = user32.SetWindowCompositionAttribute
         except AttributeError:
             return False
-        res = set_wca(ctypes.wintypes.HWND(hwnd), ctypes.byref(data))
+        res = set_wca(wintypes.HWND(hwnd), ctypes.byref(data))
         return res == 0
     except Exception:
         return False
@@ -250,60 +274,61 @@ def date():
     print(formatted)
 
 
-def install_module(name_or_url):
-    if name_or_url.startswith("http") or "/" in name_or_url:
-        url = name_or_url
+def parse_install_args(words):
+    """`[--jobs N] [--no-cache] [--sync] [-r FILE] [module ...]` -> (jobs, use_cache, sync, modules, manifests)."""
+    jobs, use_cache, sync, modules, manifests = tomlang_modules.DEFAULT_JOBS, True, False, [], []
+    words = iter(words)
+    for word in words:
+        if word in ("--jobs", "-j"):
+            value = next(words, "")
+            if not value.isdigit() or int(value) < 1:
+                raise command_registry.UsageError("--jobs needs a positive number")
+            jobs = int(value)
+        elif word == "--no-cache":
+            use_cache = False
+        elif word == "--sync":
+            sync = True
+        elif word in ("-r", "--requirements"):
+            path = next(words, None)
+            if path is None:
+                raise command_registry.UsageError("-r needs a manifest file")
+            manifests.append(path)
+        else:
+            modules.append(word)
+    return jobs, use_cache, sync, modules, manifests
+
+
+def save_key(key, path='secret.key'):
+    with open(path, 'wb') as f:
+        f.write(key)
+
+def encrypt_file(file_path, key):
+    # streamed in fixed-size authenticated chunks (tools/file_crypto/container.py)
+    file_crypto.encrypt_file(file_path, file_path + '.enc', key)
+
+def encrypt_path(target_path, key, jobs=1):
+    """Returns 1 if the path does not exist or any file in it failed, else 0."""
+    if os.path.isfile(target_path) and jobs <= 1:
+        encrypt_file(target_path, key)
+    elif os.path.exists(target_path):
+        # directories are incremental: unchanged files (per the manifest) are skipped
+        summary = file_crypto.encrypt_tree(target_path, key, jobs, progress=jobs > 1)
+        print(summary.report())
+        return 1 if summary.errors else 0
     else:
-        url = f"{DEFAULT_REPO_ROOT}{name_or_url}.git"
-
-    repo_name = url.split('/')[-1].replace('.git', '')
-    install_dir = os.path.join(".tomlang_modules", repo_name)
+        print(f"Invalid path: {target_path}")
+        return 1
+    return 0
 
-    if os.path.exists(install_dir):
-        print(f"Requirement already satisfied: {repo_name} in {install_dir}")
-
-        
-        return install_dir
-
-    print(f"Collecting {repo_name}")
-    start = time()
-    try:
-        subprocess.run(["git", "clone", url, install_dir], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
-        elapsed = time() - start
-        size = get_directory_size(install_dir) / 1024
-        speed = size / elapsed if elapsed > 0 else size
-        print(f"Downloaded {repo_name}-{elapsed:.2f}s [{size:.1f} kB @ {speed:.1f} kB/s]")
-        print(f"Installing collected package: {repo_name}")
-        print(f"Successfully installed {repo_name}")
-        return install_dir
-    except Exception as e:
-        print(f"ERROR: Could not install {repo_name}: {e}")
-        return None
-
-def get_directory_size(path):
-    total = 0
-    for dirpath, dirnames, filenames in os.walk(path):
-        for f in filenames:
-            fp = os.path.join(dirpath, f)
-            if os.path.exists(fp):
-                total += os.path.getsize(fp)
-    return total
-
-
-def load_key(path='secret.key'):
-    with open(path, 'rb') as f:
-        return f.read()
 
 def decrypt_file(enc_file_path, key):
-    fernet = Fernet(key)
-    with open(enc_file_path, 'rb') as f:
-        encrypted = f.read()
-    decrypted = fernet.decrypt(encrypted)
-    output_path = enc_file_path.replace('.enc', '')
-    with open(output_path, 'wb') as f:
-        f.write(decrypted)
+    # chunked containers are streamed; older single-blob Fernet files are still accepted.
+    # `key` may also be the keyring, which picks each file's key by the id in its header
+    output_path = enc_file_path[:-len('.enc')] if enc_file_path.endswith('.enc') else enc_file_path + '.dec'
+    file_crypto.decrypt_file(enc_file_path, output_path, key)
 
 def decrypt_path(target_path, key):
+    """Returns 1 if the path is neither a .enc file nor a directory, else 0."""
     if os.path.isfile(target_path) and target_path.endswith('.enc'):
         decrypt_file(target_path, key)
     elif os.path.isdir(target_path):
@@ -314,10 +339,12 @@ def decrypt_path(target_path, key):
                     decrypt_file(full_path, key)
     else:
         print(f"Invalid Path: {target_path}")
+        return 1
+    return 0
 
 
 def google_translate(text, src='auto', dest='en'):
-    translator = Translator()
+    translator = googletrans.Translator()
     try:
         result = translator.translate(text, src=src, dest=dest)
         return result.text
@@ -325,37 +352,25 @@ def google_translate(text, src='auto', dest='en'):
         return f"Translation failed: {e}"
     
 
-def handle_search_command(command):
-    if command.startswith("{search:Google}:"):
-        keyword = command.split(":", 1)[1]
-        query = urllib.parse.quote(keyword)
-        url = f"https://www.google.com/search?q={query}"
-        webbrowser.open(url)
-        print(f"Searching Google for: {keyword}")
-
-    elif command.startswith("{search:Bing}:"):
-        keyword = command.split(":", 1)[1]
-        query = urllib.parse.quote(keyword)
-        url = f"https://www.bing.com/search?q={query}"
-        webbrowser.open(url)
-        print(f"Searching Bing for: {keyword}")
-
-    elif command.startswith("{search:YouTube}:"):
-        keyword = command.split(":", 1)[1]
-        query = urllib.parse.quote(keyword)
-        url = f"https://www.youtube.com/results?search_query={query}"
-        webbrowser.open(url)
-        print(f"Searching YouTube for: {keyword}")
-
-    elif command.startswith("{open:"):
-        url = command[len("{open:"):].rstrip("}")
-        if not url.startswith("http"):
-            url = "https://" + url
-        webbrowser.open(url)
-        print(f"Opening URL: {url}")
+SEARCH_ENGINES = {
+    "google": ("Google", "https://www.google.com/search?q={query}"),
+    "bing": ("Bing", "https://www.bing.com/search?q={query}"),
+    "youtube": ("YouTube", "https://www.youtube.com/results?search_query={query}"),
+}
 
-    else:
-        print("Unknown search command format.")
+def search_web(engine, keyword):
+    keyword = keyword.strip()
+    title, template = SEARCH_ENGINES[engine]
+    url = template.format(query=urllib.parse.quote(keyword))
+    webbrowser.open(url)
+    print(f"Searching {title} for: {keyword}")
+
+def open_url(url):
+    url = url.strip().rstrip("}")
+    if not url.startswith("http"):
+        url = "https://" + url
+    webbrowser.open(url)
+    print(f"Opening URL: {url}")
 
 
 
@@ -365,6 +380,8 @@ def get_public_ip():
         print(response.text)
     except Exception as e:
         print("Error retrieving IP:", e)
+        return 1
+    return 0
 
 
 def enter_pro_mode():
@@ -420,113 +437,19 @@ def enter_pro_mode():
 
 
    
-class XplusplusInterpreter:
-    def __init__(self):
-        self.env = {}
-
-    def eval_expr(self, expr):
-        expr = expr.strip()
-        if expr.startswith('"') and expr.endswith('"'):
-            return expr[1:-1]
-        if expr in self.env:
-            return self.env[expr]
-        try:
-            if '.' in expr:
-                return float(expr)
-            return int(expr)
-        except:
-            pass
-        for var, val in self.env.items():
-            expr = re.sub(rf"\b{var}\b", repr(val), expr)
-        try:
-            return eval(expr)
-        except Exception as e:
-            raise SyntaxError(f"Expression evaluation failed: {expr}")
-
-    def run_line(self, line):
-        line = line.replace("：", ":").strip()
-        if not line:
-            return
-        if re.match(r"\w+\s*=\s*input\(\)", line):
-            var = line.split('=')[0].strip()
-            self.env[var] = input()
-            return
-        if re.match(r"\w+\s*=\s*.+", line):
-            var, expr = line.split('=', 1)
-            self.env[var.strip()] = self.eval_expr(expr)
-            return
-        if re.match(r"print\((.+)\)", line):
-            content = re.findall(r"print\((.+)\)", line)[0]
-            print(self.eval_expr(content))
-            return
-        raise SyntaxError(f"Invalid statement: {line}")
-
-    def extract_block(self, lines, start_index):
-        block = []
-        depth = 0
-        skip = 0
-        for j, raw in enumerate(lines[start_index:], start=start_index):
-            skip += 1
-            line = raw.strip()
-            if "{" in line:
-                depth += 1
-                if depth == 1:
-                    continue
-            if "}" in line:
-                depth -= 1
-                if depth == 0:
-                    break
-            if depth >= 1:
-                block.append(line)
-        return block, skip
-
-    def run_block(self, lines):
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip().rstrip(";")
-            if not line or line.startswith("#"):
-                i += 1
-                continue
-            if line.startswith("if "):
-                cond = line[3:].rstrip(":").strip()
-                block, skip = self.extract_block(lines, i)
-                if self.eval_expr(cond):
-                    self.run_block(block)
-                i += skip
-                continue
-            if line.startswith("else"):
-                block, skip = self.extract_block(lines, i)
-                self.run_block(block)
-                i += skip
-                continue
-            self.run_line(line)
-            i += 1
-
-    def repl(self):
-        print("x v0.4 Interactive Mode | type 'exit' to quit")
-        buffer = []
-        in_block = False
-        while True:
-            line = input(">>> ")
-            if line.strip().lower() == "exit":
-                break
-            if "{" in line:
-                in_block = True
-                buffer.append(line)
-                continue
-            if in_block:
-                buffer.append(line)
-                if "}" in line:
-                    self.run_block(buffer)
-                    buffer = []
-                    in_block = False
-                continue
-            self.run_block([line])
-
+class ScreenshotTool:
+    """
+    Only the grab itself happens on the Tk thread. PNG encoding, saving and the
+    preview thumbnail run on a background thread per capture, whose result the
+    UI polls, so large (multi-monitor) captures never stall the event loop.
+    The selection overlay is one Canvas with one rectangle that is moved with
+    coords(), at most once per display frame however fast motion events come.
+    """
 
+    FRAME_MS = 16       # ~60 Hz; Tk does not expose the display's refresh rate
+    POLL_MS = 50
+    PREVIEW_SIZE = (300, 300)
 
-class ScreenshotTool:
-    
     def __init__(self, root):
         self.root = root
         self.root.title("Screenshot Tool")
@@ -536,49 +459,141 @@ class ScreenshotTool:
         self.btn_area.pack(pady=10)
         self.preview_label = tk.Label(root)
         self.preview_label.pack()
-        self.start_x = self.start_y = self.rect = None
+        self.status = tk.Label(root)
+        self.status.pack()
+        self.start_x = self.start_y = None
+        self.pointer = None         # latest drag position, drawn on the next frame
+        self.pending_draw = None
 
     def capture_fullscreen(self):
-        img = ImageGrab.grab()
-        img.save("full_screenshot.png")
-        self.show_preview(img)
+        self.save_in_background(ImageGrab.grab(), "full_screenshot.png")
 
     def start_area_selection(self):
         self.root.withdraw()
         self.area_window = tk.Toplevel()
         self.area_window.attributes('-fullscreen', True)
         self.area_window.attributes('-alpha', 0.3)
-        self.area_window.bind("<ButtonPress-1>", self.on_press)
-        self.area_window.bind("<B1-Motion>", self.on_drag)
-        self.area_window.bind("<ButtonRelease-1>", self.on_release)
+        self.canvas = tk.Canvas(self.area_window, cursor="cross", highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True)
+        self.rect = self.canvas.create_rectangle(0, 0, 0, 0, outline="red", width=2, state="hidden")
+        self.canvas.bind("<ButtonPress-1>", self.on_press)
+        self.canvas.bind("<B1-Motion>", self.on_drag)
+        self.canvas.bind("<ButtonRelease-1>", self.on_release)
 
     def on_press(self, event):
         self.start_x, self.start_y = event.x_root, event.y_root
-        self.rect = tk.Canvas(self.area_window, cursor="cross")
-        self.rect.pack(fill="both", expand=True)
+        self.origin = (event.x, event.y)
+        self.canvas.coords(self.rect, event.x, event.y, event.x, event.y)
+        self.canvas.itemconfigure(self.rect, state="normal")
 
     def on_drag(self, event):
-        if self.rect:
-            self.rect.delete("rectangle")
-            x, y = min(self.start_x, event.x_root), min(self.start_y, event.y_root)
-            w, h = abs(self.start_x - event.x_root), abs(self.start_y - event.y_root)
-            self.rect.create_rectangle(x, y, x+w, y+h, outline="red", width=2, tag="rectangle")
+        self.pointer = (event.x, event.y)
+        if self.pending_draw is None:
+            self.pending_draw = self.area_window.after(self.FRAME_MS, self.draw_selection)
+
+    def draw_selection(self):
+        self.pending_draw = None
+        self.canvas.coords(self.rect, *self.origin, *self.pointer)
 
     def on_release(self, event):
+        if self.pending_draw is not None:
+            self.area_window.after_cancel(self.pending_draw)
+            self.pending_draw = None
         self.area_window.destroy()
         self.root.deiconify()
+        if self.start_x is None:
+            return
         x0, y0 = min(self.start_x, event.x_root), min(self.start_y, event.y_root)
         x1, y1 = max(self.start_x, event.x_root), max(self.start_y, event.y_root)
-        img = ImageGrab.grab(bbox=(x0, y0, x1, y1))
-        img.save("area_screenshot.png")
-        self.show_preview(img)
+        self.start_x = self.start_y = None
+        if x1 > x0 and y1 > y0:
+            self.save_in_background(ImageGrab.grab(bbox=(x0, y0, x1, y1)), "area_screenshot.png")
+
+    def save_in_background(self, img, path):
+        # not a daemon: a save still running when the window closes is finished, not lost
+        state = {"preview": None, "error": None}
+        worker = threading.Thread(target=self.encode, args=(img, path, state))
+        worker.start()
+        self.status.config(text=f"Saving {path} ...")
+        self.root.after(self.POLL_MS, self.poll, worker, path, state)
+
+    def encode(self, img, path, state):
+        try:
+            preview = img.copy()
+            preview.thumbnail(self.PREVIEW_SIZE)
+            img.save(path)
+            state["preview"] = preview
+        except Exception as e:
+            state["error"] = e
+
+    def poll(self, worker, path, state):
+        if worker.is_alive():
+            self.root.after(self.POLL_MS, self.poll, worker, path, state)
+        elif state["error"] is not None:
+            self.status.config(text="")
+            messagebox.showerror("Screenshot Error", f"Could not save {path}: {state['error']}")
+        else:
+            self.status.config(text=f"Saved {path}")
+            self.show_preview(state["preview"])
 
     def show_preview(self, img):
-        img.thumbnail((300, 300))
         tk_img = ImageTk.PhotoImage(img)
         self.preview_label.config(image=tk_img)
         self.preview_label.image = tk_img
 
+class BatchProgressDialog:
+    """
+    Runs tools.qr.run_batch on a background thread (rendering itself happens in
+    worker processes) and shows its progress; the Tk event loop never blocks.
+    The worker thread only writes to self.state, which the dialog polls.
+    """
+
+    POLL_MS = 100
+
+    def __init__(self, root, path, save_dir, options, total):
+        self.root = root
+        self.total = total
+        self.state = {"summary": None, "result": None, "error": None}
+        self.cancel = threading.Event()
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Batch Generate")
+        self.window.resizable(False, False)
+        self.window.protocol("WM_DELETE_WINDOW", self.cancel.set)
+        self.status = ttk.Label(self.window, text=f"0 / {total} codes")
+        self.status.pack(fill=tk.X, padx=10, pady=(10, 5))
+        self.bar = ttk.Progressbar(self.window, length=320, maximum=max(total, 1))
+        self.bar.pack(padx=10, pady=5)
+        ttk.Button(self.window, text="Cancel", command=self.cancel.set).pack(pady=(5, 10))
+
+        jobs = os.cpu_count() or 1
+        worker = threading.Thread(target=self.run, args=(path, save_dir, options, jobs), daemon=True)
+        worker.start()
+        self.window.after(self.POLL_MS, self.poll)
+
+    def run(self, path, save_dir, options, jobs):
+        try:
+            self.state["result"] = qr_tools.run_batch(
+                qr_tools.batch.read_lines(path), save_dir, options, jobs=jobs, total=self.total,
+                progress=lambda summary: self.state.__setitem__("summary", summary), cancel=self.cancel)
+        except Exception as e:
+            self.state["error"] = e
+
+    def poll(self):
+        summary = self.state["result"] or self.state["summary"]
+        if summary is not None:
+            self.bar["value"] = summary.processed
+            self.status.config(text=f"{summary.processed} / {self.total} codes, {summary.rate():.1f} codes/s")
+        if self.state["result"] is None and self.state["error"] is None:
+            self.window.after(self.POLL_MS, self.poll)
+            return
+        self.window.destroy()
+        if self.state["error"] is not None:
+            messagebox.showerror("Batch Error", str(self.state["error"]))
+        else:
+            messagebox.showinfo("Complete", self.state["result"].report(max_errors=5))
+
+
 class AdvancedQRGenerator:
     def __init__(self, root):
         self.root = root
@@ -586,9 +601,17 @@ class AdvancedQRGenerator:
         self.root.geometry("800x600")
         
         self.current_image = None
-        self.history = []
+        # thumbnails only, newest in memory, older ones spilled under Date/qr_history
+        self.history = qr_tools.QRHistory()
+        # repeat generations are served from Date/qr_cache
+        self.cache = qr_tools.QRCache()
         self.load_config()
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+    def close(self):
+        self.history.close()
+        self.root.destroy()
         
     def create_widgets(self):
         main_frame = ttk.Frame(self.root)
@@ -617,8 +640,8 @@ class AdvancedQRGenerator:
         self.error_correction.grid(row=0, column=1, sticky="e")
         
         ttk.Label(param_group, text="QR Version:").grid(row=1, column=0, sticky="w")
-        self.version = ttk.Spinbox(param_group, from_=1, to=40, width=5)
-        self.version.set("6")
+        self.version = ttk.Spinbox(param_group, values=["auto"] + list(range(1, 41)), width=5)
+        self.version.set("auto")
         self.version.grid(row=1, column=1, sticky="e")
         
         style_group = ttk.LabelFrame(control_frame, text="Style Settings")
@@ -673,24 +696,7 @@ class AdvancedQRGenerator:
             content = data or self.text_input.get("1.0", tk.END).strip()
             if not content:
                 raise ValueError("Content cannot be empty")
-                
-            qr = qrcode.QRCode(
-                version=int(self.version.get()),
-                error_correction=self.get_error_level(),
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(content)
-            qr.make(fit=True)
-            
-            img = qr.make_image(
-                fill_color=self.fg_color.get(),
-                back_color=self.bg_color.get()
-            ).convert("RGB")
-            
-            if self.logo_path.get():
-                img = self.add_logo(img)
-                
+            img = self.cache.image(content, self.current_options())
             self.current_image = img
             self.add_to_history(content)
             self.show_preview(img)
@@ -700,85 +706,60 @@ class AdvancedQRGenerator:
                 
         except Exception as e:
             messagebox.showerror("Generation Error", str(e))
-    
-    def add_logo(self, img):
-        logo = Image.open(self.logo_path.get())
-        base_width = int(img.size[0] * self.logo_size.get())
-        wpercent = (base_width / float(logo.size[0]))
-        hsize = int((float(logo.size[1]) * float(wpercent)))
-        logo = logo.resize((base_width, hsize), Image.LANCZOS)
-        
-        mask = Image.new("L", logo.size, 0)
-        draw = ImageDraw.Draw(mask) 
-        draw.ellipse((0, 0, logo.size[0], logo.size[1]), fill=255)
-        
-        pos = (
-            (img.size[0] - logo.size[0]) // 2,
-            (img.size[1] - logo.size[1]) // 2
+
+    def current_options(self):
+        """The style settings of the widgets, read once per code or batch."""
+        return qr_tools.QROptions(
+            version=self.version.get(),
+            ecc=self.error_correction.get()[0],
+            fg=self.fg_color.get(),
+            bg=self.bg_color.get(),
+            logo=self.logo_path.get() or None,
+            logo_ratio=self.logo_size.get(),
         )
-        img.paste(logo, pos, mask)
-        return img
-        
+
     def batch_generate(self):
         path = filedialog.askopenfilename(filetypes=[("Text Files", "*.txt")])
         if not path:
             return
-            
+        save_dir = filedialog.askdirectory()
+        if not save_dir:
+            return
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                lines = [line.strip() for line in f if line.strip()]
-                
-            save_dir = filedialog.askdirectory()
-            if not save_dir:
-                return
-                
-            for i, text in enumerate(lines):
-                img = self.generate_qr(text, save=True)
-                img.save(os.path.join(save_dir, f"qrcode_{i+1}.png"))
-                
-            messagebox.showinfo("Complete", f"Generated {len(lines)} QR codes")
-            
+            total = qr_tools.batch.count_lines(path)
+            options = self.current_options()
         except Exception as e:
             messagebox.showerror("Batch Error", str(e))
-    
+            return
+        BatchProgressDialog(self.root, path, save_dir, options, total)
+
     def add_to_history(self, content):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        entry = {
-            "time": timestamp,
-            "content": content[:50] + "..." if len(content) > 50 else content,
-            "image": self.current_image
-        }
-        self.history.insert(0, entry)
-        self.history_list.insert(0, f"{timestamp} - {entry['content']}")
-    
+        label, dropped = self.history.add(content, self.current_image)
+        self.history_list.insert(0, label)
+        if dropped:
+            self.history_list.delete(len(self.history), tk.END)
+
     def show_history_item(self, event):
         selection = self.history_list.curselection()
         if selection:
-            entry = self.history[selection[0]]
-            self.show_preview(entry["image"])
-    
+            img = self.history.image(selection[0])
+            if img is not None:
+                self.show_preview(img)
+
     def show_preview(self, img):
+        img = img.copy()
         img.thumbnail((400, 400))
         tk_img = ImageTk.PhotoImage(img)
         self.preview_label.config(image=tk_img)
         self.preview_label.image = tk_img
         
-    def get_error_level(self):
-        levels = {
-            "L (7%)": qrcode.constants.ERROR_CORRECT_L,
-            "M (15%)": qrcode.constants.ERROR_CORRECT_M,
-            "Q (25%)": qrcode.constants.ERROR_CORRECT_Q,
-            "H (30%)": qrcode.constants.ERROR_CORRECT_H
-        }
-        return levels[self.error_correction.get()]
-    
     def load_config(self):
         try:
             with open("config.json", "r") as f:
                 config = json.load(f)
                 self.fg_color.set(config.get("fg_color", "#000000"))
                 self.bg_color.set(config.get("bg_color", "#FFFFFF"))
-                self.version.set(config.get("version", 6))
+                self.version.set(config.get("version", "auto"))
                 self.error_correction.current(config.get("error_level", 1))
         except FileNotFoundError:
             pass
@@ -1129,264 +1110,470 @@ class EnhancedCalculator:
 
 
 
-def main():
-    
-    
-    print("[Version 3.0.5] ")
-    print('''
-    _______                        _____   _________________ 
-    __  __ \________ _____ _______ ___  | / /__  ____/___  / 
-    _  / / /___  __ \_  _ \__  __ \__   |/ / _  /     __  /  
-    / /_/ / __  /_/ //  __/_  / / /_  /|  /  / /___   _  /___
-    \____/  _  .___/ \___/ /_/ /_/ /_/ |_/   \____/   /_____/
-            /_/                                                                                                
+def print_import_profile(lazy_only=False, file=None):
+    if lazy_only:
+        print(lazy_import.profiler.report("Imports loaded on demand this session", lazy_only=True), file=file)
+        return
+    print(lazy_import.profiler.report("Startup imports"), file=file)
+    print(f"Startup time: {STARTUP_TIME * 1000:.2f} ms", file=file)
 
-''')
-                                                                                           
-                                                                                          
-    
-   
 
+# ---------------- commands ----------------
+registry = command_registry.CommandRegistry()
+command = registry.command
+
+SYSTEM_SHORTCUTS = ("python", "node", "cmd", "powershell", "explorer", "notepad", "control", "taskmgr", "calc", "mspaint")
+PLUGIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plugins")
+
+
+@command("exit")
+def exit_command():
+    print("Exit the command line")
+    return command_registry.EXIT
+
+command("help")(help)
+command("date")(date)
+
+
+def run_system_shortcut(name):
+    try:
+        if name == "cmd":
+            os.system("start cmd")
+        elif name == "powershell":
+            os.system("start powershell")
+        else:
+            subprocess.run(name, shell=True)
+    except FileNotFoundError:
+        print(f"Environment command `{name}` not found, please check if the environment variables are installed and configured.")
+        return 1
+
+for _name in SYSTEM_SHORTCUTS:
+    registry.register(_name, lambda _name=_name: run_system_shortcut(_name))
+
+
+@command("logo", args="argv", deps=(ascii_logo,),
+         usage="usage:\n"
+               "  logo show <image path> [width] # Display color ASCII images in the terminal\n"
+               "  logo save <image path> [width] # Generate and save color LOGO file")
+def logo_command(args):
+    if not args:
+        raise command_registry.UsageError
+    action = args[0].lower()
+    path = args[1] if len(args) >= 2 else None
+    width = int(args[2]) if len(args) >= 3 else 80
+    if action not in ("show", "save"):
+        print(f"Unknown logo action: {action}")
+        return 1
+    if not path or not os.path.exists(path):
+        print("Image file not found.")
+        return 1
+    if action == "show":
+        ascii_logo.image_to_ascii_color(path, columns=width)
+    else:
+        ascii_logo.save_ascii_logo_color(path, "ascii_logo_color.txt", columns=width)
+
+
+@command("dir")
+def dir_command():
+    subprocess.run("dir", shell=True)
+
+
+def parse_du_args(rest):
+    """`[--jobs N] [--fresh] [path]` -> (jobs, fresh, path)."""
+    jobs, fresh = disk_usage.DEFAULT_JOBS, False
     while True:
-        current_path = os.getcwd()
-        user_input = input(f"{current_path}> ").strip().lower()
+        parts = rest.split(None, 1)
+        if not parts or parts[0] not in ("--jobs", "-j", "--fresh"):
+            return jobs, fresh, rest or "."
+        rest = parts[1] if len(parts) > 1 else ""
+        if parts[0] == "--fresh":
+            fresh = True
+            continue
+        value, _, rest = rest.partition(" ")
+        if not value.isdigit() or int(value) < 1:
+            raise command_registry.UsageError("--jobs needs a positive number")
+        jobs = int(value)
+        rest = rest.strip()
+
+
+@command("du", args=parse_du_args, deps=(disk_usage,), usage="Usage: du [--jobs N] [--fresh] [path]")
+def du_command(jobs, fresh, path):
+    if not os.path.exists(path):
+        print(f"du: {path}: no such file or directory")
+        return 1
+    stats = disk_usage.dir_stats(path, jobs, disk_usage.open_cache(), refresh=fresh)
+    print(stats.report())
+
+
+@command("color", args="call", usage="usage: color(<fg>, <bg>)")
+def color_command(fg_color, bg_color=None):
+    print(color(fg_color, bg_color))
+
+
+@command("calculator", deps=(tk, font, messagebox))
+def calculator_command():
+    root = tk.Tk()
+    EnhancedCalculator(root)
+    root.mainloop()
+
+
+@command("install", args="argv", deps=(tomlang_modules,),
+         usage="Usage: install [--jobs N] [--no-cache] [--sync] [-r <manifest>] [<module-name|url> ...]")
+def install_command(args):
+    jobs, use_cache, sync, modules, manifests = parse_install_args(args)
+    lock = tomlang_modules.Lockfile(tomlang_modules.LOCK_NAME)
+    if not modules and not manifests:
+        # the whole workspace: everything in the manifest and the lockfile
+        if os.path.exists(tomlang_modules.MANIFEST_NAME):
+            manifests.append(tomlang_modules.MANIFEST_NAME)
+        elif not lock.modules:
+            raise command_registry.UsageError
+        modules += lock.urls()
+    for path in manifests:
+        try:
+            modules += tomlang_modules.read_manifest(path)
+        except OSError as e:
+            print(f"ERROR: Could not read {path}: {e.strerror}")
+            return 1
+    results = tomlang_modules.install(modules, DEFAULT_REPO_ROOT, jobs=jobs, use_cache=use_cache, lock=lock, sync=sync)
+    if any(r.status == "failed" for r in results):
+        return 1
+
+
+@command("screenshot", deps=(tk, ImageGrab, ImageTk, messagebox))
+def screenshot_command():
+    root = tk.Tk()
+    ScreenshotTool(root)
+    root.mainloop()
 
 
-        if user_input == "exit":
-            print("Exit the command line")
+@command("x++", "xplusplus", args="words", usage="Usage: x++ [vm]")
+def xplusplus_command(options):
+    if options not in ([], ["vm"]):
+        raise command_registry.UsageError
+    engine = XplusplusVMInterpreter if options else XplusplusInterpreter
+    engine().repl()
+
+
+@command("xpp", args="argv", usage="Usage: xpp run <file.xpp> [--no-cache] [--vm] [--stats] | xpp cache stats|clear")
+def xpp_command(argv):
+    try:
+        return xpp_cli.main(argv)
+    except SystemExit as e:
+        # argparse exits on --help or bad arguments; stay in the shell
+        if e.code:
+            raise command_registry.UsageError from None
+
+
+@command("mode pro")
+def pro_mode_command():
+    enter_pro_mode()
+
+
+@command("linux", deps=(linux_sub,))
+def linux_command():
+    # simple interactive helper for WSL usage
+    info = linux_sub.detect_wsl()
+    print("WSL detect:", info)
+    print("Installed WSL distros:", linux_sub.list_wsl_distros())
+    print("Commands: 'shell' (open wsl shell), 'run <cmd...>', 'runelf <path> [arg1 arg2]', 'install-wsl', 'back'")
+    while True:
+        cmd = input("linux> ").strip()
+        if not cmd:
+            continue
+        if cmd in ("back", "exit", "quit", "q"):
             break
+        if cmd == "shell":
+            # open interactive WSL shell in the same terminal (blocking)
+            subprocess.run(["wsl"])
+            continue
+        if cmd.startswith("run "):
+            to_run = cmd.split(" ", 1)[1]
+            rc, out = linux_sub.run_in_wsl(to_run.split(), capture_output=True)
+            print(f"[rc={rc}]\n{out}")
+            continue
+        if cmd.startswith("runelf "):
+            parts = cmd.split()
+            path = parts[1]
+            args = parts[2:] if len(parts) > 2 else []
+            rc, out = linux_sub.run_elf_with_wsl(path, args=args)
+            print(f"[rc={rc}]\n{out}")
+            continue
+        if cmd == "install-wsl":
+            print("Attempting 'wsl --install' (requires admin). Output:")
+            rc, out = linux_sub.install_wsl()
+            print(out)
+            continue
+        # fallback: run direct in wsl
+        rc, out = linux_sub.run_in_wsl(cmd.split(), capture_output=True)
+        print(f"[rc={rc}]\n{out}")
 
-        elif user_input == "help":
-            help()
 
-        elif user_input in ["python", "node", "cmd", "powershell", "explorer", "notepad", "control", "taskmgr", "calc", "mspaint"]:
-            try:
-                if user_input == "cmd":
-                    os.system("start cmd")
-                elif user_input == "powershell":
-                    os.system("start powershell")
-                else:
-                    subprocess.run(user_input, shell=True)
-            except FileNotFoundError:
-                print(f"Environment command `{user_input}` not found, please check if the environment variables are installed and configured.")
-
-        elif user_input.startswith("logo"):
-            args = user_input.split()
-            if len(args) == 1:
-                    print("usage:")
-                    print("  logo show <image path> [width] # Display color ASCII images in the terminal")
-                    print("  logo save <image path> [width] # Generate and save color LOGO file")
-            elif args[1] == "show":
-                path = args[2] if len(args) >= 3 else None
-                width = int(args[3]) if len(args) >= 4 else 80
-                if not path or not os.path.exists(path):
-                    print("Image file not found.")
-                else:
-                    ascii_logo.image_to_ascii_color(path, columns=width)
-            elif args[1] == "save":
-                path = args[2] if len(args) >= 3 else None
-                width = int(args[3]) if len(args) >= 4 else 80
-                if not path or not os.path.exists(path):
-                    print("Image file not found.")
-                else:
-                    ascii_logo.save_ascii_logo_color(path, "ascii_logo_color.txt", columns=width)
+def parse_crypto_args(rest):
+    """`[--jobs N] [--key NAME] <path>` -> (jobs, key name, path); unset options are None."""
+    jobs = key_name = None
+    while True:
+        parts = rest.split(None, 2)
+        if not parts or parts[0] not in ("--jobs", "-j", "--key", "-k"):
+            return jobs, key_name, rest
+        if len(parts) < 3:
+            raise command_registry.UsageError(f"{parts[0]} needs a value and a path")
+        if parts[0] in ("--jobs", "-j"):
+            if not parts[1].isdigit() or int(parts[1]) < 1:
+                raise command_registry.UsageError("--jobs needs a positive number")
+            jobs = int(parts[1])
+        else:
+            key_name = parts[1]
+        rest = parts[2]
+
+
+@command("encrypt", args=parse_crypto_args, deps=(fernet, file_crypto),
+         usage="Usage: encrypt [--jobs N] [--key NAME] <path>")
+def encrypt_command(jobs, key_name, path):
+    if not path:
+        raise command_registry.UsageError
+    if not os.path.exists(path):
+        # before the keyring is opened (which creates it on first use)
+        raise command_registry.UsageError(f"{path}: no such file or directory")
+    try:
+        ring = file_crypto.open_keyring(create=not key_name)
+        key = ring.get(key_name)
+        print(f"Using key '{key_name or ring.default}' from the keyring")
+        if encrypt_path(path, key, jobs or 1):
+            return 1
+        print(f" Encrypted Path: {path}")
+    except Exception as e:
+        print(f"Encryption failed: {e}")
+        return 1
 
 
-            
+@command("decrypt", args=parse_crypto_args, deps=(fernet, file_crypto),
+         usage="Usage: decrypt [--jobs N] [--key NAME] <path>")
+def decrypt_command(jobs, key_name, path):
+    if not path:
+        raise command_registry.UsageError
+    if not os.path.exists(path):
+        raise command_registry.UsageError(f"{path}: no such file or directory")
+    try:
+        # without --key every file is matched to its own key by the id in its header
+        ring = file_crypto.open_keyring()
+        keys = ring.get(key_name) if key_name else ring
+        if jobs:
+            summary = file_crypto.decrypt_tree(path, keys, jobs)
+            print(summary.report())
+            if summary.errors:
+                return 1
+        elif decrypt_path(path, keys):
+            return 1
+        print(f"Decryption completed: {path}")
+    except Exception as e:
+        print(f"Decryption failed: {e}")
+        return 1
+
+
+@command("key", args="argv", deps=(file_crypto,),
+         usage="Usage: key list | key new <name> | key import <name> <file> | key export <name> <file> | key default <name>")
+def key_command(words):
+    if not words:
+        words = ["list"]
+    action, args = words[0].lower(), words[1:]
+    arity = {"list": 0, "new": 1, "import": 2, "export": 2, "default": 1}
+    if arity.get(action) != len(args):
+        raise command_registry.UsageError
+    try:
+        ring = file_crypto.open_keyring(allow_empty=action in ("new", "import"))
+        if action == "list":
+            for name in ring.names():
+                marker = "*" if name == ring.default else " "
+                print(f"{marker} {name:<20} id {file_crypto.key_id(ring.keys[name]).hex()}  created {ring.created.get(name) or '-'}")
+            return
+        if action == "new":
+            ring.create(args[0])
+        elif action == "import":
+            ring.import_file(args[0], args[1])
+        elif action == "export":
+            save_key(ring.get(args[0]), args[1])
+            print(f"Key '{args[0]}' written to {args[1]}")
+            return
+        else:
+            ring.set_default(args[0])
+        ring.save()
+        print(f"Keyring updated ({action} {args[0]})")
+    except (file_crypto.KeyringError, OSError, ValueError) as e:
+        print(f"key {action} failed: {e}")
+        return 1
 
 
-        elif user_input == "dir":
-            subprocess.run("dir", shell=True)
+def parse_translate_args(rest):
+    """`<from_lang> <to_lang> <text>`, checked before googletrans is loaded."""
+    parts = rest.split(None, 2)
+    if len(parts) < 3:
+        raise command_registry.UsageError
+    return parts
 
-        elif re.match(r"^color\(\s*[a-zA-Z]+\s*,\s*[a-zA-Z]+\s*\)$", user_input):
-            match = re.search(r"color\((.*),(.*)\)", user_input)
 
-            fg_color = match.group(1).strip()
-            bg_color = match.group(2).strip()
-            print(color(fg_color, bg_color))
+@command("translate", args=parse_translate_args, deps=(googletrans,), usage="usage: translate <from_lang> <to_lang> <text>")
+def translate_command(src, tgt, text):
+    translated = google_translate(text, src, tgt)
+    print(f"Translation results:{translated}")
+    if translated.startswith("Translation failed:"):
+        return 1
 
-        elif user_input == "calculator":
-            root = tk.Tk()
-            EnhancedCalculator(root)
-            root.mainloop()
 
-        elif user_input.lower().startswith("install"):
-            parts = user_input.split()
-            if len(parts) == 2:
-                install_module(parts[1])
-            else:
-                print("Usage: install <module-name>")
-
-        elif user_input == 'screenshot':
-            root = tk.Tk()
-            ScreenshotTool(root)
-            root.mainloop()
-
-        elif user_input == 'date':
-            date()
-
-        elif user_input.lower() == "X++" or "Xplusplus":
-            XplusplusInterpreter().repl()
-
-        elif user_input == "mode pro":
-            enter_pro_mode()
-
-
-
-        elif user_input == "linux":
-            # simple interactive helper for WSL usage
-            info = linux_sub.detect_wsl()
-            print("WSL detect:", info)
-            print("Installed WSL distros:", linux_sub.list_wsl_distros())
-            print("Commands: 'shell' (open wsl shell), 'run <cmd...>', 'runelf <path> [arg1 arg2]', 'install-wsl', 'back'")
-            while True:
-                cmd = input("linux> ").strip()
-                if not cmd:
-                    continue
-                if cmd in ("back", "exit", "quit", "q"):
-                    break
-                if cmd == "shell":
-                    # open interactive WSL shell in the same terminal (blocking)
-                    subprocess.run(["wsl"])
-                    continue
-                if cmd.startswith("run "):
-                    to_run = cmd.split(" ", 1)[1]
-                    rc, out = linux_sub.run_in_wsl(to_run.split(), capture_output=True)
-                    print(f"[rc={rc}]\n{out}")
-                    continue
-                if cmd.startswith("runelf "):
-                    parts = cmd.split()
-                    path = parts[1]
-                    args = parts[2:] if len(parts) > 2 else []
-                    rc, out = linux_sub.run_elf_with_wsl(path, args=args)
-                    print(f"[rc={rc}]\n{out}")
-                    continue
-                if cmd == "install-wsl":
-                    print("Attempting 'wsl --install' (requires admin). Output:")
-                    rc, out = linux_sub.install_wsl()
-                    print(out)
-                    continue
-                # fallback: run direct in wsl
-                rc, out = linux_sub.run_in_wsl(cmd.split(), capture_output=True)
-                print(f"[rc={rc}]\n{out}")
-
-
-
-        elif user_input.startswith("encrypt "):
-            path = user_input.split(" ", 1)[1]
-
-            def generate_key():
-                return Fernet.generate_key()
-
-            def save_key(key, path='secret.key'):
-                with open(path, 'wb') as f:
-                    f.write(key)
-
-            def encrypt_file(file_path, key):
-                fernet = Fernet(key)
-                with open(file_path, 'rb') as f:
-                    data = f.read()
-                encrypted = fernet.encrypt(data)
-                with open(file_path + '.enc', 'wb') as f:
-                    f.write(encrypted)
-
-            def encrypt_path(target_path, key):
-                if os.path.isfile(target_path):
-                    encrypt_file(target_path, key)
-                elif os.path.isdir(target_path):
-                    for root, dirs, files in os.walk(target_path):
-                        for file in files:
-                            full_path = os.path.join(root, file)
-                            encrypt_file(full_path, key)
-                else:
-                    print(f"Invalid path: {target_path}")
-
-            try:
-                key = generate_key()
-                save_key(key, "secret.key")
-                print("The encryption key is generated and saved as secret.key")
-                encrypt_path(path, key)
-                print(f" Encrypted Path: {path}")
-            except Exception as e:
-                print(f"Encryption failed: {e}")
-
-
-        elif user_input.startswith("decrypt "):
-            path = user_input.split(" ", 1)[1]
-            try:
-                key = load_key("secret.key")
-                decrypt_path(path, key)
-                print(f"Decryption completed: {path}")
-            except Exception as e:
-                print(f"Decryption failed: {e}")
-
-
-        elif user_input.startswith("translate"):
-            parts = user_input.split("", 3)
-            if len(parts) < 4:
-                print("usage: translate <from_lang> <to_lang> <text>")
-            else:
-                src = parts[1]
-                tgt = parts[2]
-                text = parts[3]
-                translated = google_translate(text, src, tgt)
-                print(f"Translation results:{translated}")
-
-        elif user_input.startswith("{search:") or user_input.startswith("{open:"):
-            handle_search_command(user_input)
-            continue
+for _engine in SEARCH_ENGINES:
+    registry.register_prefix(f"{{search:{_engine}}}:", lambda keyword, _engine=_engine: search_web(_engine, keyword))
+registry.register_prefix("{open:", open_url)
 
-        elif user_input.lower().startswith("open "):
-            try:
-                path = user_input[5:].strip().strip('"')  
-                if platform.system() == "Windows":
-                    os.startfile(path)
-                elif platform.system() == "Darwin":
-                    subprocess.run(["open", path])
 
-            except Exception as e:
-                print(f"Unable to open path: {path}")
-                print(f"Error details: {e}")
+@command("open", args="text")
+def open_command(path):
+    path = path.strip('"')
+    try:
+        if platform.system() == "Windows":
+            os.startfile(path)
+        elif platform.system() == "Darwin":
+            subprocess.run(["open", path])
+        else:
+            subprocess.run(["xdg-open", path])
+    except Exception as e:
+        print(f"Unable to open path: {path}")
+        print(f"Error details: {e}")
+        return 1
 
 
-        elif user_input.startswith("sandbox "):
-            from tools.sandbox.sandbox import Sandbox
-            code = user_input[len("sandbox "):]
+@command("sandbox", args="text")
+def sandbox_command(code):
+    from tools.sandbox.sandbox import Sandbox
+    sb = Sandbox(time_limit=2)
+    result = sb.run(code)
+    print(result)
 
-            sb = Sandbox(time_limit=2)
-            result = sb.run(code)
-            print(result)
 
+@command("edit", args="text")
+def edit_command(filename):
+    from tools.vim_integration import editor
+    editor.open_vim(filename or "untitled.xpp")
 
 
+@command("bridge start")
+def bridge_command():
+    from tools.ruby_bridge.bridge import PythonBridgeServer
+    bridge = PythonBridgeServer()
+    bridge.start()
+    print("Bridge is now active. Waiting for Ruby connections...")
 
-        elif user_input.startswith("edit"):
-            from tools.vim_integration import editor
-            args = user_input.split(" ", 1)
-            ilename = args[1] if len(args) > 1 else "untitled.xpp"
-            editor.open_vim('filename')
 
-        elif user_input == "bridge start":
-            from tools.ruby_bridge.bridge import PythonBridgeServer
-            bridge = PythonBridgeServer()
-            bridge.start()
-            print("Bridge is now active. Waiting for Ruby connections...")
+@command("ip", deps=(requests,))
+def ip_command():
+    return get_public_ip()
 
-            
 
-        elif user_input == "ip":
-            get_public_ip()
+@command("qrcode", args="argv", deps=(qrcode, Image),
+         usage="Usage: qrcode [gen <data> [-o out.png|svg] | batch <input.txt> <outdir> "
+               "[--format png|svg|pdf] [--jobs N] | cache stats|clear] [--no-cache] [--version V|auto] [--ecc L|M|Q|H] [--fg C] [--bg C] "
+               "[--logo PATH]")
+def qrcode_command(argv):
+    if argv:
+        try:
+            return qr_cli.main(argv)
+        except SystemExit as e:
+            if e.code:
+                raise command_registry.UsageError from None
+        return
+    lazy_import.preload(tk, ttk, ImageTk)
+    root = tk.Tk()
+    AdvancedQRGenerator(root)
+    root.mainloop()
 
 
-        elif user_input == 'qrcode':
+def unknown_command(user_input):
+    print(f"Error: Unknown command {user_input}，Enter 'help' to see the supported commands")
 
-            root = tk.Tk()
-            AdvancedQRGenerator(root)
-            root.mainloop()
 
+def run_command(line):
+    """
+    Strict dispatch for batch mode: unknown commands and usage errors raise,
+    a failed command returns its handler's nonzero status.
+    """
+    cmd, rest = registry.resolve(line)
+    if cmd is None:
+        raise batch_runner.UnknownCommand(line)
+    try:
+        return cmd(rest)
+    except command_registry.UsageError as e:
+        raise command_registry.UsageError(command_registry.usage_message(cmd, e)) from None
+
+
+def parse_arguments(argv):
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="OpenNCL.py",
+        description="OpenNCL command line. Without arguments the interactive shell starts.",
+        # taken out of sys.argv at the top of this file, before the startup imports it measures
+        epilog="--import-profile  print a per-module import cost table",
+    )
+    parser.add_argument("-c", dest="commands", action="append", metavar="CMD",
+                        help="run CMD non-interactively (may be given several times)")
+    parser.add_argument("script", nargs="?",
+                        help="file with one command per line, or '-' to stream commands from stdin")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                        help="run up to N independent lines in parallel (batch mode)")
+    return parser.parse_args(argv)
+
+
+def run_batch(args):
+    command_registry.load_plugins(registry, PLUGIN_DIR)
+    runner = batch_runner.BatchRunner(run_command, jobs=args.jobs)
+    if args.commands:
+        failures = runner.run(args.commands)
+    elif args.script == "-":
+        failures = runner.run(sys.stdin)
+    else:
+        try:
+            with open(args.script, "r", encoding="utf-8") as f:
+                failures = runner.run(f)
+        except OSError as e:
+            print(json.dumps({"line": 0, "command": None, "ok": False, "output": "", "error": str(e), "elapsed_ms": 0}))
+            failures = 1
+    if IMPORT_PROFILE:
+        # stderr, so the JSON result stream on stdout stays clean
+        print_import_profile(file=sys.stderr)
+        print_import_profile(lazy_only=True, file=sys.stderr)
+    return 1 if failures else 0
 
-        else:
-            print(f"Error: Unknown command {user_input}，Enter 'help' to see the supported commands")
+
+def main():
+    args = parse_arguments(sys.argv[1:])
+    if args.commands or args.script:
+        sys.exit(run_batch(args))
+
+    if IMPORT_PROFILE:
+        print_import_profile()
+    
+    print("[Version 3.0.5] ")
+    print('''
+    _______                        _____   _________________ 
+    __  __ \________ _____ _______ ___  | / /__  ____/___  / 
+    _  / / /___  __ \_  _ \__  __ \__   |/ / _  /     __  /  
+    / /_/ / __  /_/ //  __/_  / / /_  /|  /  / /___   _  /___
+    \____/  _  .___/ \___/ /_/ /_/ /_/ |_/   \____/   /_____/
+            /_/                                                                                                
+
+''')
+
+    command_registry.load_plugins(registry, PLUGIN_DIR)
+
+    while True:
+        current_path = os.getcwd()
+        user_input = input(f"{current_path}> ").strip()
+        if not user_input:
+            continue
+
+        result = registry.dispatch(user_input, on_unknown=unknown_command)
+        if result is command_registry.EXIT:
+            if IMPORT_PROFILE:
+                print_import_profile(lazy_only=True)
+            break
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,30 @@
+# tests/conftest.py
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the tests import the repo's packages (tools, Library) from the checkout
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def batch(tmp_path):
+    """
+    batch(*commands, options=()) runs `OpenNCL.py [options] -c ...` in tmp_path and
+    returns (exit status, result objects); batch.stderr holds the last run's stderr.
+    """
+    def run(*commands, options=()):
+        argv = [sys.executable, os.path.join(ROOT, "OpenNCL.py"), *options]
+        for command in commands:
+            argv += ["-c", command]
+        # never touch the checkout's Date/keyring.json
+        env = dict(os.environ, OPENNCL_KEYRING=str(tmp_path / "keyring.json"))
+        done = subprocess.run(argv, cwd=tmp_path, env=env, capture_output=True, text=True, timeout=120)
+        run.stderr = done.stderr
+        return done.returncode, [json.loads(line) for line in done.stdout.splitlines()]
+    return run
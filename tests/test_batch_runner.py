@@ -0,0 +1,64 @@
+# tests/test_batch_runner.py
+import io
+import json
+import subprocess
+import sys
+
+from Library.batch_runner import BatchRunner, UnknownCommand
+
+
+def _run(dispatch, lines):
+    out = io.StringIO()
+    failures = BatchRunner(dispatch, out=out).run(lines)
+    return failures, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_status_and_exceptions_decide_ok():
+    def dispatch(line):
+        if line == "fails":
+            print("fails: something went wrong")
+            return 1
+        if line == "raises":
+            raise ValueError("bad")
+        if line == "unknown":
+            raise UnknownCommand(line)
+        print(line)
+
+    failures, results = _run(dispatch, ["works", "fails", "raises", "unknown"])
+    assert failures == 3
+    assert [r["ok"] for r in results] == [True, False, False, False]
+    assert results[1]["error"] == "failed with status 1"
+    assert results[1]["output"] == "fails: something went wrong\n"
+    assert results[2]["error"] == "ValueError: bad"
+
+
+def test_failing_encrypt_is_reported(tmp_path, batch):
+    missing = tmp_path / "missing.txt"
+    status, results = batch(f"encrypt {missing}", "encrypt", "date")
+    assert status == 1
+    assert [r["ok"] for r in results] == [False, False, True]
+    assert results[0]["error"].startswith(f"UsageError: encrypt: {missing}: no such file or directory")
+    assert results[1]["error"].startswith("UsageError: Usage: encrypt")
+    assert not (tmp_path / "keyring.json").exists()
+
+
+def test_encrypt_uses_the_keyring_override(tmp_path, batch):
+    (tmp_path / "plain.txt").write_text("secret", encoding="utf-8")
+    status, results = batch(f"encrypt {tmp_path / 'plain.txt'}")
+    assert status == 0 and results[0]["ok"]
+    assert (tmp_path / "plain.txt.enc").exists()
+    assert (tmp_path / "keyring.json").exists()
+
+
+def test_child_process_output_stays_out_of_the_result_stream(tmp_path, capfd):
+    def dispatch(line):
+        subprocess.run([sys.executable, "-c", "print('from the child')"], check=True)
+
+    with open(tmp_path / "results.jsonl", "w", encoding="utf-8") as out:
+        failures = BatchRunner(dispatch, out=out).run(["child"])
+    captured = capfd.readouterr()
+    assert failures == 0
+    assert "from the child" in captured.err
+    assert "from the child" not in captured.out
+    results = (tmp_path / "results.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(results) == 1 and json.loads(results[0])["ok"]
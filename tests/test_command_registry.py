@@ -0,0 +1,47 @@
+# tests/test_command_registry.py
+import pytest
+
+from Library.command_registry import CommandRegistry, UsageError, parse_argv
+
+
+def test_parse_argv_keeps_quoted_words_together():
+    assert parse_argv('gen "hello world" -o out.png') == (["gen", "hello world", "-o", "out.png"],)
+    assert parse_argv("run 'my scripts/a.xpp' --vm") == (["run", "my scripts/a.xpp", "--vm"],)
+    assert parse_argv("") == ([],)
+
+
+def test_parse_argv_unbalanced_quote_is_a_usage_error():
+    with pytest.raises(UsageError):
+        parse_argv('gen "hello')
+
+
+def test_argv_command_receives_shell_words(capsys):
+    registry = CommandRegistry()
+    seen = []
+    registry.register("echo", seen.append, args="argv", usage="Usage: echo <words>")
+    registry.dispatch('echo "a b" c')
+    registry.dispatch('echo "a b')
+    assert seen == [["a b", "c"]]
+    assert "Usage: echo <words>" in capsys.readouterr().out
+
+
+def test_qrcode_gen_and_xpp_run_accept_quoted_arguments(tmp_path, batch):
+    folder = tmp_path / "with space"
+    folder.mkdir()
+    (folder / "hello.xpp").write_text('print("hi from xpp")\n', encoding="utf-8")
+    png = folder / "hello world.png"
+    status, results = batch(
+        f'qrcode gen "hello world" -o "{png}" --no-cache',
+        f'xpp run "{folder / "hello.xpp"}" --no-cache',
+    )
+    assert status == 0, results
+    assert png.exists()
+    assert results[1]["output"] == "hi from xpp\n"
+
+
+
+def test_translate_checks_arguments_before_loading_googletrans(batch):
+    status, results = batch("translate en", options=["--import-profile"])
+    assert status == 1
+    assert results[0]["error"] == "UsageError: usage: translate <from_lang> <to_lang> <text>"
+    assert "googletrans" not in batch.stderr
@@ -0,0 +1,90 @@
+# tests/test_disk_usage.py
+import os
+import shutil
+
+from tools.disk_usage import StatsCache, dir_stats, directory_size
+
+
+def _write(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+
+def _touch_dir(path, seconds):
+    # pin the directory mtime so the test does not depend on timestamp granularity
+    os.utime(path, ns=(seconds * 10**9, seconds * 10**9))
+
+
+def _tree(root):
+    _write(str(root / "top.txt"), 10)
+    _write(str(root / "a" / "one.bin"), 100)
+    _write(str(root / "a" / "deep" / "two.bin"), 200)
+    _write(str(root / "b" / "three.bin"), 300)
+    for n, sub in enumerate(("a/deep", "a", "b", ".")):
+        _touch_dir(str(root / sub), 1000 + n)
+
+
+def test_totals_and_buckets(tmp_path):
+    _tree(tmp_path)
+    stats = dir_stats(str(tmp_path), jobs=4)
+    assert (stats.files, stats.dirs, stats.bytes) == (4, 3, 610)
+    assert stats.children == {"(files)": [1, 10], "a": [2, 300], "b": [1, 300]}
+    assert stats.cached == 0 and not stats.errors
+    assert directory_size(str(tmp_path / "a")) == 300
+
+
+def test_unchanged_tree_is_answered_from_the_cache(tmp_path):
+    root = tmp_path / "root"
+    _tree(root)
+    cache = StatsCache(str(tmp_path / "cache.json"))
+    first = dir_stats(str(root), cache=cache)
+    assert first.cached == 0
+    assert set(cache.dirs) == {str(root), str(root / "a"), str(root / "a" / "deep"), str(root / "b")}
+
+    again = dir_stats(str(root), cache=StatsCache(cache.path))
+    assert again.cached == 4
+    assert (again.files, again.dirs, again.bytes) == (first.files, first.dirs, first.bytes)
+    assert again.children == first.children
+
+
+def test_new_entry_invalidates_only_its_directory(tmp_path):
+    root = tmp_path / "root"
+    _tree(root)
+    cache = StatsCache(str(tmp_path / "cache.json"))
+    dir_stats(str(root), cache=cache)
+
+    _write(str(root / "a" / "deep" / "new.bin"), 50)
+    _touch_dir(str(root / "a" / "deep"), 2000)
+    stats = dir_stats(str(root), cache=cache)
+    assert stats.cached == 3
+    assert (stats.files, stats.bytes) == (5, 660)
+    assert stats.children["a"] == [3, 350]
+    assert cache.dirs[str(root / "a" / "deep")][:3] == [2000 * 10**9, 2, 250]
+
+
+def test_in_place_rewrite_needs_a_fresh_scan(tmp_path):
+    root = tmp_path / "root"
+    _tree(root)
+    cache = StatsCache(str(tmp_path / "cache.json"))
+    dir_stats(str(root), cache=cache)
+
+    _write(str(root / "b" / "three.bin"), 3000)
+    _touch_dir(str(root / "b"), 1002)       # rewriting a file leaves the directory mtime alone
+    assert dir_stats(str(root), cache=cache).bytes == 610
+    fresh = dir_stats(str(root), cache=cache, refresh=True)
+    assert fresh.cached == 0 and fresh.bytes == 3310
+    assert dir_stats(str(root), cache=cache).bytes == 3310
+
+
+def test_removed_directories_are_pruned(tmp_path):
+    root = tmp_path / "root"
+    _tree(root)
+    cache = StatsCache(str(tmp_path / "cache.json"))
+    dir_stats(str(root), cache=cache)
+
+    shutil.rmtree(str(root / "a"))
+    _touch_dir(str(root), 3000)
+    stats = dir_stats(str(root), cache=cache)
+    assert (stats.files, stats.dirs, stats.bytes) == (2, 1, 310)
+    assert set(StatsCache(cache.path).dirs) == {str(root), str(root / "b")}
@@ -0,0 +1,158 @@
+# tests/test_file_crypto.py
+import os
+
+import pytest
+from cryptography.fernet import Fernet
+
+from tools.file_crypto import CryptoFormatError, Keyring, decrypt_file, decrypt_tree, encrypt_file, encrypt_tree
+from tools.file_crypto import parallel
+from tools.file_crypto.container import HEADER, TAG_SIZE, read_header
+
+CHUNK = 64
+KEY = Fernet.generate_key()
+OTHER_KEY = Fernet.generate_key()
+
+
+def _payload(size):
+    return bytes(i * 7 % 251 for i in range(size))
+
+
+def _encrypted(tmp_path, data, key=KEY):
+    src, enc = tmp_path / "plain.bin", tmp_path / "plain.bin.enc"
+    src.write_bytes(data)
+    encrypt_file(str(src), str(enc), key, chunk_size=CHUNK)
+    return enc
+
+
+def _decrypt(enc, keys=KEY):
+    out = enc.with_suffix(".out")
+    decrypt_file(str(enc), str(out), keys)
+    return out.read_bytes()
+
+
+# ---------------- container ----------------
+@pytest.mark.parametrize("size", [0, 1, CHUNK - 1, CHUNK, CHUNK + 1, 3 * CHUNK, 3 * CHUNK + 5])
+def test_round_trip_across_chunk_boundaries(tmp_path, size):
+    data = _payload(size)
+    enc = _encrypted(tmp_path, data)
+    frames = size // CHUNK + 1
+    assert enc.stat().st_size == HEADER.size + size + frames * TAG_SIZE
+    assert _decrypt(enc) == data
+
+
+def _damage(enc, edit):
+    raw = bytearray(enc.read_bytes())
+    enc.write_bytes(edit(raw))
+
+
+def _swap_first_frames(raw):
+    frame = CHUNK + TAG_SIZE
+    a, b = HEADER.size, HEADER.size + frame
+    raw[a:a + frame], raw[b:b + frame] = raw[b:b + frame], raw[a:a + frame]
+    return raw
+
+
+def _flip_last_byte(raw):
+    raw[-1] ^= 1
+    return raw
+
+
+@pytest.mark.parametrize("edit", [
+    _flip_last_byte,                                    # tampered tag
+    lambda raw: raw[:-3],                               # truncated final chunk
+    lambda raw: raw[:-(5 + TAG_SIZE)],                  # final frame dropped at a frame boundary
+    _swap_first_frames,                                 # frames reordered
+], ids=["tag", "truncated", "dropped-final-frame", "swapped"])
+def test_damaged_container_is_rejected(tmp_path, edit):
+    enc = _encrypted(tmp_path, _payload(3 * CHUNK + 5))
+    _damage(enc, edit)
+    with pytest.raises(CryptoFormatError):
+        _decrypt(enc)
+    assert not enc.with_suffix(".out").exists()
+
+
+def test_legacy_fernet_files_still_decrypt(tmp_path):
+    enc = tmp_path / "old.txt.enc"
+    enc.write_bytes(Fernet(KEY).encrypt(b"written before the container"))
+    assert _decrypt(enc) == b"written before the container"
+    ring = Keyring(str(tmp_path / "keyring.json"), {"new": OTHER_KEY, "old": KEY}, default="new")
+    assert _decrypt(enc, ring) == b"written before the container"
+    with pytest.raises(CryptoFormatError):
+        _decrypt(enc, OTHER_KEY)
+
+
+# ---------------- keyring ----------------
+def test_keyring_picks_the_key_by_id(tmp_path):
+    enc = _encrypted(tmp_path, b"for the other key", OTHER_KEY)
+    ring = Keyring(str(tmp_path / "keyring.json"), {"main": KEY, "other": OTHER_KEY}, default="main")
+    assert _decrypt(enc, ring) == b"for the other key"
+    assert ring.name_of(read_header(str(enc)).key_id) == "other"
+
+
+def test_unknown_key_id_is_an_error(tmp_path):
+    enc = _encrypted(tmp_path, b"secret", OTHER_KEY)
+    ring = Keyring(str(tmp_path / "keyring.json"), {"main": KEY}, default="main")
+    with pytest.raises(CryptoFormatError, match="no key in the keyring"):
+        _decrypt(enc, ring)
+    with pytest.raises(CryptoFormatError, match="different key"):
+        _decrypt(enc, KEY)
+
+
+# ---------------- trees ----------------
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    # small enough that the 1000-byte file is split into several frame ranges
+    monkeypatch.setattr(parallel, "SPLIT_SIZE", 1000)
+    monkeypatch.setattr(parallel, "RANGE_CHUNKS", 2)
+    root = tmp_path / "tree"
+    (root / "sub").mkdir(parents=True)
+    files = {
+        "big.bin": _payload(1000 + 3 * CHUNK + 9),
+        "small.txt": b"hello",
+        "empty": b"",
+        os.path.join("sub", "nested.txt"): _payload(CHUNK * 2),
+    }
+    for name, data in files.items():
+        (root / name).write_bytes(data)
+    return root, files
+
+
+def _encrypt_tree(root, jobs=1):
+    return encrypt_tree(str(root), KEY, jobs, chunk_size=CHUNK, progress=False)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_tree_round_trip_with_split_files(tree, jobs):
+    root, files = tree
+    summary = _encrypt_tree(root, jobs)
+    assert summary.errors == [] and summary.files == len(files)
+    for name in files:
+        os.rename(root / f"{name}.enc", root / f"{name}.copy.enc")
+        os.remove(root / name)
+    summary = decrypt_tree(str(root), KEY, jobs, progress=False)
+    assert summary.errors == [] and summary.files == len(files)
+    for name, data in files.items():
+        assert (root / f"{name}.copy").read_bytes() == data
+
+
+def test_manifest_skips_unchanged_files_and_removes_stale_outputs(tree):
+    root, files = tree
+    _encrypt_tree(root)
+    again = _encrypt_tree(root)
+    assert (again.files, again.skipped) == (0, len(files))
+
+    # touched but identical content: the hash decides it is unchanged
+    os.utime(root / "small.txt", ns=(1, 1))
+    (root / "big.bin").write_bytes(_payload(1200))
+    os.remove(root / "empty")
+    third = _encrypt_tree(root)
+    assert third.files == 1 and third.skipped == len(files) - 2 and third.removed == 1
+    assert not (root / "empty.enc").exists()
+    assert _decrypt(root / "big.bin.enc") == _payload(1200)
+
+
+def test_manifest_is_reset_by_a_different_key(tree):
+    root, files = tree
+    _encrypt_tree(root)
+    summary = encrypt_tree(str(root), OTHER_KEY, 1, chunk_size=CHUNK, progress=False)
+    assert summary.files == len(files) and summary.skipped == 0
@@ -0,0 +1,42 @@
+# tests/test_keyring.py
+import pytest
+
+from tools.file_crypto import KeyringError, open_keyring
+
+
+def test_lookup_in_missing_keyring_raises_without_creating_a_key(tmp_path):
+    path = tmp_path / "keyring.json"
+    with pytest.raises(KeyringError):
+        open_keyring(str(path), legacy_key=None)
+    assert not path.exists()
+
+
+def test_encrypt_creates_the_default_key_once(tmp_path):
+    path = str(tmp_path / "keyring.json")
+    ring = open_keyring(path, legacy_key=None, create=True)
+    assert ring.names() == ["default"]
+    assert open_keyring(path, legacy_key=None).get() == ring.get()
+
+
+def test_key_new_starts_from_an_empty_keyring(tmp_path):
+    path = str(tmp_path / "keyring.json")
+    ring = open_keyring(path, legacy_key=None, allow_empty=True)
+    assert ring.names() == []
+    ring.create("work")
+    ring.save()
+    assert open_keyring(path, legacy_key=None).names() == ["work"]
+
+
+def test_legacy_secret_key_is_imported(tmp_path):
+    legacy = tmp_path / "secret.key"
+    legacy.write_bytes(b"x" * 43 + b"=")
+    ring = open_keyring(str(tmp_path / "keyring.json"), legacy_key=str(legacy))
+    assert ring.get() == legacy.read_bytes()
+
+
+def test_decrypt_on_a_fresh_checkout_fails(tmp_path, batch):
+    (tmp_path / "data.enc").write_bytes(b"not really encrypted")
+    status, results = batch(f"decrypt {tmp_path / 'data.enc'}")
+    assert status == 1
+    assert "no keys in" in results[0]["output"]
+    assert not (tmp_path / "keyring.json").exists()
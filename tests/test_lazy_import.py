@@ -0,0 +1,13 @@
+# tests/test_lazy_import.py
+from Library.lazy_import import ImportProfiler
+
+
+def test_report_ranks_modules_by_self_time():
+    profiler = ImportProfiler()
+    # a cheap package that imports an expensive module: large inclusive, small self time
+    profiler.record("package", 0.500, 0.010)
+    profiler.record("package.slow", 0.490, 0.490)
+    profiler.record("other", 0.050, 0.050)
+    lines = profiler.report(top=2).splitlines()
+    assert [line.split()[0] for line in lines[3:5]] == ["package.slow", "other"]
+    assert lines[-1].split()[-1] == "540.00"
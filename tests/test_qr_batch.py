@@ -0,0 +1,81 @@
+# tests/test_qr_batch.py
+import os
+import threading
+
+from tools.qr import batch
+from tools.qr.batch import count_lines, output_name, read_lines, run_batch
+from tools.qr.encoder import QROptions
+from tools.qr.export import code_bytes
+
+OPTIONS = QROptions()
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_lines_are_numbered_skipping_blanks(tmp_path):
+    source = tmp_path / "codes.txt"
+    source.write_text("alpha\n\n  beta  \n\ngamma\n", encoding="utf-8")
+    assert list(read_lines(str(source))) == ["alpha", "beta", "gamma"]
+    assert count_lines(str(source)) == 3
+
+    out = tmp_path / "out"
+    summary = run_batch(read_lines(str(source)), str(out), OPTIONS, total=3, cache_dir=None)
+    assert (summary.codes, summary.errors, summary.processed) == (3, [], 3)
+    assert sorted(os.listdir(out)) == [output_name(n) for n in (1, 2, 3)]
+    assert _read(out / output_name(2)) == code_bytes("beta", OPTIONS)
+
+
+def test_errors_are_reported_per_line(tmp_path):
+    summary = run_batch(["ok", "", "fine"], str(tmp_path), OPTIONS, cache_dir=None)
+    assert summary.codes == 2
+    assert summary.errors == [(2, "ValueError: Content cannot be empty")]
+    assert "line 2: ValueError" in summary.report()
+
+
+def test_duplicates_come_from_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, "_caches", {})
+    cache_dir = str(tmp_path / "cache")
+    summary = run_batch(["same", "same", "other", "same"], str(tmp_path / "out"), OPTIONS,
+                        cache_dir=cache_dir, fmt="svg")
+    assert summary.codes == 4
+    assert (summary.cache_hits, summary.cache_misses) == (2, 2)
+    assert summary.hit_rate() == 0.5
+    assert _read(tmp_path / "out" / output_name(4, "svg")) == code_bytes("same", OPTIONS, "svg")
+
+
+def test_pool_matches_inline(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, "BATCH_LINES", 3)
+    lines = [f"code {n}" for n in range(10)]
+    inline = run_batch(lines, str(tmp_path / "inline"), OPTIONS, cache_dir=None)
+    pooled = run_batch(lines, str(tmp_path / "pool"), OPTIONS, jobs=2, cache_dir=None)
+    assert inline.codes == pooled.codes == 10
+    for n in range(1, 11):
+        name = output_name(n)
+        assert _read(tmp_path / "inline" / name) == _read(tmp_path / "pool" / name)
+
+
+def test_cancel_stops_between_tasks(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, "BATCH_LINES", 2)
+    cancel = threading.Event()
+    seen = []
+
+    def progress(summary):
+        seen.append(summary.processed)
+        cancel.set()
+
+    summary = run_batch([f"code {n}" for n in range(10)], str(tmp_path), OPTIONS,
+                        progress=progress, cancel=cancel, cache_dir=None)
+    assert summary.cancelled
+    assert seen == [2] and summary.codes == 2
+    assert "(cancelled)" in summary.report()
+
+
+def test_pdf_batch_writes_one_sheet(tmp_path):
+    summary = run_batch([f"code {n}" for n in range(25)], str(tmp_path), OPTIONS, cache_dir=None, fmt="pdf")
+    assert summary.codes == 25
+    path, pages = summary.sheet
+    assert os.path.basename(path) == "qrcodes.pdf" and pages == 2
+    assert os.listdir(tmp_path) == ["qrcodes.pdf"]
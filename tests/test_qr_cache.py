@@ -0,0 +1,40 @@
+# tests/test_qr_cache.py
+import os
+
+from tools.qr.cache import QRCache, cache_key
+from tools.qr.encoder import QROptions
+
+OPTIONS = QROptions()
+
+
+def _age(cache, content, seconds):
+    path = cache.path_for(cache_key(content, OPTIONS))
+    os.utime(path, (seconds, seconds))
+
+
+def test_store_is_capped_least_recently_used_first(tmp_path):
+    cache = QRCache(str(tmp_path), memory_items=0, max_bytes=None)
+    for n in range(4):
+        cache.get(f"code {n}", OPTIONS)
+        _age(cache, f"code {n}", 1000 + n)
+    one = os.path.getsize(cache.path_for(cache_key("code 0", OPTIONS)))
+    # code 0 is the oldest but is read again, which makes it the most recent
+    cache.get("code 0", OPTIONS)
+    assert cache.disk_hits == 1
+
+    capped = QRCache(str(tmp_path), memory_items=0, max_bytes=int(4.5 * one))
+    capped.get("code 4", OPTIONS)
+    assert capped.evicted >= 1
+    assert capped.size() <= capped.max_bytes
+    left = {os.path.basename(p) for p in capped.entries()}
+    assert f"{cache_key('code 1', OPTIONS)}.png" not in left
+    assert f"{cache_key('code 0', OPTIONS)}.png" in left
+    assert f"{cache_key('code 4', OPTIONS)}.png" in left
+
+
+def test_uncapped_store_keeps_everything(tmp_path):
+    cache = QRCache(str(tmp_path), memory_items=0, max_bytes=None)
+    for n in range(3):
+        cache.get(f"code {n}", OPTIONS)
+    assert len(cache.entries()) == 3
+    assert cache.evicted == 0
@@ -0,0 +1,63 @@
+# tests/test_qr_capacity.py
+import pytest
+import qrcode
+from qrcode import util
+from qrcode.exceptions import DataOverflowError
+
+from tools.qr.capacity import CAPACITY, DATA_BITS, capacity, fit_version
+from tools.qr.encoder import ECC_LEVELS
+
+# ISO/IEC 18004 table 7: (version, ecc) -> numeric, alphanumeric, byte characters
+SPEC_LIMITS = {
+    (1, "L"): (41, 25, 17),
+    (10, "M"): (513, 311, 213),
+    (40, "H"): (3057, 1852, 1273),
+}
+MODES = (("numeric", "7"), ("alphanumeric", "A"), ("byte", "a"))
+
+
+@pytest.mark.parametrize("version, ecc", sorted(SPEC_LIMITS))
+def test_spec_capacities(version, ecc):
+    expected = SPEC_LIMITS[version, ecc]
+    assert tuple(capacity(version, ecc, mode) for mode, _ in MODES) == expected
+
+
+@pytest.mark.parametrize("ecc", list(ECC_LEVELS))
+def test_data_bits_match_qrcode(ecc):
+    assert list(DATA_BITS[ecc]) == util.BIT_LIMIT_TABLE[ECC_LEVELS[ecc]][1:41]
+
+
+def _best_fit(data, ecc):
+    qr = qrcode.QRCode(error_correction=ECC_LEVELS[ecc])
+    qr.add_data(data, optimize=0)
+    try:
+        return qr.best_fit()
+    except (DataOverflowError, ValueError):     # qrcode raises ValueError for "version 41"
+        return None
+
+
+def _fit_version(data, ecc):
+    qr = qrcode.QRCode(error_correction=ECC_LEVELS[ecc])
+    qr.add_data(data, optimize=0)
+    try:
+        return fit_version(qr.data_list, ecc)
+    except DataOverflowError:
+        return None
+
+
+@pytest.mark.parametrize("ecc", list(ECC_LEVELS))
+@pytest.mark.parametrize("mode, char", MODES)
+def test_fit_version_agrees_with_best_fit_at_every_boundary(ecc, mode, char):
+    for version in range(1, 41):
+        limit = CAPACITY[ecc][mode][version - 1]
+        for length in (limit - 1, limit, limit + 1):
+            expected = _best_fit(char * length, ecc)
+            assert _fit_version(char * length, ecc) == expected, (version, length)
+        assert _fit_version(char * limit, ecc) == version
+
+
+def test_fit_version_respects_start():
+    qr = qrcode.QRCode()
+    qr.add_data("hello")
+    assert fit_version(qr.data_list, "M") == 1
+    assert fit_version(qr.data_list, "M", start=6) == 6
@@ -0,0 +1,94 @@
+# tests/test_qr_export.py
+import io
+import re
+import struct
+import xml.etree.ElementTree as ET
+
+import pytest
+from PIL import Image
+
+from tools.qr.encoder import QROptions, make_qr
+from tools.qr.export import PdfSheet, code_bytes, png_image_object
+
+OPTIONS = QROptions(box_size=4)
+
+
+def _ihdr(png):
+    width, height, depth, color = struct.unpack(">IIBB", png[16:26])
+    return width, height, depth, color
+
+
+def test_png_is_one_bit_palette():
+    png = code_bytes("one bit", OPTIONS)
+    qr = make_qr("one bit", OPTIONS)
+    side = len(qr.get_matrix()) * OPTIONS.box_size
+    assert _ihdr(png) == (side, side, 1, 3)
+    img = Image.open(io.BytesIO(png)).convert("RGB")
+    assert img.tobytes() == qr.make_image().convert("RGB").tobytes()
+
+
+def test_png_with_a_logo_is_rgb(tmp_path):
+    logo = tmp_path / "logo.png"
+    Image.new("RGB", (50, 50), (255, 0, 0)).save(logo)
+    png = code_bytes("logo", QROptions(logo=str(logo)))
+    assert _ihdr(png)[2:] == (8, 2)
+
+
+def test_svg_is_valid_and_matches_the_matrix():
+    svg = code_bytes("vector", OPTIONS, "svg")
+    root = ET.fromstring(svg)
+    ns = "{http://www.w3.org/2000/svg}"
+    matrix = make_qr("vector", OPTIONS).get_matrix()
+    n = len(matrix)
+    assert root.tag == f"{ns}svg"
+    assert root.get("viewBox") == f"0 0 {n} {n}"
+    assert root.get("width") == str(n * OPTIONS.box_size)
+    path = root.find(f"{ns}path")
+    dark = sum(int(w) for w in re.findall(r"h(\d+)v", path.get("d")))
+    assert dark == sum(map(sum, matrix))
+
+
+def _objects(pdf):
+    """{object number: offset} from the xref table, checked against the file."""
+    startxref = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", pdf).group(1))
+    assert pdf[startxref:].startswith(b"xref\n0 ")
+    count = int(pdf[startxref:].split(b"\n")[1].split()[1])
+    rows = pdf[startxref:].split(b"\n")[3:2 + count]
+    offsets = {n: int(row[:10]) for n, row in enumerate(rows, 1)}
+    for n, offset in offsets.items():
+        assert pdf[offset:].startswith(f"{n} 0 obj\n".encode())
+    return offsets
+
+
+def test_pdf_sheet_is_a_valid_multi_page_file(tmp_path):
+    path = tmp_path / "sheet.pdf"
+    sheet = PdfSheet(str(path))
+    per_page = PdfSheet.COLUMNS * PdfSheet.ROWS
+    for n in range(per_page + 3):
+        sheet.add(f"{n}: (code) \\ {n}", code_bytes(f"code {n}", OPTIONS))
+    assert sheet.close() == 2
+    assert sheet.close() == 2
+    pdf = path.read_bytes()
+    assert pdf.startswith(b"%PDF-1.4\n")
+    offsets = _objects(pdf)
+    assert len(offsets) == sheet.next_id - 1
+    assert pdf.count(b"/Type /Page ") == 2
+    assert b"/Count 2" in pdf
+    assert pdf.count(b"/Subtype /Image") == per_page + 3
+
+
+def test_image_object_reuses_the_png_data():
+    png = code_bytes("embedded", OPTIONS)
+    header, data = png_image_object(png)
+    assert "/ColorSpace [/Indexed /DeviceRGB 1 <ffffff000000>]" in header
+    assert "/BitsPerComponent 1" in header and f"/Length {len(data)}" in header
+    assert data in png
+
+
+def test_image_object_rejects_other_images():
+    with pytest.raises(ValueError, match="not a PNG"):
+        png_image_object(b"GIF89a")
+    buffer = io.BytesIO()
+    Image.new("RGBA", (4, 4)).save(buffer, "PNG")
+    with pytest.raises(ValueError, match="alpha"):
+        png_image_object(buffer.getvalue())
@@ -0,0 +1,66 @@
+# tests/test_qr_history.py
+import os
+import time
+
+from PIL import Image
+
+from tools.qr import history
+from tools.qr.history import QRHistory
+
+
+def _code(n):
+    return Image.new("RGB", (500, 500), (n, n, n))
+
+
+def test_thumbnails_are_kept_newest_first(tmp_path):
+    h = QRHistory(str(tmp_path), memory_items=10, thumbnail_size=(100, 100))
+    label, dropped = h.add("x" * 60, _code(1))
+    h.add("second", _code(2))
+    assert dropped == 0 and label.endswith(" - " + "x" * 50 + "...")
+    assert h.entries[0].label.endswith(" - second")
+    assert h.image(0).size == (100, 100)
+    assert h.image(1).getpixel((0, 0)) == (1, 1, 1)
+    assert not os.listdir(tmp_path)
+
+
+def test_palette_codes_are_thumbnailed_as_rgb(tmp_path):
+    h = QRHistory(str(tmp_path), thumbnail_size=(100, 100))
+    h.add("palette", _code(0).convert("P"))
+    assert h.image(0).mode == "RGB"
+
+
+def test_older_entries_spill_to_disk_and_read_back(tmp_path):
+    h = QRHistory(str(tmp_path), memory_items=2, thumbnail_size=(50, 50))
+    for n in range(5):
+        h.add(f"code {n}", _code(n))
+    assert len(h) == 5 and h.in_memory() == 2
+    assert len(os.listdir(h.directory)) == 3
+    # entry 4 is the oldest, code 0
+    assert h.image(4).getpixel((0, 0)) == (0, 0, 0)
+    assert h.image(2).getpixel((0, 0)) == (2, 2, 2)
+
+
+def test_past_max_items_the_oldest_are_dropped(tmp_path):
+    h = QRHistory(str(tmp_path), memory_items=1, max_items=3, thumbnail_size=(50, 50))
+    drops = [h.add(f"code {n}", _code(n))[1] for n in range(5)]
+    assert drops == [0, 0, 0, 1, 1]
+    assert len(h) == 3
+    assert len(os.listdir(h.directory)) == 2
+    assert h.image(2).getpixel((0, 0)) == (2, 2, 2)
+
+
+def test_close_removes_the_session_and_stale_ones(tmp_path):
+    stale = tmp_path / "session-old"
+    stale.mkdir()
+    old = time.time() - history.STALE_AFTER - 60
+    os.utime(stale, (old, old))
+    fresh = tmp_path / "session-other"
+    fresh.mkdir()
+
+    h = QRHistory(str(tmp_path), memory_items=0, thumbnail_size=(50, 50))
+    h.add("spilled", _code(0))
+    assert not stale.exists() and fresh.exists()
+    directory = h.directory
+    h.close()
+    assert not os.path.exists(directory) and len(h) == 0
+    assert os.listdir(tmp_path) == ["session-other"]
@@ -0,0 +1,53 @@
+# tests/test_qr_logo.py
+import os
+
+import pytest
+from PIL import Image
+
+from tools.qr import logo
+from tools.qr.encoder import QROptions, make_image
+
+
+@pytest.fixture
+def logo_file(tmp_path):
+    logo.clear_cache()
+    path = tmp_path / "logo.png"
+    Image.new("RGBA", (200, 100), (255, 0, 0, 255)).save(path)
+    yield str(path)
+    logo.clear_cache()
+
+
+def test_prepared_logo_is_scaled_and_masked(logo_file):
+    image, mask = logo.prepared_logo(logo_file, 80)
+    assert image.mode == "RGB" and image.size == (80, 40)
+    assert mask.mode == "L" and mask.size == (80, 40)
+    assert mask.getpixel((0, 0)) == 0 and mask.getpixel((40, 20)) == 255
+    assert logo.prepared_logo(logo_file, 80, "RGBA")[0].mode == "RGBA"
+
+
+def test_repeat_lookups_hit_the_cache(logo_file):
+    first = logo.prepared_logo(logo_file, 80)
+    assert logo.prepared_logo(os.path.relpath(logo_file), 80.6) is first
+    assert logo.cache_info().hits == 1
+    assert logo.prepared_logo(logo_file, 60) is not first
+    assert logo.cache_info().misses == 2
+
+
+def test_edited_logo_file_is_picked_up(logo_file):
+    before, _ = logo.prepared_logo(logo_file, 80)
+    Image.new("RGBA", (100, 100), (0, 0, 255, 255)).save(logo_file)
+    st = os.stat(logo_file)
+    os.utime(logo_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    after, _ = logo.prepared_logo(logo_file, 80)
+    assert after is not before
+    assert after.size == (80, 80) and after.getpixel((40, 40)) == (0, 0, 255)
+
+
+def test_codes_with_a_logo_are_unchanged_by_the_cache(logo_file):
+    options = QROptions(logo=logo_file)
+    first = make_image("with a logo", options)
+    again = make_image("with a logo", options)
+    assert logo.cache_info().hits >= 1
+    assert first.tobytes() == again.tobytes()
+    centre = (first.size[0] // 2, first.size[1] // 2)
+    assert first.getpixel(centre) == (255, 0, 0)
@@ -0,0 +1,51 @@
+# tests/test_qr_render.py
+import pytest
+
+from tools.qr import render
+from tools.qr.encoder import QROptions, make_qr
+from tools.qr.render import render_matrix, render_qr
+
+CASES = [
+    ("hello", QROptions()),
+    ("https://example.org/" + "x" * 300, QROptions(ecc="H", box_size=3, border=1)),
+    ("colours", QROptions(fg="#1a2b3c", bg="yellow", box_size=1, border=0)),
+]
+
+
+def _reference(qr, options):
+    return qr.make_image(fill_color=options.fg, back_color=options.bg).convert("RGB")
+
+
+@pytest.fixture(params=["numpy", "pure python"])
+def backend(request, monkeypatch):
+    if request.param == "pure python":
+        monkeypatch.setattr(render, "np", None)
+    elif render.np is None:
+        pytest.skip("NumPy is not installed")
+    return request.param
+
+
+@pytest.mark.parametrize("content,options", CASES)
+def test_render_is_pixel_identical_to_qrcode(backend, content, options):
+    qr = make_qr(content, options)
+    img = render_qr(qr, options.fg, options.bg)
+    expected = _reference(qr, options)
+    assert img.mode == "RGB" and img.size == expected.size
+    assert img.tobytes() == expected.tobytes()
+
+
+def test_palette_mode_skips_the_conversion(backend):
+    qr = make_qr("palette", QROptions())
+    img = render_qr(qr, mode="P")
+    assert img.mode == "P"
+    assert img.getpalette()[:6] == [255, 255, 255, 0, 0, 0]
+    assert img.convert("RGB").tobytes() == render_qr(qr).tobytes()
+
+
+def test_render_matrix_scales_each_module(backend):
+    img = render_matrix([[True, False], [False, True]], 3, fg=(255, 0, 0), bg=(0, 0, 255))
+    assert img.size == (6, 6)
+    rgb = img.convert("RGB")
+    assert rgb.getpixel((2, 2)) == (255, 0, 0)
+    assert rgb.getpixel((3, 2)) == (0, 0, 255)
+    assert rgb.getpixel((5, 5)) == (255, 0, 0)
@@ -0,0 +1,147 @@
+# tests/test_tomlang_modules.py
+import io
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from tools.tomlang_modules import Lockfile, install, read_manifest
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "test", "GIT_AUTHOR_EMAIL": "test@example.com",
+    "GIT_COMMITTER_NAME": "test", "GIT_COMMITTER_EMAIL": "test@example.com",
+}
+
+
+def _git(repo, *args):
+    done = subprocess.run(["git", *args], cwd=repo, capture_output=True, text=True, check=True,
+                          env=dict(os.environ, **GIT_ENV))
+    return done.stdout.strip()
+
+
+def _commit(repo, name, text):
+    (repo / name).write_text(text, encoding="utf-8")
+    _git(repo, "add", name)
+    _git(repo, "commit", "--quiet", "-m", f"update {name}")
+    return _git(repo, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    repo = tmp_path / "upstream" / "mathlib"
+    repo.mkdir(parents=True)
+    _git(repo, "init", "--quiet")
+    first = _commit(repo, "main.tl", "v1\n")
+    return repo, first
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    root.mkdir()
+    return {
+        "modules_dir": str(root / ".tomlang_modules"),
+        "cache_dir": str(tmp_path / "cache"),
+        "lock": root / "tomlang-modules.lock",
+    }
+
+
+def _install(project, url, **kwargs):
+    out = io.StringIO()
+    results = install([url], "", jobs=2, modules_dir=project["modules_dir"], cache_dir=project["cache_dir"],
+                      lock=Lockfile(str(project["lock"])), out=out, **kwargs)
+    return results[0], out.getvalue()
+
+
+def _checkout(project, name="mathlib"):
+    return os.path.join(project["modules_dir"], name)
+
+
+def test_install_clones_through_the_mirror_and_locks(upstream, project):
+    repo, first = upstream
+    result, out = _install(project, str(repo))
+    assert result.status == "installed", result.error
+    assert "Successfully installed mathlib" in out
+    assert open(os.path.join(_checkout(project), "main.tl")).read() == "v1\n"
+    assert _git(_checkout(project), "remote", "get-url", "origin") == str(repo)
+    assert Lockfile(str(project["lock"])).pin("mathlib", str(repo)) == first
+    assert len(os.listdir(project["cache_dir"])) == 1
+
+    again, out = _install(project, str(repo))
+    assert again.status == "satisfied"
+    assert "Requirement already satisfied" in out
+
+
+def test_missing_checkout_is_restored_at_its_locked_commit(upstream, project):
+    repo, first = upstream
+    _install(project, str(repo))
+    _commit(repo, "main.tl", "v2\n")
+    shutil.rmtree(_checkout(project))
+    result, _ = _install(project, str(repo))
+    assert result.status == "installed", result.error
+    assert _git(_checkout(project), "rev-parse", "HEAD") == first
+
+
+def test_moved_checkout_returns_to_the_lock(upstream, project):
+    repo, first = upstream
+    _install(project, str(repo))
+    second = _commit(repo, "main.tl", "v2\n")
+    _install(project, str(repo), sync=True)
+    # pin the old commit again, as if the lockfile came from elsewhere
+    lock = Lockfile(str(project["lock"]))
+    lock.record("mathlib", str(repo), first)
+    lock.save()
+    result, _ = _install(project, str(repo))
+    assert (result.status, result.previous, result.commit) == ("updated", second, first)
+
+
+def test_sync_moves_to_upstream_in_place_and_keeps_local_edits(upstream, project):
+    repo, first = upstream
+    _commit(repo, "other.tl", "untouched\n")
+    _install(project, str(repo))
+    local = os.path.join(_checkout(project), "other.tl")
+    with open(local, "a", encoding="utf-8") as f:
+        f.write("local edit\n")
+    latest = _commit(repo, "main.tl", "v2\n")
+    result, out = _install(project, str(repo), sync=True)
+    assert result.status == "updated", result.error
+    assert result.commit == latest and "Syncing mathlib" in out
+    assert open(os.path.join(_checkout(project), "main.tl")).read() == "v2\n"
+    assert open(local).read() == "untouched\nlocal edit\n"
+    assert Lockfile(str(project["lock"])).pin("mathlib", str(repo)) == latest
+
+
+def test_install_without_the_cache(upstream, project):
+    repo, first = upstream
+    result, _ = _install(project, str(repo), use_cache=False)
+    assert result.status == "installed", result.error
+    assert result.commit == first
+    assert not os.path.exists(project["cache_dir"])
+
+
+def test_failed_install_is_reported_and_not_locked(tmp_path, project):
+    result, out = _install(project, str(tmp_path / "does-not-exist"))
+    assert result.status == "failed"
+    assert "ERROR: Could not install does-not-exist" in out
+    assert not os.path.exists(os.path.join(project["modules_dir"], "does-not-exist"))
+    assert Lockfile(str(project["lock"])).modules == {}
+
+
+def test_lockfile_round_trip_and_url_check(tmp_path):
+    path = str(tmp_path / "tomlang-modules.lock")
+    lock = Lockfile(path)
+    lock.record("a", "https://example.com/a.git", "1" * 40, 2048)
+    lock.save()
+    reread = Lockfile(path)
+    assert reread.pin("a", "https://example.com/a.git") == "1" * 40
+    assert reread.pin("a", "https://example.com/fork/a.git") is None
+    reread.record("a", "https://example.com/a.git", "2" * 40)
+    assert reread.modules["a"]["size"] == 2048
+    assert reread.urls() == ["https://example.com/a.git"]
+
+
+def test_read_manifest_skips_comments(tmp_path):
+    path = tmp_path / "tomlang-modules.txt"
+    path.write_text("# modules\nmathlib\n\nhttps://example.com/x.git  # pinned fork\n", encoding="utf-8")
+    assert read_manifest(str(path)) == ["mathlib", "https://example.com/x.git"]
@@ -0,0 +1,45 @@
+# tests/test_xpp_errors.py
+import pytest
+
+from tools.xplusplus import Interpreter, VMInterpreter, XppRuntimeError
+from tools.xplusplus.cli import main
+
+LIB = "x = 1\nfunc boom(a) {\n    return a / 0\n}\n"
+MAIN = "y = 2\nboom(3)\n"
+
+
+@pytest.fixture
+def scripts(tmp_path):
+    lib, script = tmp_path / "lib.xpp", tmp_path / "main.xpp"
+    lib.write_text(LIB, encoding="utf-8")
+    script.write_text(MAIN, encoding="utf-8")
+    return str(lib), str(script)
+
+
+@pytest.mark.parametrize("backend", [Interpreter, VMInterpreter])
+def test_error_in_function_from_earlier_file(backend, scripts):
+    lib, script = scripts
+    interp = backend()
+    interp.run_file(lib)
+    with pytest.raises(XppRuntimeError) as info:
+        interp.run_file(script)
+    assert info.value.line == 3
+    assert info.value.filename == lib
+    assert "ZeroDivisionError" in info.value.message
+
+
+@pytest.mark.parametrize("backend", [Interpreter, VMInterpreter])
+def test_error_in_same_file(backend, tmp_path):
+    path = tmp_path / "one.xpp"
+    path.write_text("a = 1\nb = a / 0\n", encoding="utf-8")
+    with pytest.raises(XppRuntimeError) as info:
+        backend().run_file(str(path))
+    assert info.value.line == 2
+    assert info.value.filename == str(path)
+
+
+@pytest.mark.parametrize("flags", [["--no-cache"], ["--vm"]])
+def test_cli_names_the_file_with_the_error(flags, scripts, capsys):
+    lib, script = scripts
+    assert main(["run", lib, script] + flags) == 1
+    assert capsys.readouterr().err.startswith(f"{lib}: Error: line 3: ZeroDivisionError")
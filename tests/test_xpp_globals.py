@@ -0,0 +1,31 @@
+# tests/test_xpp_globals.py
+import pytest
+
+from tools.xplusplus import Interpreter, VMInterpreter
+
+RUNS = [
+    ("func f() { return x }", ""),
+    ("x = 1", ""),
+    ("x = 5\nprint(f())", "5\n"),
+    ("x = x + 2\ny = f() * 10\nprint(y)", "70\n"),
+    ("for i in range(3) { x = i\nprint(f()) }", "0\n1\n2\n"),
+]
+
+
+def _outputs(backend, runs, capsys):
+    interp = backend()
+    outputs = []
+    for source, _ in runs:
+        interp.run(source)
+        outputs.append(capsys.readouterr().out)
+    return outputs
+
+
+@pytest.mark.parametrize("backend", [Interpreter, VMInterpreter])
+def test_earlier_function_sees_later_top_level_assignment(backend, capsys):
+    assert _outputs(backend, RUNS, capsys) == [out for _, out in RUNS]
+
+
+def test_backends_agree_without_earlier_binding(capsys):
+    runs = [RUNS[0], RUNS[2]]
+    assert _outputs(Interpreter, runs, capsys) == _outputs(VMInterpreter, runs, capsys) == ["", "5\n"]
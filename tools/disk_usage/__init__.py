@@ -0,0 +1,12 @@
+# tools/disk_usage/__init__.py
+from .scan import DEFAULT_JOBS, DirStats, StatsCache, dir_stats, directory_size, format_size, open_cache
+
+__all__ = [
+    "DEFAULT_JOBS",
+    "DirStats",
+    "StatsCache",
+    "dir_stats",
+    "directory_size",
+    "format_size",
+    "open_cache",
+]
@@ -0,0 +1,214 @@
+# tools/disk_usage/scan.py
+"""
+Directory statistics (file count, directory count, bytes) for large trees.
+
+Each directory is listed once with os.scandir and sized with DirEntry.stat(),
+which is one stat per entry on POSIX and free on Windows (the listing already
+carries it). os.walk followed by os.path.exists + os.path.getsize cost up to
+three. Directories are scanned by a thread pool: the scandir and stat calls
+release the GIL, so several subtrees are read at once, which pays off on cold
+caches, network drives and SSDs with deep queues.
+
+Results are cached per directory in Date/dir_stats_cache.json as
+
+    {"<absolute dir>": [mtime_ns, files, bytes, ["subdir", ...]]}
+
+A directory whose mtime has not changed since it was cached is not listed
+again: its own totals come from the cache, and only its subdirectories are
+stat'ed to check their mtimes in turn. A repeat query therefore costs one stat
+per directory instead of one per file. A directory's mtime changes when entries
+are created, deleted or renamed in it, but not when an existing file is
+rewritten in place, so a file that grew without being replaced is only picked
+up by a fresh scan (refresh=True, `du --fresh`), which also updates the cache.
+
+Symlinks are counted as links, never followed. Sizes are apparent sizes
+(st_size), not allocated blocks.
+"""
+import json
+import os
+import stat
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from time import perf_counter
+
+DEFAULT_JOBS = 8
+CACHE_VERSION = 1
+CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "Date", "dir_stats_cache.json")
+ROOT_FILES = "(files)"          # bucket for the files directly in the scanned directory
+
+
+class DirStats:
+    def __init__(self, path):
+        self.path = path
+        self.files = 0
+        self.dirs = 0
+        self.bytes = 0
+        self.children = {}      # immediate child name -> [files, bytes]
+        self.errors = []        # (path, message)
+        self.cached = 0         # directories answered from the cache
+        self.elapsed = 0.0
+
+    def report(self, top=20):
+        lines = [f"{format_size(size):>10}  {name}"
+                 for name, (_, size) in sorted(self.children.items(), key=lambda kv: (-kv[1][1], kv[0]))[:top]]
+        if len(self.children) > top:
+            lines.append(f"{'':>10}  ... {len(self.children) - top} more")
+        lines.append(f"{format_size(self.bytes):>10}  total: {self.files} file(s), {self.dirs} director(ies) "
+                     f"in {self.elapsed:.2f} s ({self.cached} from cache)")
+        lines += [f"  {path}: {message}" for path, message in self.errors]
+        return "\n".join(lines)
+
+
+def format_size(size):
+    for unit in ("B", "kB", "MB", "GB", "TB"):
+        if size < 1000 or unit == "TB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1000
+
+
+# ---------------- cache ----------------
+class StatsCache:
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.dirs = {}
+        self.changed = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION:
+            self.dirs = data.get("dirs", {})
+
+    def get(self, path, mtime_ns):
+        entry = self.dirs.get(path)
+        return entry if entry is not None and entry[0] == mtime_ns else None
+
+    def put(self, path, mtime_ns, files, size, subdirs):
+        self.dirs[path] = [mtime_ns, files, size, subdirs]
+        self.changed = True
+
+    def prune(self, root, visited):
+        """Forget directories under `root` that the last scan of `root` did not reach."""
+        prefix = root.rstrip(os.sep) + os.sep
+        gone = [p for p in self.dirs if (p == root or p.startswith(prefix)) and p not in visited]
+        for p in gone:
+            del self.dirs[p]
+        self.changed = self.changed or bool(gone)
+
+    def save(self):
+        if not self.changed:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "dirs": self.dirs}, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self.changed = False
+        except OSError:
+            pass
+
+
+_cache = None
+
+
+def open_cache(path=CACHE_PATH):
+    """The process-wide StatsCache, read from disk on first use."""
+    global _cache
+    if _cache is None or _cache.path != path:
+        _cache = StatsCache(path)
+    return _cache
+
+
+# ---------------- scanning ----------------
+def _list_dir(path):
+    """List one directory: (files, bytes, [(subdir path, mtime_ns)], errors)."""
+    files = size = 0
+    subdirs, errors = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append((entry.path, entry.stat(follow_symlinks=False).st_mtime_ns))
+                    else:
+                        size += entry.stat(follow_symlinks=False).st_size
+                        files += 1
+                except OSError as e:
+                    errors.append((entry.path, e.strerror))
+    except OSError as e:
+        errors.append((path, e.strerror))
+    return files, size, subdirs, errors
+
+
+def _visit(path, mtime_ns, cache, refresh):
+    """One directory, from the cache if it is unchanged there. Runs on the pool."""
+    entry = cache.get(path, mtime_ns) if cache is not None and not refresh else None
+    if entry is None:
+        return _list_dir(path) + (False,)
+    subdirs, errors = [], []
+    for name in entry[3]:
+        sub = os.path.join(path, name)
+        try:
+            subdirs.append((sub, os.stat(sub, follow_symlinks=False).st_mtime_ns))
+        except OSError as e:
+            errors.append((sub, e.strerror))
+    return entry[1], entry[2], subdirs, errors, True
+
+
+def dir_stats(path, jobs=DEFAULT_JOBS, cache=None, refresh=False):
+    """
+    Totals for the tree at `path`, walked by `jobs` threads. With a StatsCache,
+    unchanged directories come from it (unless `refresh`), and it is updated
+    and saved.
+    """
+    start = perf_counter()
+    root = os.path.abspath(path)
+    stats = DirStats(root)
+    st = os.stat(root)
+    if not stat.S_ISDIR(st.st_mode):
+        stats.files, stats.bytes = 1, st.st_size
+        stats.elapsed = perf_counter() - start
+        return stats
+    visited = set()
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        # future -> (directory, its mtime, immediate child of root it belongs to)
+        pending = {pool.submit(_visit, root, st.st_mtime_ns, cache, refresh): (root, st.st_mtime_ns, ROOT_FILES)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                directory, mtime_ns, child = pending.pop(future)
+                files, size, subdirs, errors, cached = future.result()
+                visited.add(directory)
+                stats.dirs += directory != root
+                stats.files += files
+                stats.bytes += size
+                stats.cached += cached
+                stats.errors += errors
+                bucket = stats.children.setdefault(child, [0, 0])
+                bucket[0] += files
+                bucket[1] += size
+                if cache is not None and not cached and not errors:
+                    cache.put(directory, mtime_ns, files, size, [os.path.basename(sub) for sub, _ in subdirs])
+                for sub, sub_mtime in subdirs:
+                    owner = os.path.basename(sub) if directory == root else child
+                    stats.children.setdefault(owner, [0, 0])
+                    pending[pool.submit(_visit, sub, sub_mtime, cache, refresh)] = (sub, sub_mtime, owner)
+    if not stats.children.get(ROOT_FILES, [0])[0]:
+        stats.children.pop(ROOT_FILES, None)
+    if cache is not None:
+        cache.prune(root, visited)
+        cache.save()
+    stats.errors.sort()
+    stats.elapsed = perf_counter() - start
+    return stats
+
+
+def directory_size(path, jobs=DEFAULT_JOBS, cache=None):
+    """Total bytes of the files under `path`."""
+    return dir_stats(path, jobs, cache).bytes
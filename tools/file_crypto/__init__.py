@@ -0,0 +1,30 @@
+# tools/file_crypto/__init__.py
+from .container import (
+    CryptoFormatError,
+    encrypt_stream,
+    decrypt_stream,
+    encrypt_file,
+    decrypt_file,
+    is_container,
+    key_id,
+)
+from .parallel import encrypt_tree, decrypt_tree
+from .manifest import MANIFEST_NAME, read_key_id as manifest_key_id
+from .keyring import Keyring, KeyringError, open_keyring
+
+__all__ = [
+    "CryptoFormatError",
+    "encrypt_stream",
+    "decrypt_stream",
+    "encrypt_file",
+    "decrypt_file",
+    "is_container",
+    "key_id",
+    "encrypt_tree",
+    "decrypt_tree",
+    "MANIFEST_NAME",
+    "manifest_key_id",
+    "Keyring",
+    "KeyringError",
+    "open_keyring",
+]
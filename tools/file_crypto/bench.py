@@ -0,0 +1,220 @@
+# tools/file_crypto/bench.py
+"""
+File encryption benchmark: throughput and peak memory.
+
+    python -m tools.file_crypto.bench [--sizes 1M,100M] [--huge] [--dir DIR]
+
+Every (implementation, size, direction) case runs in a fresh child process,
+which reports its wall time and its own peak RSS (ru_maxrss), so one case's
+allocations never inflate the next one's figure. `--huge` adds a 4 GB file
+(needs about 12 GB of free disk). Implementations:
+
+    fernet      the original whole-file code: read everything, one Fernet
+                token, write everything (skipped above FERNET_LIMIT, where it
+                would need several times the file size in RAM)
+    stream      the chunked container as first written: read() a bytes chunk,
+                AESGCM.encrypt() a new bytes frame, write it
+    zero-copy   the current container: mmap windows, memoryview slices and
+                update_into() into a preallocated frame buffer
+
+All three are checked to round-trip the data. The `idle` row is the RSS of a
+child that only imports the crypto modules, to read the others against.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+
+MIB = 1 << 20
+FERNET_LIMIT = 1 << 30
+SIZES = {"1M": 1 << 20, "100M": 100 << 20, "4G": 4 << 30}
+IMPLEMENTATIONS = ("fernet", "stream", "zero-copy")
+
+
+# ---------------- implementations ----------------
+def fernet_encrypt(src, dst, key):
+    from cryptography.fernet import Fernet
+    with open(src, "rb") as f:
+        data = f.read()
+    with open(dst, "wb") as f:
+        f.write(Fernet(key).encrypt(data))
+
+
+def fernet_decrypt(src, dst, key):
+    from cryptography.fernet import Fernet
+    with open(src, "rb") as f:
+        data = f.read()
+    with open(dst, "wb") as f:
+        f.write(Fernet(key).decrypt(data))
+
+
+def stream_encrypt(src, dst, key):
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    from .container import DEFAULT_CHUNK_SIZE, Header, derive_key
+    header = Header.new(key, DEFAULT_CHUNK_SIZE)
+    aead = AESGCM(derive_key(key, header.salt))
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        fout.write(header.raw)
+        index = 0
+        while True:
+            chunk = fin.read(DEFAULT_CHUNK_SIZE)
+            last = len(chunk) < DEFAULT_CHUNK_SIZE
+            fout.write(aead.encrypt(header.nonce(index, last), chunk, header.raw))
+            if last:
+                return
+            index += 1
+
+
+def stream_decrypt(src, dst, key):
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    from .container import HEADER, TAG_SIZE, Header, derive_key
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        header = Header.parse(fin.read(HEADER.size))
+        aead = AESGCM(derive_key(key, header.salt))
+        frame_size = header.chunk_size + TAG_SIZE
+        index = 0
+        while True:
+            frame = fin.read(frame_size)
+            last = len(frame) < frame_size
+            fout.write(aead.decrypt(header.nonce(index, last), frame, header.raw))
+            if last:
+                return
+            index += 1
+
+
+def zero_copy_encrypt(src, dst, key):
+    from .container import encrypt_file
+    encrypt_file(src, dst, key)
+
+
+def zero_copy_decrypt(src, dst, key):
+    from .container import decrypt_file
+    decrypt_file(src, dst, key)
+
+
+CASES = {
+    ("fernet", "encrypt"): fernet_encrypt,
+    ("fernet", "decrypt"): fernet_decrypt,
+    ("stream", "encrypt"): stream_encrypt,
+    ("stream", "decrypt"): stream_decrypt,
+    ("zero-copy", "encrypt"): zero_copy_encrypt,
+    ("zero-copy", "decrypt"): zero_copy_decrypt,
+}
+
+
+# ---------------- child side ----------------
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None where unsupported."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def child(impl, op, src, dst, key):
+    from . import container  # noqa: F401  (counted in the idle baseline too)
+    import cryptography.fernet  # noqa: F401
+    elapsed = None
+    if impl != "idle":
+        start = perf_counter()
+        CASES[impl, op](src, dst, key.encode("ascii"))
+        elapsed = perf_counter() - start
+    json.dump({"seconds": elapsed, "rss": peak_rss()}, sys.stdout)
+
+
+# ---------------- parent side ----------------
+def make_file(path, size):
+    block = os.urandom(MIB)
+    with open(path, "wb") as f:
+        for _ in range(size // MIB):
+            f.write(block)
+        f.write(block[:size % MIB])
+
+
+def run_case(impl, op, src, dst, key):
+    cmd = [sys.executable, "-m", "tools.file_crypto.bench", "--child", impl, op, src, dst, key]
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    done = subprocess.run(cmd, cwd=root, capture_output=True, text=True)
+    if done.returncode != 0:
+        raise RuntimeError(f"{impl} {op} failed:\n{done.stderr}")
+    return json.loads(done.stdout)
+
+
+def same_content(a, b):
+    from .manifest import hash_file
+    return os.path.getsize(a) == os.path.getsize(b) and hash_file(a) == hash_file(b)
+
+
+def fmt_rss(value):
+    return "n/a" if value is None else f"{value / MIB:.1f} MB"
+
+
+def bench(sizes, directory=None, out=sys.stdout):
+    from cryptography.fernet import Fernet
+    key = Fernet.generate_key().decode("ascii")
+    work = tempfile.mkdtemp(prefix="openncl-bench-", dir=directory)
+    try:
+        idle = run_case("idle", "-", "-", "-", key)
+        out.write(f"idle child: peak RSS {fmt_rss(idle['rss'])}\n\n")
+        out.write(f"{'size':>6}  {'implementation':<10}  {'op':<8} {'GB/s':>7} {'peak RSS':>11}\n")
+        for label, size in sizes:
+            plain = os.path.join(work, "plain.bin")
+            make_file(plain, size)
+            for impl in IMPLEMENTATIONS:
+                if impl == "fernet" and size > FERNET_LIMIT:
+                    out.write(f"{label:>6}  {impl:<10}  skipped (whole file in memory)\n")
+                    continue
+                enc, dec = os.path.join(work, "plain.enc"), os.path.join(work, "plain.dec")
+                for op, src, dst in (("encrypt", plain, enc), ("decrypt", enc, dec)):
+                    result = run_case(impl, op, src, dst, key)
+                    rate = size / 1e9 / result["seconds"] if result["seconds"] else float("inf")
+                    out.write(f"{label:>6}  {impl:<10}  {op:<8} {rate:7.2f} {fmt_rss(result['rss']):>11}\n")
+                if not same_content(plain, dec):
+                    out.write(f"WARNING: {impl} did not round-trip {label}\n")
+                os.remove(enc)
+                os.remove(dec)
+            os.remove(plain)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def parse_sizes(text):
+    sizes = []
+    for label in text.split(","):
+        label = label.strip().upper()
+        if label in SIZES:
+            sizes.append((label, SIZES[label]))
+            continue
+        units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+        try:
+            sizes.append((label, int(float(label[:-1]) * units[label[-1]]) if label[-1] in units else int(label)))
+        except (ValueError, IndexError):
+            raise argparse.ArgumentTypeError(f"bad size '{label}' (e.g. 1M, 100M, 4G)") from None
+    return sizes
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["--child"]:
+        child(*argv[1:6])
+        return 0
+    parser = argparse.ArgumentParser(prog="python -m tools.file_crypto.bench",
+                                     description="Benchmark file encryption throughput and peak RSS.")
+    parser.add_argument("--sizes", type=parse_sizes, default=parse_sizes("1M,100M"),
+                        help="comma-separated file sizes (default 1M,100M)")
+    parser.add_argument("--huge", action="store_true", help="also run a 4G file")
+    parser.add_argument("--dir", default=None, help="where to put the test files (default: temp dir)")
+    args = parser.parse_args(argv)
+    sizes = args.sizes + ([("4G", SIZES["4G"])] if args.huge else [])
+    bench(sizes, args.dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
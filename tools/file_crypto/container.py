@@ -0,0 +1,459 @@
+# tools/file_crypto/container.py
+"""
+Streaming, chunked encryption container (.enc files).
+
+Layout (all integers big-endian):
+
+    header   magic "NCLS" | version u8 | reserved u8 | chunk_size u32
+             | salt 16 | nonce_prefix 7 | key_id 8                    (41 bytes)
+    frames   AES-256-GCM(chunk) || tag(16), one per chunk_size bytes of
+             plaintext; the final frame is always shorter than a full one
+             (possibly just a tag), so truncation at a frame boundary is caught
+
+Per file, the AES key is HKDF-SHA256(fernet key, salt). The nonce of chunk i
+is nonce_prefix | i (u32) | last-flag (u8), and the whole header is the
+associated data of every frame, so frames cannot be reordered, dropped,
+truncated or moved to another file, and header tampering fails every frame.
+
+Memory use is constant and nothing is copied per chunk on the Python side:
+regular files are read through read-only mmap windows (MAP_WINDOW bytes at a
+time, unmapped as soon as they are passed, so mapped pages do not pile up in
+RSS) and handed to AES-GCM as memoryview slices; other streams are read with
+readinto() into one preallocated buffer. FrameCodec encrypts and decrypts
+with update_into() into its own preallocated frame buffer, which is written
+out as a memoryview. Output is written to a temp file and renamed into place,
+so a failed run never leaves a half-written or unauthenticated result behind.
+
+Files that do not start with the magic are treated as legacy single-blob
+Fernet tokens (the format used before this container) and decrypted in one
+piece.
+
+Decryption takes either a single Fernet key or a keyring.Keyring, in which case
+the key is chosen by the id in the header. Key ids and derived file keys are
+cached per process, so a file's key is derived once no matter how many chunk
+ranges or workers touch it.
+"""
+import base64
+import functools
+import hashlib
+import io
+import mmap
+import os
+import stat
+import struct
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+MAGIC = b"NCLS"
+VERSION = 1
+HEADER = struct.Struct(">4sBBI16s7s8s")
+TAG_SIZE = 16
+DEFAULT_CHUNK_SIZE = 1 << 20
+MAX_CHUNK_SIZE = 1 << 26
+MAX_CHUNKS = 1 << 32
+HKDF_INFO = b"OpenNCL stream v1"
+MAP_WINDOW = 4 << 20
+
+
+class CryptoFormatError(ValueError):
+    """The input is not a valid container, or failed authentication."""
+
+
+# ---------------- keys ----------------
+@functools.lru_cache(maxsize=64)
+def raw_key(key):
+    """The 32 raw bytes behind a urlsafe-base64 Fernet key."""
+    raw = base64.urlsafe_b64decode(key)
+    if len(raw) != 32:
+        raise ValueError("Fernet key must be 32 url-safe base64-encoded bytes")
+    return raw
+
+
+@functools.lru_cache(maxsize=64)
+def key_id(key):
+    """Short public fingerprint of a key, stored in the header to pick the right key."""
+    return hashlib.sha256(b"OpenNCL key id" + raw_key(key)).digest()[:8]
+
+
+def derive_key(key, salt):
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=HKDF_INFO).derive(raw_key(key))
+
+
+@functools.lru_cache(maxsize=512)
+def file_key(key, salt):
+    """The AES key of one file (one salt) under `key`."""
+    return derive_key(key, salt)
+
+
+def resolve_key(keys, kid):
+    """The key matching header key id `kid`: `keys` is a single key or a Keyring."""
+    if isinstance(keys, (bytes, str)):
+        key = keys.encode("ascii") if isinstance(keys, str) else keys
+        if key_id(key) != kid:
+            raise CryptoFormatError("file was encrypted with a different key")
+        return key
+    return keys.by_id(kid)
+
+
+class Header:
+    __slots__ = ("chunk_size", "salt", "nonce_prefix", "key_id", "raw")
+
+    def __init__(self, chunk_size, salt, nonce_prefix, key_id):
+        self.chunk_size = chunk_size
+        self.salt = salt
+        self.nonce_prefix = nonce_prefix
+        self.key_id = key_id
+        self.raw = HEADER.pack(MAGIC, VERSION, 0, chunk_size, salt, nonce_prefix, key_id)
+
+    @classmethod
+    def new(cls, key, chunk_size=DEFAULT_CHUNK_SIZE):
+        if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            raise ValueError(f"chunk size must be between 1 and {MAX_CHUNK_SIZE}")
+        return cls(chunk_size, os.urandom(16), os.urandom(7), key_id(key))
+
+    @classmethod
+    def parse(cls, data):
+        if len(data) < HEADER.size:
+            raise CryptoFormatError("truncated header")
+        magic, version, _, chunk_size, salt, prefix, kid = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise CryptoFormatError("not an OpenNCL stream")
+        if version != VERSION:
+            raise CryptoFormatError(f"unsupported container version {version}")
+        if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            raise CryptoFormatError(f"invalid chunk size {chunk_size}")
+        return cls(chunk_size, salt, prefix, kid)
+
+    def nonce(self, index, last):
+        if index >= MAX_CHUNKS:
+            raise CryptoFormatError("too many chunks")
+        return self.nonce_prefix + struct.pack(">IB", index, last)
+
+
+class FrameCodec:
+    """
+    AES-GCM for the frames of one file, working on buffers: seal() and open()
+    take any bytes-like chunk (typically a memoryview into an mmap window) and
+    return a memoryview of the codec's own frame buffer, valid until the next call.
+    """
+
+    def __init__(self, key, header):
+        self.header = header
+        self.algorithm = algorithms.AES(file_key(key, header.salt))
+        # update_into() wants room for one more block than it will write
+        self._buffer = bytearray(header.chunk_size + TAG_SIZE + 15)
+        self._view = memoryview(self._buffer)
+
+    def seal(self, chunk, index, last):
+        header = self.header
+        encryptor = Cipher(self.algorithm, modes.GCM(header.nonce(index, last))).encryptor()
+        encryptor.authenticate_additional_data(header.raw)
+        size = encryptor.update_into(chunk, self._buffer)
+        encryptor.finalize()
+        self._buffer[size:size + TAG_SIZE] = encryptor.tag
+        return self._view[:size + TAG_SIZE]
+
+    def open(self, frame, index, last):
+        header = self.header
+        size = len(frame) - TAG_SIZE
+        mode = modes.GCM(header.nonce(index, last), bytes(frame[size:]))
+        decryptor = Cipher(self.algorithm, mode).decryptor()
+        decryptor.authenticate_additional_data(header.raw)
+        decryptor.update_into(frame[:size], self._buffer)
+        try:
+            decryptor.finalize()
+        except InvalidTag:
+            raise CryptoFormatError(f"authentication failed at chunk {index}") from None
+        return self._view[:size]
+
+
+def frame_count(size, chunk_size):
+    """Frames for `size` plaintext bytes: every full chunk plus the short final one."""
+    return size // chunk_size + 1
+
+
+def encrypted_size(size, chunk_size):
+    return HEADER.size + size + TAG_SIZE * frame_count(size, chunk_size)
+
+
+def decrypted_size(enc_size, chunk_size):
+    body = enc_size - HEADER.size
+    frames = body // (chunk_size + TAG_SIZE) + 1
+    size = body - TAG_SIZE * frames
+    if size < 0 or body % (chunk_size + TAG_SIZE) < TAG_SIZE:
+        raise CryptoFormatError("truncated file")
+    return size
+
+
+# Frames sit at fixed offsets (frame i at HEADER.size + i * (chunk_size + TAG_SIZE),
+# holding plaintext bytes i * chunk_size ...), so a file can also be processed
+# as independent ranges of frames, e.g. by several processes (parallel.py).
+def encrypt_frames(codec, src, dst, first, count, size):
+    """Encrypt frames first..first+count-1 of a `size`-byte file from `src` into `dst` (both seekable)."""
+    chunk_size = codec.header.chunk_size
+    last_index = size // chunk_size
+    spans = [(index * chunk_size, chunk_size if index < last_index else size - last_index * chunk_size)
+             for index in range(first, first + count)]
+    dst.seek(HEADER.size + first * (chunk_size + TAG_SIZE))
+    for index, chunk in enumerate(_span_views(src, spans), first):
+        if len(chunk) != spans[index - first][1]:
+            raise CryptoFormatError("source file changed while it was being encrypted")
+        dst.write(codec.seal(chunk, index, index == last_index))
+
+
+def decrypt_frames(codec, src, dst, first, count, size):
+    """Decrypt frames first..first+count-1 of a container whose plaintext is `size` bytes."""
+    chunk_size = codec.header.chunk_size
+    frame_size = chunk_size + TAG_SIZE
+    last_index = size // chunk_size
+    spans = [(HEADER.size + index * frame_size,
+              (chunk_size if index < last_index else size - last_index * chunk_size) + TAG_SIZE)
+             for index in range(first, first + count)]
+    dst.seek(first * chunk_size)
+    for index, frame in enumerate(_span_views(src, spans), first):
+        if len(frame) != spans[index - first][1]:
+            raise CryptoFormatError("truncated file")
+        dst.write(codec.open(frame, index, index == last_index))
+
+
+def read_header(path):
+    """The container header of `path`, or None for a legacy Fernet file."""
+    with open(path, "rb") as f:
+        data = _read_full(f, HEADER.size)
+    if not data.startswith(MAGIC):
+        return None
+    return Header.parse(data)
+
+
+# ---------------- input ----------------
+def _regular_fileno(src):
+    """The descriptor behind `src` if it is a regular file (so it can be mapped), else None."""
+    try:
+        fileno = src.fileno()
+        return fileno if stat.S_ISREG(os.fstat(fileno).st_mode) else None
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+class _MappedReader:
+    """
+    Read-only views into a file through a sliding mmap window. Each view is
+    valid until the next call; the previous window is unmapped when the
+    requested range leaves it.
+    """
+
+    def __init__(self, fileno, window=MAP_WINDOW):
+        self.fileno = fileno
+        self.window = window
+        self.file_size = os.fstat(fileno).st_size
+        self._map = None
+        self._map_view = None
+        self._base = self._end = 0
+        self._last = None
+
+    def view(self, offset, length):
+        if self._last is not None:
+            self._last.release()
+            self._last = None
+        if length <= 0:
+            return memoryview(b"")
+        if not (self._base <= offset and offset + length <= self._end):
+            self._remap(offset, length)
+        start = offset - self._base
+        self._last = self._map_view[start:start + length]
+        return self._last
+
+    def _remap(self, offset, length):
+        self._unmap()
+        base = offset - offset % mmap.ALLOCATIONGRANULARITY
+        end = max(offset + length, min(base + self.window, self.file_size))
+        if end > self.file_size:
+            raise CryptoFormatError("file changed while it was being read")
+        self._map = mmap.mmap(self.fileno, end - base, access=mmap.ACCESS_READ, offset=base)
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._map.madvise(mmap.MADV_SEQUENTIAL)
+        self._map_view = memoryview(self._map)
+        self._base, self._end = base, end
+
+    def _unmap(self):
+        if self._map is None:
+            return
+        self._map_view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass            # a caller still holds a slice; the map goes when it does
+        self._map = self._map_view = None
+        self._base = self._end = 0
+
+    def close(self):
+        if self._last is not None:
+            self._last.release()
+            self._last = None
+        self._unmap()
+
+
+def _readinto_full(src, view):
+    """Fill `view` from `src` unless EOF comes first. Returns the number of bytes read."""
+    got = 0
+    size = len(view)
+    while got < size:
+        n = src.readinto(view[got:])
+        if not n:
+            break
+        got += n
+    return got
+
+
+def _read_full(src, size):
+    """Read exactly `size` bytes unless EOF comes first."""
+    buffer = bytearray(size)
+    return bytes(buffer[:_readinto_full(src, memoryview(buffer))])
+
+
+def _chunk_views(src, size):
+    """
+    The rest of `src` as consecutive `size`-byte memoryviews, ending with the
+    first short (possibly empty) one. Each view is valid until the next.
+    """
+    fileno = _regular_fileno(src)
+    if fileno is not None:
+        start = src.tell()
+        end = max(start, os.fstat(fileno).st_size)
+        reader = _MappedReader(fileno)
+        try:
+            for offset in range(start, end + 1, size):
+                yield reader.view(offset, min(size, end - offset))
+        finally:
+            reader.close()
+        src.seek(end)
+        return
+    view = memoryview(bytearray(size))
+    while True:
+        got = _readinto_full(src, view)
+        yield view[:got]
+        if got < size:
+            return
+
+
+def _span_views(src, spans):
+    """memoryviews of the (offset, length) ranges `spans` of seekable `src`; short at EOF."""
+    fileno = _regular_fileno(src)
+    if fileno is not None:
+        reader = _MappedReader(fileno)
+        try:
+            for offset, length in spans:
+                yield reader.view(offset, min(length, max(0, reader.file_size - offset)))
+        finally:
+            reader.close()
+        return
+    view = memoryview(bytearray(max((length for _, length in spans), default=0)))
+    for offset, length in spans:
+        src.seek(offset)
+        yield view[:_readinto_full(src, view[:length])]
+
+
+# ---------------- streams ----------------
+def encrypt_stream(src, dst, key, chunk_size=DEFAULT_CHUNK_SIZE, hasher=None):
+    """
+    Encrypt binary file object `src` into `dst`. Returns the number of plaintext bytes.
+    `hasher` (a hashlib object) is fed the plaintext on the way through.
+    """
+    header = Header.new(key, chunk_size)
+    codec = FrameCodec(key, header)
+    dst.write(header.raw)
+    total = 0
+    for index, chunk in enumerate(_chunk_views(src, chunk_size)):
+        # a full chunk is never the last one: a short (possibly empty) chunk always ends the stream
+        last = len(chunk) < chunk_size
+        if hasher is not None:
+            hasher.update(chunk)
+        dst.write(codec.seal(chunk, index, last))
+        total += len(chunk)
+    return total
+
+
+def decrypt_stream(src, dst, keys, header=None):
+    """
+    Decrypt a container from `src` into `dst` with a key or a Keyring. `header` may
+    be passed if the caller already read it. Returns the number of plaintext bytes.
+    """
+    if header is None:
+        header = Header.parse(_read_full(src, HEADER.size))
+    codec = FrameCodec(resolve_key(keys, header.key_id), header)
+    frame_size = header.chunk_size + TAG_SIZE
+    total = 0
+    for index, frame in enumerate(_chunk_views(src, frame_size)):
+        last = len(frame) < frame_size
+        if len(frame) < TAG_SIZE:
+            raise CryptoFormatError("truncated file")
+        chunk = codec.open(frame, index, last)
+        dst.write(chunk)
+        total += len(chunk)
+    return total
+
+
+# ---------------- files ----------------
+def _atomic_output(path):
+    return f"{path}.{os.getpid()}.part"
+
+
+def encrypt_file(src_path, dst_path, key, chunk_size=DEFAULT_CHUNK_SIZE, hasher=None):
+    tmp = _atomic_output(dst_path)
+    try:
+        with open(src_path, "rb") as src, open(tmp, "wb") as dst:
+            size = encrypt_stream(src, dst, key, chunk_size, hasher)
+        os.replace(tmp, dst_path)
+    except BaseException:
+        _discard(tmp)
+        raise
+    return size
+
+
+def is_container(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def decrypt_file(src_path, dst_path, keys):
+    """Decrypt a container or a legacy Fernet .enc file with a key or a Keyring. Returns the plaintext size."""
+    tmp = _atomic_output(dst_path)
+    try:
+        with open(src_path, "rb") as src:
+            if src.read(len(MAGIC)) == MAGIC:
+                src.seek(0)
+                with open(tmp, "wb") as dst:
+                    size = decrypt_stream(src, dst, keys)
+            else:
+                src.seek(0)
+                size = _decrypt_legacy(src, tmp, keys)
+        os.replace(tmp, dst_path)
+    except BaseException:
+        _discard(tmp)
+        raise
+    return size
+
+
+def _decrypt_legacy(src, out_path, keys):
+    # single Fernet token: it has to be read and authenticated as a whole
+    if isinstance(keys, (bytes, str)):
+        try:
+            data = Fernet(keys).decrypt(src.read())
+        except InvalidToken:
+            raise CryptoFormatError("not a valid encrypted file (or wrong key)") from None
+    else:
+        data = keys.decrypt_legacy(src.read())
+    with open(out_path, "wb") as dst:
+        dst.write(data)
+    return len(data)
+
+
+def _discard(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,205 @@
+# tools/file_crypto/keyring.py
+"""
+Named encryption keys.
+
+Keys live in Date/keyring.json ($OPENNCL_KEYRING overrides the path):
+
+    {"version": 1, "default": "<name>",
+     "keys": {"<name>": {"key": "<fernet key>", "id": "<hex key id>", "created": "<iso time>"}}}
+
+Every container header carries the id of the key it was written with
+(container.key_id), so decryption looks the key up by id and a directory
+mixing files from several keys decrypts in one pass. Legacy Fernet files have
+no id; the default key is tried first, then the others.
+
+The file is read once per process (open_keyring caches it and only re-reads
+it when its mtime changes). Changes are merged into the latest file contents
+and written atomically, so concurrent runs adding keys do not clobber each
+other. On first use an existing secret.key is imported as the default key.
+Otherwise keys are only ever generated by encrypt (the default key) and
+`key new`; looking keys up in an empty keyring raises KeyringError instead of
+inventing a key no file could have been encrypted with.
+"""
+import json
+import os
+from datetime import datetime
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from .container import CryptoFormatError, key_id
+
+KEYRING_VERSION = 1
+DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "Date", "keyring.json")
+KEYRING_ENV = "OPENNCL_KEYRING"
+LEGACY_KEY_FILE = "secret.key"
+DEFAULT_NAME = "default"
+
+
+class KeyringError(Exception):
+    pass
+
+
+def default_path():
+    return os.environ.get(KEYRING_ENV) or DEFAULT_PATH
+
+
+class Keyring:
+
+    def __init__(self, path=DEFAULT_PATH, keys=None, default=None, created=None):
+        self.path = path
+        self.keys = dict(keys or {})        # name -> fernet key (bytes)
+        self.default = default
+        self.created = dict(created or {})  # name -> iso time
+        self._by_id = {}
+        self._fernets = {}
+        self._reindex()
+
+    def _reindex(self):
+        self._by_id = {key_id(key): key for key in self.keys.values()}
+
+    def __getstate__(self):
+        # sent to pool workers: Fernet objects are rebuilt on demand there
+        state = self.__dict__.copy()
+        state["_fernets"] = {}
+        return state
+
+    # ---------- persistence ----------
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(path)
+        except ValueError as e:
+            raise KeyringError(f"{path} is corrupt: {e}") from None
+        entries = data.get("keys", {})
+        keys = {name: entry["key"].encode("ascii") for name, entry in entries.items()}
+        created = {name: entry.get("created") for name, entry in entries.items()}
+        return cls(path, keys, data.get("default"), created)
+
+    def save(self):
+        # merge with whatever another process may have written since we loaded
+        current = Keyring.load(self.path)
+        for name, key in current.keys.items():
+            if name not in self.keys:
+                self.keys[name] = key
+                self.created[name] = current.created.get(name)
+        if self.default is None:
+            self.default = current.default
+        self._reindex()
+        data = {
+            "version": KEYRING_VERSION,
+            "default": self.default,
+            "keys": {
+                name: {"key": key.decode("ascii"), "id": key_id(key).hex(), "created": self.created.get(name)}
+                for name, key in sorted(self.keys.items())
+            },
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        try:
+            os.chmod(tmp, 0o600)
+        except OSError:
+            pass
+        os.replace(tmp, self.path)
+        _cache.pop(self.path, None)
+
+    # ---------- keys ----------
+    def names(self):
+        return sorted(self.keys)
+
+    def add(self, name, key):
+        if name in self.keys:
+            raise KeyringError(f"key '{name}' already exists")
+        Fernet(key)                         # validates the format
+        self.keys[name] = key
+        self.created[name] = datetime.now().isoformat(timespec="seconds")
+        self._by_id[key_id(key)] = key
+        if self.default is None:
+            self.default = name
+        return key
+
+    def create(self, name):
+        return self.add(name, Fernet.generate_key())
+
+    def import_file(self, name, path):
+        with open(path, "rb") as f:
+            return self.add(name, f.read().strip())
+
+    def set_default(self, name):
+        if name not in self.keys:
+            raise KeyringError(f"no key named '{name}'")
+        self.default = name
+
+    def get(self, name=None):
+        name = name or self.default
+        if name not in self.keys:
+            raise KeyringError(f"no key named '{name}'" if name else "the keyring is empty")
+        return self.keys[name]
+
+    def name_of(self, kid):
+        for name, key in self.keys.items():
+            if key_id(key) == kid:
+                return name
+        return None
+
+    def by_id(self, kid):
+        key = self._by_id.get(kid)
+        if key is None:
+            raise CryptoFormatError(f"no key in the keyring matches this file (key id {kid.hex()})")
+        return key
+
+    def candidates(self):
+        """Keys to try on files without a key id, default first."""
+        ordered = [self.keys[self.default]] if self.default in self.keys else []
+        return ordered + [k for n, k in sorted(self.keys.items()) if n != self.default]
+
+    def decrypt_legacy(self, token):
+        for key in self.candidates():
+            cipher = self._fernets.get(key)
+            if cipher is None:
+                cipher = self._fernets[key] = Fernet(key)
+            try:
+                return cipher.decrypt(token)
+            except InvalidToken:
+                continue
+        raise CryptoFormatError("not a valid encrypted file (or no matching key)")
+
+
+# ---------------- process-wide cache ----------------
+_cache = {}     # path -> (mtime_ns, Keyring)
+
+
+def open_keyring(path=None, legacy_key=LEGACY_KEY_FILE, create=False, allow_empty=False):
+    """
+    The keyring at `path` (default_path()), read from disk only when it changed since the last call.
+    A keyring without keys takes `legacy_key` (secret.key) as its default key when
+    that file exists. Otherwise `create` generates and saves a new default key
+    (for encryption), `allow_empty` returns the empty keyring (for `key new` /
+    `key import`), and anything else raises KeyringError.
+    """
+    path = path or default_path()
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    cached = _cache.get(path)
+    ring = cached[1] if cached is not None and cached[0] == mtime else Keyring.load(path)
+    if not ring.keys:
+        if legacy_key and os.path.exists(legacy_key):
+            ring.import_file(DEFAULT_NAME, legacy_key)
+        elif create:
+            ring.create(DEFAULT_NAME)
+        elif allow_empty:
+            _cache[path] = (mtime, ring)
+            return ring
+        else:
+            raise KeyringError(f"no keys in {path}: create one with 'key new <name>' or by encrypting a file")
+        ring.save()
+        mtime = os.stat(path).st_mtime_ns
+    _cache[path] = (mtime, ring)
+    return ring
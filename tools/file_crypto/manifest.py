@@ -0,0 +1,119 @@
+# tools/file_crypto/manifest.py
+"""
+Incremental-encryption manifest.
+
+`encrypt <dir>` keeps MANIFEST_NAME in the directory it encrypts, recording for
+every source file (by path relative to that directory):
+
+    [size, mtime_ns, blake2b-128 hex digest of the content]
+
+plus the id of the key the outputs were written with. On the next run a file
+is skipped when its output still exists and size and mtime_ns are unchanged.
+If only the mtime moved (touched, copied, restored from backup) the content
+hash decides. Entries whose source has disappeared have their output removed.
+A different key invalidates the whole manifest, since outputs under the old
+key would no longer match the key the user holds.
+"""
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = ".openncl-manifest.json"
+MANIFEST_VERSION = 1
+HASH_BLOCK = 1 << 20
+
+
+def new_hasher():
+    return hashlib.blake2b(digest_size=16)
+
+
+def hash_file(path):
+    h = new_hasher()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def manifest_path(root):
+    return os.path.join(root, MANIFEST_NAME)
+
+
+def read_key_id(root):
+    """Key id (hex) recorded in root's manifest, or None."""
+    try:
+        with open(manifest_path(root), "r", encoding="utf-8") as f:
+            return json.load(f).get("key_id")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class Manifest:
+
+    def __init__(self, root, key_id_hex):
+        self.root = root
+        self.path = manifest_path(root)
+        self.key_id = key_id_hex
+        self.files = {}
+        self.seen = set()
+        self.skipped = 0
+        self.removed = 0
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == MANIFEST_VERSION and data.get("key_id") == self.key_id:
+            self.files = data.get("files", {})
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "key_id": self.key_id, "files": self.files},
+                      f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def relative(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def unchanged(self, path, st, output):
+        """True if `path` (with stat result `st`) needs no work. Marks it as seen either way."""
+        rel = self.relative(path)
+        self.seen.add(rel)
+        entry = self.files.get(rel)
+        if entry is None or entry[0] != st.st_size or not os.path.exists(output):
+            return False
+        if entry[1] != st.st_mtime_ns:
+            try:
+                digest = hash_file(path)
+            except OSError:
+                return False
+            if digest != entry[2]:
+                return False
+            entry[1] = st.st_mtime_ns
+        self.skipped += 1
+        return True
+
+    def record(self, path, size, mtime_ns, digest):
+        self.files[self.relative(path)] = [size, mtime_ns, digest]
+
+    def forget(self, path):
+        self.files.pop(self.relative(path), None)
+
+    def remove_stale(self, output_for):
+        """Delete outputs of sources that no longer exist and drop their entries."""
+        for rel in [rel for rel in self.files if rel not in self.seen]:
+            source = os.path.join(self.root, *rel.split("/"))
+            if os.path.exists(source):
+                continue        # e.g. excluded from this walk; keep its entry
+            try:
+                os.remove(output_for(source))
+                self.removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            del self.files[rel]
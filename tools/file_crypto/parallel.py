@@ -0,0 +1,346 @@
+# tools/file_crypto/parallel.py
+"""
+Parallel encryption / decryption of directory trees.
+
+The tree is walked lazily with os.scandir and turned into tasks for a process
+pool as it goes, so the first files are being encrypted while the walk is still
+running and memory does not grow with the number of files:
+
+  * small files are grouped into batches (BATCH_FILES files or BATCH_BYTES
+    bytes per task), so per-task overhead is paid once per batch;
+  * files of SPLIT_SIZE or more are split into ranges of frames. The parent
+    writes the container header into a preallocated .part file and each worker
+    encrypts its frames straight into their fixed offsets (container.py), so
+    one big file keeps every core busy. The .part file is renamed into place
+    when its last range is done.
+
+The key (or, for decryption, the whole keyring) is handed to every worker once,
+through the pool initializer; workers cache the per-file AES objects they
+derive from it. Outcomes do not depend on
+scheduling or --jobs: every file is either fully written or left untouched,
+and the summary lists results in path order. With jobs <= 1 the same tasks run
+in-process, which is how the plain `encrypt <dir>` works.
+
+Encrypting a directory is incremental (manifest.py): unchanged files are
+skipped while planning, and outputs of deleted sources are removed at the end.
+"""
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from time import perf_counter
+
+from . import manifest as manifest_mod
+from .container import (
+    DEFAULT_CHUNK_SIZE, CryptoFormatError, FrameCodec, Header, _discard, decrypt_file, decrypt_frames,
+    decrypted_size, encrypt_file, encrypt_frames, encrypted_size, frame_count,
+    key_id, read_header, resolve_key,
+)
+
+ENC_SUFFIX = ".enc"
+PART_SUFFIX = ".part"
+BATCH_FILES = 64
+BATCH_BYTES = 8 << 20
+SPLIT_SIZE = 32 << 20
+RANGE_CHUNKS = 8                # frames per task when a file is split
+PROGRESS_INTERVAL = 0.2
+
+
+# ---------------- worker side ----------------
+_worker_key = None             # a key, or a Keyring when decrypting
+
+
+def _init_worker(key):
+    global _worker_key
+    _worker_key = key
+
+
+def _codec(header):
+    return FrameCodec(resolve_key(_worker_key, header.key_id), header)
+
+
+# Every task returns a list of results:
+#   ("file", src, plaintext bytes, error, content digest)   whole file done
+#   ("range", src, plaintext bytes, error, None)             part of a split file
+#   ("hash", src, 0, error, content digest)                  digest of a split file
+def _run_batch(mode, files):
+    """Whole files, one after the other; `files` is [(src, dst)]."""
+    results = []
+    for src, dst in files:
+        try:
+            if mode == "encrypt":
+                hasher = manifest_mod.new_hasher()
+                size = encrypt_file(src, dst, _worker_key, hasher=hasher)
+                digest = hasher.hexdigest()
+            else:
+                size, digest = decrypt_file(src, dst, _worker_key), None
+            results.append(("file", src, size, None, digest))
+        except Exception as e:
+            results.append(("file", src, 0, f"{type(e).__name__}: {e}", None))
+    return results
+
+
+def _run_range(mode, src, part, header_raw, first, count, size):
+    """Frames first..first+count-1 of one split file."""
+    header = Header.parse(header_raw)
+    try:
+        with open(src, "rb") as fin, open(part, "r+b") as fout:
+            if mode == "encrypt":
+                encrypt_frames(_codec(header), fin, fout, first, count, size)
+            else:
+                decrypt_frames(_codec(header), fin, fout, first, count, size)
+    except Exception as e:
+        return [("range", src, 0, f"{type(e).__name__}: {e}", None)]
+    done = min(size, (first + count) * header.chunk_size) - first * header.chunk_size
+    return [("range", src, max(done, 0), None, None)]
+
+
+def _run_hash(src):
+    try:
+        return [("hash", src, 0, None, manifest_mod.hash_file(src))]
+    except OSError as e:
+        return [("hash", src, 0, f"{type(e).__name__}: {e}", None)]
+
+
+# ---------------- planning ----------------
+def walk_files(root):
+    """Yield (path, stat) for every regular file under root, depth first, in sorted order."""
+    if os.path.isfile(root):
+        yield root, os.stat(root)
+        return
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file():
+                    yield entry.path, entry.stat()
+            except OSError:
+                continue
+        stack.extend(reversed(subdirs))
+
+
+def output_path(mode, src):
+    if mode == "encrypt":
+        return src + ENC_SUFFIX
+    return src[:-len(ENC_SUFFIX)] if src.endswith(ENC_SUFFIX) else src + ".dec"
+
+
+def wants(mode, path):
+    if path.endswith(PART_SUFFIX) or os.path.basename(path).startswith(manifest_mod.MANIFEST_NAME):
+        return False
+    is_enc = path.endswith(ENC_SUFFIX)
+    return not is_enc if mode == "encrypt" else is_enc
+
+
+class _SplitFile:
+    __slots__ = ("src", "dst", "part", "size", "mtime_ns", "remaining", "error", "digest")
+
+    def __init__(self, src, dst, part, size, remaining):
+        self.src, self.dst, self.part, self.size = src, dst, part, size
+        self.mtime_ns = None
+        self.remaining = remaining
+        self.error = None
+        self.digest = None
+
+
+def _plan_split(mode, key, src, size, chunk_size):
+    """Create the .part output for a split file. Returns (split, header, plaintext size)."""
+    dst = output_path(mode, src)
+    part = f"{dst}.{os.getpid()}{PART_SUFFIX}"
+    if mode == "encrypt":
+        header = Header.new(key, chunk_size)
+        out_size = encrypted_size(size, chunk_size)
+        plain = size
+    else:
+        header = read_header(src)
+        if header is None:
+            return None, None, None         # legacy Fernet: whole-file task
+        resolve_key(key, header.key_id)
+        plain = out_size = decrypted_size(size, header.chunk_size)
+    with open(part, "wb") as f:
+        if mode == "encrypt":
+            f.write(header.raw)
+        f.truncate(out_size)
+    frames = frame_count(plain, header.chunk_size)
+    ranges = (frames + RANGE_CHUNKS - 1) // RANGE_CHUNKS
+    return _SplitFile(src, dst, part, plain, ranges), header, plain
+
+
+def plan_tasks(mode, root, key, chunk_size=DEFAULT_CHUNK_SIZE, splits=None, failures=None,
+               manifest=None, mtimes=None):
+    """
+    Yield pool tasks (fn, args) for every file under root that needs work.
+    Split files are registered in `splits` (src -> _SplitFile), the mtime each
+    file was planned with in `mtimes`, and files that cannot even be planned
+    are reported in `failures`.
+    """
+    batch, batch_bytes = [], 0
+    for src, st in walk_files(root):
+        if not wants(mode, src):
+            continue
+        if manifest is not None and manifest.unchanged(src, st, output_path(mode, src)):
+            continue
+        size = st.st_size
+        mtimes[src] = st.st_mtime_ns
+        if size >= SPLIT_SIZE:
+            try:
+                split, header, plain = _plan_split(mode, key, src, size, chunk_size)
+            except (OSError, CryptoFormatError) as e:
+                failures.append((src, f"{type(e).__name__}: {e}"))
+                continue
+            if split is not None:
+                splits[src] = split
+                if manifest is not None:
+                    split.remaining += 1
+                    yield _run_hash, (src,)
+                frames = frame_count(plain, header.chunk_size)
+                for first in range(0, frames, RANGE_CHUNKS):
+                    yield _run_range, (mode, src, split.part, header.raw, first,
+                                       min(RANGE_CHUNKS, frames - first), plain)
+                continue
+        batch.append((src, output_path(mode, src)))
+        batch_bytes += size
+        if len(batch) >= BATCH_FILES or batch_bytes >= BATCH_BYTES:
+            yield _run_batch, (mode, batch)
+            batch, batch_bytes = [], 0
+    if batch:
+        yield _run_batch, (mode, batch)
+
+
+# ---------------- driver ----------------
+class Summary:
+    def __init__(self, mode):
+        self.mode = mode
+        self.files = 0
+        self.bytes = 0
+        self.skipped = 0
+        self.removed = 0
+        self.errors = []
+        self.start = perf_counter()
+        self.elapsed = 0.0
+
+    def rates(self):
+        elapsed = max(perf_counter() - self.start, 1e-9)
+        return self.files / elapsed, self.bytes / elapsed / 1e6
+
+    def report(self):
+        files_s, mb_s = self.files / max(self.elapsed, 1e-9), self.bytes / max(self.elapsed, 1e-9) / 1e6
+        verb = "Encrypted" if self.mode == "encrypt" else "Decrypted"
+        lines = [f"{verb} {self.files} file(s), {self.bytes / 1e6:.1f} MB in {self.elapsed:.2f} s "
+                 f"({files_s:.0f} files/s, {mb_s:.1f} MB/s), {len(self.errors)} error(s)"]
+        if self.skipped or self.removed:
+            lines.append(f"  {self.skipped} unchanged file(s) skipped, {self.removed} stale output(s) removed")
+        lines += [f"  {path}: {error}" for path, error in sorted(self.errors)]
+        return "\n".join(lines)
+
+
+def _pool_results(tasks, key, jobs):
+    """Run tasks on a pool of `jobs` processes, at most 4 per worker in flight; yield results."""
+    window = jobs * 4
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(key,)) as pool:
+        pending = set()
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < window:
+                task = next(tasks, None)
+                if task is None:
+                    exhausted = True
+                    break
+                fn, args = task
+                pending.add(pool.submit(fn, *args))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def _inline_results(tasks, key):
+    _init_worker(key)
+    for fn, args in tasks:
+        yield fn(*args)
+
+
+def process_tree(mode, root, key, jobs, chunk_size=DEFAULT_CHUNK_SIZE, progress=True, incremental=True):
+    """
+    Encrypt or decrypt every file under root on `jobs` processes (in-process when
+    jobs <= 1). Returns a Summary. With `progress`, a live files/s and MB/s line is
+    kept updated on stderr. Encrypting a directory with `incremental` uses and
+    updates its manifest.
+    """
+    progress = sys.stderr if progress else None
+    summary = Summary(mode)
+    manifest = None
+    if mode == "encrypt" and incremental and os.path.isdir(root):
+        manifest = manifest_mod.Manifest(root, key_id(key).hex())
+    splits, failures, mtimes = {}, [], {}
+    tasks = plan_tasks(mode, root, key, chunk_size, splits, failures, manifest, mtimes)
+    last_report = 0.0
+
+    def finished(src, size, error, digest):
+        if error is None:
+            summary.files += 1
+            if manifest is not None:
+                manifest.record(src, size, mtimes[src], digest)
+        else:
+            summary.errors.append((src, error))
+            if manifest is not None:
+                manifest.forget(src)
+
+    def collect(kind, src, size, error, digest):
+        summary.bytes += size
+        if kind == "file":
+            finished(src, size, error, digest)
+            return
+        split = splits[src]
+        if error is not None and split.error is None:
+            split.error = error
+        if kind == "hash":
+            split.digest = digest
+        split.remaining -= 1
+        if split.remaining == 0:
+            del splits[src]
+            if split.error is None:
+                os.replace(split.part, split.dst)
+            else:
+                _discard(split.part)
+            finished(src, split.size, split.error, split.digest)
+
+    results = _pool_results(tasks, key, jobs) if jobs > 1 else _inline_results(tasks, key)
+    for result in results:
+        for item in result:
+            collect(*item)
+        now = perf_counter()
+        if progress is not None and now - last_report >= PROGRESS_INTERVAL:
+            last_report = now
+            files_s, mb_s = summary.rates()
+            progress.write(f"\r  {summary.files} files, {summary.bytes / 1e6:.1f} MB "
+                           f"| {files_s:.0f} files/s, {mb_s:.1f} MB/s   ")
+            progress.flush()
+    summary.errors.extend(failures)
+    if manifest is not None:
+        for src, _ in failures:
+            manifest.forget(src)
+        manifest.remove_stale(lambda src: output_path(mode, src))
+        manifest.save()
+        summary.skipped, summary.removed = manifest.skipped, manifest.removed
+    summary.elapsed = perf_counter() - summary.start
+    if progress is not None and last_report:
+        progress.write("\n")
+    return summary
+
+
+def encrypt_tree(root, key, jobs, **kwargs):
+    return process_tree("encrypt", root, key, jobs, **kwargs)
+
+
+def decrypt_tree(root, key, jobs, **kwargs):
+    return process_tree("decrypt", root, key, jobs, **kwargs)
@@ -0,0 +1,31 @@
+# tools/qr/__init__.py
+from .encoder import ECC_LEVELS, QROptions, add_logo, encode, make_image
+from .capacity import AUTO, CAPACITY, capacity, fit_version
+from .logo import prepared_logo
+from .render import render_matrix, render_qr
+from .history import QRHistory
+from .export import FORMATS, PdfSheet, code_bytes
+from .cache import QRCache
+from .batch import BatchSummary, run_batch
+
+__all__ = [
+    "ECC_LEVELS",
+    "QROptions",
+    "AUTO",
+    "CAPACITY",
+    "capacity",
+    "fit_version",
+    "encode",
+    "make_image",
+    "add_logo",
+    "prepared_logo",
+    "render_matrix",
+    "render_qr",
+    "QRHistory",
+    "FORMATS",
+    "PdfSheet",
+    "code_bytes",
+    "QRCache",
+    "BatchSummary",
+    "run_batch",
+]
@@ -0,0 +1,225 @@
+# tools/qr/batch.py
+"""
+Headless batch QR generation.
+
+Input lines are read lazily, blank lines skipped, and the rest grouped into
+tasks of BATCH_LINES codes. With jobs > 1 the tasks run on a process pool, at
+most 4 per worker in flight, and their results are taken in input order; each
+worker renders its codes and writes the files itself, so only small (count,
+errors) results travel back and memory stays flat however long the input is.
+With jobs <= 1 the same tasks run in-process.
+
+Outputs are named qrcode_<n>.png (or .svg, see tools/qr/export.py), n
+counting non-empty lines from 1, as the GUI's batch mode always did. For the
+"pdf" format the workers return each task's PNGs instead, and the driver
+appends them, in order, to one streamed contact sheet, <outdir>/qrcodes.pdf.
+
+With a cache directory (the default), every code goes through the worker's
+QRCache (tools/qr/cache.py): duplicate lines and codes made by earlier runs
+are copied from the cache instead of being encoded and rendered again, and the
+summary reports the hit rate.
+
+run_batch() takes a progress callback and a cancel Event, so the GUI can drive
+it from a background thread and keep its event loop free.
+"""
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from time import perf_counter
+
+from .cache import DEFAULT_DIR as CACHE_DIR, QRCache
+from .export import PDF_NAME, PdfSheet, code_bytes
+
+BATCH_LINES = 32
+PROGRESS_INTERVAL = 0.2
+
+
+def output_name(index, fmt="png"):
+    return f"qrcode_{index}.{fmt}"
+
+
+def read_lines(path):
+    """Non-empty, stripped lines of a UTF-8 text file, read lazily."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def count_lines(path):
+    return sum(1 for _ in read_lines(path))
+
+
+# ---------------- worker side ----------------
+_caches = {}
+
+
+def _cache_for(directory):
+    """One QRCache per worker process, kept across tasks so its memory LRU stays warm."""
+    cache = _caches.get(directory)
+    if cache is None:
+        cache = _caches[directory] = QRCache(directory)
+    return cache
+
+
+def _run_task(outdir, options, items, cache_dir=None, fmt="png"):
+    """
+    Render [(index, content)] and save them, or for "pdf" collect them.
+    Returns (codes done, [(index, error)], (memory hits, disk hits, misses) of
+    this task, [(index, content, png)] for the sheet).
+    """
+    cache = _cache_for(cache_dir) if cache_dir else None
+    before = (cache.hits, cache.disk_hits, cache.misses) if cache else (0, 0, 0)
+    done, errors, cells = 0, [], []
+    for index, content in items:
+        try:
+            data = cache.get(content, options, fmt) if cache else code_bytes(content, options, fmt)
+            if fmt == "pdf":
+                cells.append((index, content, data))
+            else:
+                with open(os.path.join(outdir, output_name(index, fmt)), "wb") as f:
+                    f.write(data)
+            done += 1
+        except Exception as e:
+            errors.append((index, f"{type(e).__name__}: {e}"))
+    after = (cache.hits, cache.disk_hits, cache.misses) if cache else (0, 0, 0)
+    return done, errors, tuple(a - b for a, b in zip(after, before)), cells
+
+
+# ---------------- driver ----------------
+class BatchSummary:
+    def __init__(self, total=None):
+        self.total = total
+        self.codes = 0
+        self.errors = []        # (line index, message)
+        self.cancelled = False
+        self.sheet = None       # (path, pages) of a PDF contact sheet
+        self.cache_hits = 0     # from a worker's memory LRU
+        self.cache_disk_hits = 0
+        self.cache_misses = 0
+        self.start = perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def processed(self):
+        return self.codes + len(self.errors)
+
+    def rate(self):
+        elapsed = self.elapsed or perf_counter() - self.start
+        return self.codes / max(elapsed, 1e-9)
+
+    def hit_rate(self):
+        lookups = self.cache_hits + self.cache_disk_hits + self.cache_misses
+        return (self.cache_hits + self.cache_disk_hits) / lookups if lookups else 0.0
+
+    def report(self, max_errors=20):
+        state = " (cancelled)" if self.cancelled else ""
+        lines = [f"Generated {self.codes} QR code(s) in {self.elapsed:.2f} s "
+                 f"({self.rate():.1f} codes/s), {len(self.errors)} error(s){state}"]
+        if self.sheet is not None:
+            lines.append(f"Contact sheet: {self.sheet[1]} page(s) in {self.sheet[0]}")
+        if self.cache_hits or self.cache_disk_hits or self.cache_misses:
+            lines.append(f"Cache: {self.hit_rate():.1%} hit rate ({self.cache_hits} memory, "
+                         f"{self.cache_disk_hits} disk, {self.cache_misses} rendered)")
+        lines += [f"  line {index}: {error}" for index, error in sorted(self.errors)[:max_errors]]
+        if len(self.errors) > max_errors:
+            lines.append(f"  ... {len(self.errors) - max_errors} more")
+        return "\n".join(lines)
+
+
+def _tasks(lines):
+    numbered = enumerate(lines, 1)
+    while True:
+        items = list(islice(numbered, BATCH_LINES))
+        if not items:
+            return
+        yield items
+
+
+def _pool_results(tasks, run, jobs, cancel):
+    window = jobs * 4
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        try:
+            while True:
+                while len(pending) < window and not (cancel and cancel.is_set()):
+                    items = next(tasks, None)
+                    if items is None:
+                        break
+                    pending.append(pool.submit(run, items))
+                if not pending:
+                    return
+                # oldest first: tasks are the same size, so the others keep running meanwhile
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _inline_results(tasks, run, cancel):
+    for items in tasks:
+        if cancel and cancel.is_set():
+            return
+        yield run(items)
+
+
+def run_batch(lines, outdir, options, jobs=1, total=None, progress=None, cancel=None,
+              cache_dir=CACHE_DIR, fmt="png"):
+    """
+    Render one code per item of `lines` into `outdir`, as `fmt` files ("png",
+    "svg") or one "pdf" contact sheet. `progress(summary)` is called after
+    every finished task (from the calling thread); setting the threading.Event
+    `cancel` stops the batch after the tasks in flight. cache_dir=None renders
+    every code without the cache. Returns a BatchSummary.
+    """
+    os.makedirs(outdir, exist_ok=True)
+    summary = BatchSummary(total)
+    tasks = _tasks(lines)
+    run = partial(_run_task, outdir, options, cache_dir=cache_dir, fmt=fmt)
+    if jobs > 1:
+        results = _pool_results(tasks, run, jobs, cancel)
+    else:
+        results = _inline_results(tasks, run, cancel)
+    sheet = PdfSheet(os.path.join(outdir, PDF_NAME)) if fmt == "pdf" else None
+    try:
+        for done, errors, (hits, disk_hits, misses), cells in results:
+            summary.codes += done
+            summary.errors += errors
+            summary.cache_hits += hits
+            summary.cache_disk_hits += disk_hits
+            summary.cache_misses += misses
+            for index, content, png in cells:
+                sheet.add(f"{index}: {content}", png)
+            if progress is not None:
+                progress(summary)
+    finally:
+        if sheet is not None:
+            summary.sheet = (sheet.file.name, sheet.close())
+    summary.cancelled = bool(cancel and cancel.is_set())
+    summary.elapsed = perf_counter() - summary.start
+    return summary
+
+
+class ConsoleProgress:
+    """Progress callback keeping one `n/total | codes/s` line updated on stderr."""
+
+    def __init__(self, out=None):
+        self.out = out or sys.stderr
+        self.last = 0.0
+
+    def __call__(self, summary):
+        now = perf_counter()
+        if now - self.last < PROGRESS_INTERVAL:
+            return
+        self.last = now
+        total = f"/{summary.total}" if summary.total is not None else ""
+        self.out.write(f"\r  {summary.processed}{total} codes | {summary.rate():.1f} codes/s   ")
+        self.out.flush()
+
+    def finish(self):
+        if self.last:
+            self.out.write("\n")
@@ -0,0 +1,100 @@
+# tools/qr/bench.py
+"""
+QR rendering benchmark.
+
+    python -m tools.qr.bench [--versions 10,40] [--count 50] [--box-size 10] [--save]
+
+Encodes one code per version, then times turning its matrix into an image:
+
+    pil         qrcode's PIL image factory + convert("RGB") (the old path)
+    numpy       render_qr(mode="P"), the palette image the batch writer saves
+    numpy-rgb   render_qr(), as the GUI and the logo paste get it
+    resize      the same palette image without NumPy (bytes + NEAREST resize)
+
+Every renderer is checked to produce the same pixels as `pil`. `encode` is
+the cost of qr.make() alone, shared by all of them. --save adds writing each
+image as a PNG to memory, i.e. the whole per-code cost of a batch minus I/O.
+"""
+import argparse
+import io
+from time import perf_counter
+
+import qrcode
+from PIL import ImageChops
+
+from . import render
+from .encoder import ECC_LEVELS
+
+RENDERERS = ("pil", "numpy", "numpy-rgb", "resize")
+
+
+def _encoded(version, box_size):
+    qr = qrcode.QRCode(version=version, error_correction=ECC_LEVELS["M"], box_size=box_size, border=4)
+    qr.add_data("x")
+    qr.make(fit=False)
+    return qr
+
+
+def _renderer(name):
+    if name == "pil":
+        return lambda qr: qr.make_image(fill_color="#000000", back_color="#FFFFFF").convert("RGB")
+    if name == "numpy-rgb":
+        return lambda qr: render.render_qr(qr)
+    return lambda qr: render.render_qr(qr, mode="P")
+
+
+def _timed(fn, count):
+    start = perf_counter()
+    for _ in range(count):
+        fn()
+    return (perf_counter() - start) / count
+
+
+def _png(img):
+    buffer = io.BytesIO()
+    img.save(buffer, "PNG")
+    return buffer
+
+
+def run(name, qr, count, save):
+    numpy = render.np
+    if name == "resize":
+        render.np = None
+    try:
+        fn = _renderer(name)
+        if save:
+            return _timed(lambda: _png(fn(qr)), count), fn(qr)
+        return _timed(lambda: fn(qr), count), fn(qr)
+    finally:
+        render.np = numpy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tools.qr.bench")
+    parser.add_argument("--versions", default="10,40")
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--box-size", type=int, default=10)
+    parser.add_argument("--save", action="store_true", help="include PNG encoding")
+    args = parser.parse_args(argv)
+    if render.np is None:
+        print("numpy is not installed: the numpy rows measure the PIL fallback")
+    for version in (int(v) for v in args.versions.split(",")):
+        qr = _encoded(version, args.box_size)
+        size = len(qr.get_matrix()) * args.box_size
+        encode = _timed(lambda: _encoded(version, args.box_size), max(1, args.count // 5))
+        print(f"version {version} ({size}x{size} px), {args.count} codes"
+              f"{', with PNG encoding' if args.save else ''}:")
+        print(f"  {'encode':<10} {encode * 1000:8.2f} ms/code")
+        base, reference = None, None
+        for name in RENDERERS:
+            seconds, img = run(name, qr, args.count, args.save)
+            if reference is None:
+                base, reference = seconds, img
+            elif ImageChops.difference(reference, img.convert("RGB")).getbbox() is not None:
+                raise SystemExit(f"{name}: pixels differ from the pil renderer")
+            print(f"  {name:<10} {seconds * 1000:8.2f} ms/code  {base / seconds:5.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
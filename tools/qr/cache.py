@@ -0,0 +1,209 @@
+# tools/qr/cache.py
+"""
+Content-addressed QR output cache.
+
+A code's file depends only on its content, style and format, so it is
+stored under
+
+    sha256(cache tag, format, content, version, ecc, fg, bg, box_size,
+           border, logo fingerprint, logo ratio)
+
+where the logo fingerprint is (absolute path, size, mtime_ns), as for the
+logo cache: editing the logo file changes every key that uses it. Lookups go
+through an in-memory LRU of file bytes first, then the on-disk store
+
+    Date/qr_cache/<key[:2]>/<key>.<png|svg>
+
+shared by the GUI, `qrcode gen` and every batch worker, so duplicate lines in
+a batch and repeat generations skip encoding and rendering altogether. Disk
+writes go through a temp file + os.replace, so concurrent workers producing
+the same code never leave a torn file. CACHE_TAG is part of the key; bump it
+when the renderer's output changes.
+
+The store is capped at MAX_BYTES. Each cache scans the store's size on its
+first write and then counts its own writes; once that passes the cap, files
+are removed least recently used first (a disk hit touches the file's mtime)
+until the store is down to PRUNE_TO of the cap. Concurrent batch workers each
+count only their own writes, so the store can overshoot by a little until
+one of them rescans it.
+"""
+import hashlib
+import io
+import json
+import os
+from collections import OrderedDict
+
+from PIL import Image
+
+from .export import RENDERERS, file_format
+
+CACHE_TAG = "qr-2"
+MEMORY_ITEMS = 256
+MAX_BYTES = 64 * 1024 * 1024
+PRUNE_TO = 0.9          # fraction of the cap left after an eviction pass
+DEFAULT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "Date", "qr_cache")
+
+
+def logo_fingerprint(path):
+    if not path:
+        return None
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    return [path, st.st_size, st.st_mtime_ns]
+
+
+def cache_key(content, options, fmt="png"):
+    fields = [CACHE_TAG, fmt, content, options.version, options.ecc, options.fg, options.bg,
+              options.box_size, options.border, logo_fingerprint(options.logo),
+              options.logo_ratio if options.logo else None]
+    return hashlib.sha256(json.dumps(fields).encode("utf-8", "surrogateescape")).hexdigest()
+
+
+class QRCache:
+
+    def __init__(self, directory=DEFAULT_DIR, memory_items=MEMORY_ITEMS, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes      # None: no cap
+        self.memory = OrderedDict()     # key -> file bytes, most recent last
+        self.disk_bytes = None          # store size estimate, scanned on the first write
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def path_for(self, key, fmt="png"):
+        return os.path.join(self.directory, key[:2], f"{key}.{fmt}")
+
+    def get(self, content, options, fmt="png"):
+        """The code's file bytes in `fmt`, from memory, disk, or rendered and stored."""
+        fmt = file_format(fmt)
+        key = cache_key(content, options, fmt)
+        data = self.memory.get(key)
+        if data is not None:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return data
+        data = self._load(key, fmt)
+        if data is not None:
+            self.disk_hits += 1
+        else:
+            data = RENDERERS[fmt](content, options)
+            self.misses += 1
+            self._store(key, fmt, data)
+        self._remember(key, data)
+        return data
+
+    def png(self, content, options):
+        return self.get(content, options, "png")
+
+    def image(self, content, options, mode="RGB"):
+        img = Image.open(io.BytesIO(self.png(content, options)))
+        return img.convert(mode) if img.mode != mode else img
+
+    def _remember(self, key, data):
+        self.memory[key] = data
+        if len(self.memory) > self.memory_items:
+            self.memory.popitem(last=False)
+
+    def _load(self, key, fmt):
+        path = self.path_for(key, fmt)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)      # recency for eviction; atime is often not updated
+        except OSError:
+            pass
+        return data
+
+    def _store(self, key, fmt, data):
+        path = self.path_for(key, fmt)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            # a read-only checkout just runs uncached
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+        if self.max_bytes:
+            if self.disk_bytes is None:
+                self.disk_bytes = self.size()
+            else:
+                self.disk_bytes += len(data)
+            if self.disk_bytes > self.max_bytes:
+                self.prune()
+        return True
+
+    def entries(self):
+        paths = []
+        try:
+            shards = os.listdir(self.directory)
+        except OSError:
+            return paths
+        for shard in shards:
+            folder = os.path.join(self.directory, shard)
+            try:
+                paths += [os.path.join(folder, n) for n in os.listdir(folder)
+                          if n.endswith(tuple(f".{fmt}" for fmt in RENDERERS))]
+            except OSError:
+                pass
+        return paths
+
+    def size(self):
+        return sum(size for _, size, _ in self._stat_entries())
+
+    def _stat_entries(self):
+        """(mtime, size, path) of every stored file."""
+        found = []
+        for path in self.entries():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            found.append((st.st_mtime_ns, st.st_size, path))
+        return found
+
+    def prune(self, max_bytes=None):
+        """Remove least recently used files until the store is within PRUNE_TO of the cap."""
+        limit = int((max_bytes or self.max_bytes) * PRUNE_TO)
+        found = sorted(self._stat_entries())
+        total = sum(size for _, size, _ in found)
+        removed = 0
+        for _, size, path in found:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self.disk_bytes = total
+        self.evicted += removed
+        return removed
+
+    def clear(self):
+        self.memory.clear()
+        self.disk_bytes = None
+        removed = 0
+        for path in self.entries():
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def stats(self):
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "evicted": self.evicted}
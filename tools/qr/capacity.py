@@ -0,0 +1,117 @@
+# tools/qr/capacity.py
+"""
+QR version selection from the symbol capacity table.
+
+DATA_CODEWORDS is ISO/IEC 18004 table 7: the data codewords of every version
+(1-40) at each error correction level. A segment costs a 4-bit mode
+indicator, a character count whose width depends on the mode and on the
+version group (1-9, 10-26, 27-40), and its payload bits:
+
+    numeric        10 bits per 3 digits (4 / 7 for a trailing 1 / 2)
+    alphanumeric   11 bits per 2 characters (6 for a trailing one)
+    byte           8 bits per byte (str is encoded as UTF-8)
+
+fit_version() sums that over the segments qrcode.add_data() produced once per
+version group and bisects the table, so a code is encoded exactly once at the
+smallest version that holds it, instead of being forced up to a fixed default
+and refitted by make(fit=True). CAPACITY, derived from the same numbers, gives
+the familiar single-mode character limits (v1-L: 41 digits, 25 alphanumeric,
+17 bytes; v40-H: 3057 / 1852 / 1273).
+"""
+from bisect import bisect_left
+
+from qrcode.exceptions import DataOverflowError
+from qrcode.util import MODE_8BIT_BYTE, MODE_ALPHA_NUM, MODE_KANJI, MODE_NUMBER
+
+AUTO = "auto"
+
+DATA_CODEWORDS = {
+    "L": (19, 34, 55, 80, 108, 136, 156, 194, 232, 274,
+          324, 370, 428, 461, 523, 589, 647, 721, 795, 861,
+          932, 1006, 1094, 1174, 1276, 1370, 1468, 1531, 1631, 1735,
+          1843, 1955, 2071, 2191, 2306, 2434, 2566, 2702, 2812, 2956),
+    "M": (16, 28, 44, 64, 86, 108, 124, 154, 182, 216,
+          254, 290, 334, 365, 415, 453, 507, 563, 627, 669,
+          714, 782, 860, 914, 1000, 1062, 1128, 1193, 1267, 1373,
+          1455, 1541, 1631, 1725, 1812, 1914, 1992, 2102, 2216, 2334),
+    "Q": (13, 22, 34, 48, 62, 76, 88, 110, 132, 154,
+          180, 206, 244, 261, 295, 325, 367, 397, 445, 485,
+          512, 568, 614, 664, 718, 754, 808, 871, 911, 985,
+          1033, 1115, 1171, 1231, 1286, 1354, 1426, 1502, 1582, 1666),
+    "H": (9, 16, 26, 36, 46, 60, 66, 86, 100, 122,
+          140, 158, 180, 197, 223, 253, 283, 313, 341, 385,
+          406, 442, 464, 514, 538, 596, 628, 661, 701, 745,
+          793, 845, 901, 961, 986, 1054, 1096, 1142, 1222, 1276),
+}
+DATA_BITS = {ecc: tuple(8 * n for n in codewords) for ecc, codewords in DATA_CODEWORDS.items()}
+
+# (first version, last version) -> character count bits per mode
+VERSION_GROUPS = (
+    (1, 9, {MODE_NUMBER: 10, MODE_ALPHA_NUM: 9, MODE_8BIT_BYTE: 8, MODE_KANJI: 8}),
+    (10, 26, {MODE_NUMBER: 12, MODE_ALPHA_NUM: 11, MODE_8BIT_BYTE: 16, MODE_KANJI: 10}),
+    (27, 40, {MODE_NUMBER: 14, MODE_ALPHA_NUM: 13, MODE_8BIT_BYTE: 16, MODE_KANJI: 12}),
+)
+MODES = {"numeric": MODE_NUMBER, "alphanumeric": MODE_ALPHA_NUM, "byte": MODE_8BIT_BYTE}
+
+
+def payload_bits(mode, length):
+    if mode == MODE_NUMBER:
+        return 10 * (length // 3) + (0, 4, 7)[length % 3]
+    if mode == MODE_ALPHA_NUM:
+        return 11 * (length // 2) + 6 * (length % 2)
+    if mode == MODE_KANJI:
+        return 13 * length
+    return 8 * length
+
+
+def _max_chars(mode, bits):
+    if mode == MODE_NUMBER:
+        return 3 * (bits // 10) + (0, 0, 0, 0, 1, 1, 1, 2, 2, 2)[bits % 10]
+    if mode == MODE_ALPHA_NUM:
+        return 2 * (bits // 11) + (bits % 11 >= 6)
+    return bits // 8
+
+
+def _count_bits(version):
+    for first, last, widths in VERSION_GROUPS:
+        if version <= last:
+            return widths
+    raise ValueError(f"Invalid version {version}")
+
+
+CAPACITY = {
+    ecc: {name: tuple(_max_chars(mode, bits[v - 1] - 4 - _count_bits(v)[mode]) for v in range(1, 41))
+          for name, mode in MODES.items()}
+    for ecc, bits in DATA_BITS.items()
+}
+
+
+def capacity(version, ecc="M", mode="byte"):
+    """Most characters (bytes for "byte") of one `mode` segment a version holds."""
+    return CAPACITY[ecc][mode][version - 1]
+
+
+def parse_version(value):
+    """A version setting: "auto" or an int 1-40."""
+    if str(value).strip().lower() == AUTO:
+        return AUTO
+    version = int(value)
+    if not 1 <= version <= 40:
+        raise ValueError(f"QR version must be 1-40 or {AUTO}, not {value}")
+    return version
+
+
+def fit_version(segments, ecc="M", start=1):
+    """
+    Smallest version >= `start` whose data capacity at `ecc` holds the
+    segments (qrcode QRData items). Raises DataOverflowError past version 40.
+    """
+    limits = DATA_BITS[ecc]
+    for first, last, widths in VERSION_GROUPS:
+        if last < start:
+            continue
+        needed = sum(4 + widths[s.mode] + payload_bits(s.mode, len(s)) for s in segments)
+        version = bisect_left(limits, needed, max(first, start) - 1, last) + 1
+        if version <= last:
+            return version
+    raise DataOverflowError(f"Data too long for a version 40 code at error correction {ecc}")
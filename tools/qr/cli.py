@@ -0,0 +1,163 @@
+# tools/qr/cli.py
+"""
+QR command line.
+
+    qrcode gen <data|-> [-o out.png|-] [--box-size N] [--no-cache] [style options]
+    qrcode batch <input.txt> <outdir> [--format png|svg|pdf] [--jobs N] [--no-cache]
+                 [--version V|auto] [--ecc L|M|Q|H] [--fg COLOR] [--bg COLOR]
+                 [--logo PATH] [--logo-size R]
+    qrcode cache stats | clear
+
+`gen` reads the data from stdin when given `-`, and writes the image bytes
+to stdout with `-o -`; the file format follows the output's extension (.svg
+for a vector code). PNGs and SVGs are served from and added to the output cache
+in Date/qr_cache (tools/qr/cache.py) unless --no-cache is given.
+
+Available as `python -m tools.qr ...` and as the `qrcode` shell command
+(which opens the GUI when given no arguments).
+"""
+import argparse
+import os
+import sys
+
+from qrcode.exceptions import DataOverflowError
+
+from .batch import ConsoleProgress, count_lines, read_lines, run_batch
+from .cache import DEFAULT_DIR as CACHE_DIR, QRCache
+from .capacity import AUTO, parse_version
+from .encoder import ECC_LEVELS, QROptions, encode
+from .export import FORMATS, RENDERERS, code_bytes
+
+
+def version_arg(value):
+    try:
+        return parse_version(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def add_style_arguments(p):
+    p.add_argument("--version", type=version_arg, default=AUTO, metavar="1-40|auto",
+                   help="smallest QR version to use (default auto: the smallest that fits)")
+    p.add_argument("--ecc", default="M", choices=list(ECC_LEVELS), help="error correction level")
+    p.add_argument("--fg", default="#000000", help="module colour")
+    p.add_argument("--bg", default="#FFFFFF", help="background colour")
+    p.add_argument("--logo", default=None, help="image pasted in the centre")
+    p.add_argument("--logo-size", type=float, default=0.2, help="logo width as a fraction of the code")
+
+
+def options_from(args):
+    return QROptions(version=args.version, ecc=args.ecc, fg=args.fg, bg=args.bg,
+                     logo=args.logo, logo_ratio=args.logo_size)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="qrcode", description="Generate QR codes without the GUI.")
+    sub = parser.add_subparsers(dest="action", required=True)
+    p = sub.add_parser("gen", help="one code to a file or stdout")
+    p.add_argument("data", help="text to encode, or - to read stdin")
+    p.add_argument("--output", "-o", default="qrcode.png", help="image path, or - for PNG on stdout")
+    p.add_argument("--box-size", type=int, default=10, help="pixels per module")
+    p.add_argument("--no-cache", action="store_true", help="render without the output cache")
+    p.add_argument("--cache-dir", default=CACHE_DIR, help=argparse.SUPPRESS)
+    add_style_arguments(p)
+    p = sub.add_parser("batch", help="one PNG per non-empty line of a text file")
+    p.add_argument("input", metavar="input.txt")
+    p.add_argument("outdir")
+    p.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="worker processes")
+    p.add_argument("--format", "-f", dest="fmt", choices=FORMATS, default="png",
+                   help="one PNG or SVG per line, or a single PDF contact sheet")
+    p.add_argument("--no-cache", action="store_true", help="render every line, bypassing the output cache")
+    p.add_argument("--cache-dir", default=CACHE_DIR, help=argparse.SUPPRESS)
+    add_style_arguments(p)
+    p = sub.add_parser("cache", help="inspect or clear the output cache")
+    p.add_argument("op", nargs="?", choices=("stats", "clear"), default="stats")
+    p.add_argument("--cache-dir", default=CACHE_DIR, help=argparse.SUPPRESS)
+    return parser
+
+
+def output_format(path):
+    """PIL format name (or "SVG") for an output path ("-" is PNG on stdout), or None if unknown."""
+    if path == "-":
+        return "PNG"
+    if path.lower().endswith(".svg"):
+        return "SVG"
+    from PIL import Image
+    return Image.registered_extensions().get(os.path.splitext(path)[1].lower())
+
+
+def gen_command(args, out=None):
+    out = out or sys.stdout
+    fmt = output_format(args.output)
+    if fmt is None:
+        out.write(f"qrcode: unknown image type: {args.output}\n")
+        return 1
+    if args.logo and not os.path.isfile(args.logo):
+        out.write(f"qrcode: logo not found: {args.logo}\n")
+        return 1
+    data = sys.stdin.read().rstrip("\n") if args.data == "-" else args.data
+    try:
+        kind = fmt.lower()
+        if kind in RENDERERS:
+            options = QROptions(version=args.version, ecc=args.ecc, fg=args.fg, bg=args.bg,
+                                box_size=args.box_size, logo=args.logo, logo_ratio=args.logo_size)
+            if args.no_cache:
+                image = code_bytes(data, options, kind)
+            else:
+                image = QRCache(args.cache_dir).get(data, options, kind)
+        else:
+            image = encode(data, version=args.version, ecc=args.ecc, fg=args.fg, bg=args.bg,
+                           logo=args.logo, logo_ratio=args.logo_size, box_size=args.box_size,
+                           format=fmt)
+    except (ValueError, DataOverflowError) as e:
+        out.write(f"qrcode: {e}\n")
+        return 1
+    if args.output == "-":
+        sys.stdout.buffer.write(image)
+        sys.stdout.flush()
+        return 0
+    with open(args.output, "wb") as f:
+        f.write(image)
+    out.write(f"Saved {args.output} ({len(image)} bytes)\n")
+    return 0
+
+
+def batch_command(args, out=None):
+    out = out or sys.stdout
+    if args.logo and not os.path.isfile(args.logo):
+        out.write(f"qrcode: logo not found: {args.logo}\n")
+        return 1
+    try:
+        total = count_lines(args.input)
+    except OSError as e:
+        out.write(f"qrcode: cannot read {args.input}: {e.strerror}\n")
+        return 1
+    progress = ConsoleProgress()
+    summary = run_batch(read_lines(args.input), args.outdir, options_from(args), jobs=args.jobs,
+                        total=total, progress=progress,
+                        cache_dir=None if args.no_cache else args.cache_dir, fmt=args.fmt)
+    progress.finish()
+    out.write(summary.report() + "\n")
+    return 1 if summary.errors else 0
+
+
+def cache_command(args, out=None):
+    out = out or sys.stdout
+    cache = QRCache(args.cache_dir)
+    if args.op == "clear":
+        out.write(f"removed {cache.clear()} cached code(s) from {cache.directory}\n")
+    else:
+        entries = cache.entries()
+        size = cache.size()
+        out.write(f"{cache.directory}: {len(entries)} cached code(s), {size / 1024:.1f} KiB "
+                  f"(capped at {cache.max_bytes / 1024:.0f} KiB, least recently used evicted first)\n")
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.action == "gen":
+        return gen_command(args)
+    if args.action == "cache":
+        return cache_command(args)
+    return batch_command(args)
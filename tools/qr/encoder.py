@@ -0,0 +1,98 @@
+# tools/qr/encoder.py
+"""
+QR rendering without any GUI: the same codes AdvancedQRGenerator draws, from
+plain settings instead of Tk widgets, so they can be made in worker processes,
+on servers without a display, or from the `qrcode gen` command.
+
+    encode("https://example.org")                       -> RGB PIL image
+    encode("hello", version=2, ecc="H", format="PNG")   -> PNG bytes
+
+The GUI builds a QROptions from its widgets once and calls make_image().
+"""
+import io
+
+import qrcode
+
+from .capacity import AUTO, fit_version, parse_version
+from .logo import prepared_logo
+from .render import render_qr
+
+ECC_LEVELS = {
+    "L": qrcode.constants.ERROR_CORRECT_L,
+    "M": qrcode.constants.ERROR_CORRECT_M,
+    "Q": qrcode.constants.ERROR_CORRECT_Q,
+    "H": qrcode.constants.ERROR_CORRECT_H,
+}
+
+
+class QROptions:
+    """Everything that decides what a code looks like (picklable, sent to workers once per task)."""
+    __slots__ = ("version", "ecc", "fg", "bg", "box_size", "border", "logo", "logo_ratio")
+
+    def __init__(self, version=AUTO, ecc="M", fg="#000000", bg="#FFFFFF", box_size=10, border=4,
+                 logo=None, logo_ratio=0.2):
+        if ecc not in ECC_LEVELS:
+            raise ValueError(f"error correction must be one of {', '.join(ECC_LEVELS)}")
+        self.version = parse_version(version)   # "auto", or the smallest version to use
+        self.ecc = ecc
+        self.fg = fg
+        self.bg = bg
+        self.box_size = box_size
+        self.border = border
+        self.logo = logo or None
+        self.logo_ratio = logo_ratio
+
+
+def make_qr(content, options):
+    """The encoded qrcode.QRCode (get_matrix() ready) of one code."""
+    if not content:
+        raise ValueError("Content cannot be empty")
+    qr = qrcode.QRCode(
+        error_correction=ECC_LEVELS[options.ecc],
+        box_size=options.box_size,
+        border=options.border,
+    )
+    qr.add_data(content)
+    # one encode at the smallest version that fits (tools/qr/capacity.py)
+    start = 1 if options.version == AUTO else options.version
+    qr.version = fit_version(qr.data_list, options.ecc, start)
+    qr.make(fit=False)
+    return qr
+
+
+def make_image(content, options, mode="RGB"):
+    """
+    The PIL image of one code. mode "P" returns the two-colour palette image
+    (cheaper to make and to save) unless a logo has to be pasted, which needs RGB.
+    """
+    qr = make_qr(content, options)
+    if options.logo:
+        return add_logo(render_qr(qr, options.fg, options.bg), options.logo, options.logo_ratio)
+    return render_qr(qr, options.fg, options.bg, mode)
+
+
+def add_logo(img, path, ratio):
+    """Paste the logo at `path`, `ratio` of the code's width, through a circular mask."""
+    logo, mask = prepared_logo(path, int(img.size[0] * ratio), img.mode)
+    pos = ((img.size[0] - logo.size[0]) // 2, (img.size[1] - logo.size[1]) // 2)
+    img.paste(logo, pos, mask)
+    return img
+
+
+def encode(data, version=AUTO, ecc="M", fg="#000000", bg="#FFFFFF", logo=None, logo_ratio=0.2,
+           box_size=10, border=4, format=None):
+    """
+    One code as an RGB PIL image, or, given a PIL `format` name ("PNG",
+    "JPEG", ...), as the encoded file's bytes. PNGs are written from the
+    two-colour palette image (1 bit per pixel) unless there is a logo.
+    """
+    options = QROptions(version=version, ecc=ecc, fg=fg, bg=bg, box_size=box_size, border=border,
+                        logo=logo, logo_ratio=logo_ratio)
+    if format is None:
+        return make_image(data, options)
+    if format.upper() == "PNG":
+        from .export import png_bytes
+        return png_bytes(data, options)
+    buffer = io.BytesIO()
+    make_image(data, options).save(buffer, format)
+    return buffer.getvalue()
@@ -0,0 +1,218 @@
+# tools/qr/export.py
+"""
+Export formats for generated codes.
+
+    png   1-bit palette PNG (2-colour palette, zlib level 9); RGB when a logo
+          is pasted in
+    svg   vector code built straight from the module matrix: one <path> of
+          horizontal runs in module units, scaled by the viewBox
+    pdf   printable contact sheet, COLUMNS x ROWS labelled codes per A4 page
+
+png and svg are one file per code (code_bytes()). The PDF is one file for a
+whole batch, written by PdfSheet as codes arrive: each code is embedded as an
+image object made from its PNG, whose IDAT stream is already valid PDF
+FlateDecode data with a PNG predictor, so nothing is decoded or recompressed.
+Finished pages go straight to disk; only object offsets are kept until the
+cross-reference table is written at the end, so memory stays flat however
+many codes go in.
+"""
+import base64
+import io
+import struct
+import zlib
+from itertools import groupby
+
+from .encoder import add_logo, make_qr
+from .logo import prepared_logo
+from .render import palette_for, render_qr
+
+FORMATS = ("png", "svg", "pdf")
+PNG_OPTIONS = {"compress_level": 9}
+PDF_NAME = "qrcodes.pdf"
+
+
+# ---------------- single codes ----------------
+def png_bytes(content, options):
+    qr = make_qr(content, options)
+    buffer = io.BytesIO()
+    if options.logo:
+        img = add_logo(render_qr(qr, options.fg, options.bg), options.logo, options.logo_ratio)
+        img.save(buffer, "PNG", **PNG_OPTIONS)
+    else:
+        render_qr(qr, options.fg, options.bg, mode="P").save(buffer, "PNG", bits=1, **PNG_OPTIONS)
+    return buffer.getvalue()
+
+
+def _hex(rgb):
+    return "#%02x%02x%02x" % tuple(rgb)
+
+
+def _svg_logo(size, options):
+    logo, mask = prepared_logo(options.logo, int(size * options.logo_ratio), "RGBA")
+    logo = logo.copy()
+    logo.putalpha(mask)
+    buffer = io.BytesIO()
+    logo.save(buffer, "PNG")
+    x, y = (size - logo.size[0]) // 2, (size - logo.size[1]) // 2
+    data = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return (f'<image x="{x / options.box_size:g}" y="{y / options.box_size:g}" '
+            f'width="{logo.size[0] / options.box_size:g}" height="{logo.size[1] / options.box_size:g}" '
+            f'href="data:image/png;base64,{data}"/>')
+
+
+def svg_bytes(content, options):
+    matrix = make_qr(content, options).get_matrix()
+    n = len(matrix)
+    size = n * options.box_size
+    palette = palette_for(options.fg, options.bg)
+    runs = []
+    for y, row in enumerate(matrix):
+        x = 0
+        for dark, cells in groupby(row):
+            width = sum(1 for _ in cells)
+            if dark:
+                runs.append(f"M{x} {y}h{width}v1h-{width}z")
+            x += width
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+        f'viewBox="0 0 {n} {n}" shape-rendering="crispEdges">',
+        f'<rect width="{n}" height="{n}" fill="{_hex(palette[:3])}"/>',
+        f'<path fill="{_hex(palette[3:])}" d="{"".join(runs)}"/>',
+    ]
+    if options.logo:
+        parts.append(_svg_logo(size, options))
+    parts.append("</svg>\n")
+    return "\n".join(parts).encode("utf-8")
+
+
+RENDERERS = {"png": png_bytes, "svg": svg_bytes}
+
+
+def file_format(fmt):
+    """The per-code format behind an export format: a PDF sheet is built from PNGs."""
+    return "png" if fmt == "pdf" else fmt
+
+
+def code_bytes(content, options, fmt="png"):
+    return RENDERERS[file_format(fmt)](content, options)
+
+
+# ---------------- PDF contact sheet ----------------
+def png_image_object(png):
+    """(image dictionary, stream data) of a PDF image XObject holding a non-interlaced PNG."""
+    if png[:8] != b"\x89PNG\r\n\x1a\n":
+        raise ValueError("not a PNG")
+    pos, idat, palette = 8, [], None
+    while pos < len(png):
+        length, kind = struct.unpack(">I4s", png[pos:pos + 8])
+        body = png[pos + 8:pos + 8 + length]
+        if kind == b"IHDR":
+            width, height, depth, color, _, _, interlace = struct.unpack(">IIBBBBB", body)
+        elif kind == b"PLTE":
+            palette = body
+        elif kind == b"IDAT":
+            idat.append(body)
+        pos += 12 + length
+    if interlace:
+        raise ValueError("interlaced PNGs are not supported")
+    if color == 3:
+        space, colors = f"[/Indexed /DeviceRGB {len(palette) // 3 - 1} <{palette.hex()}>]", 1
+    elif color == 2:
+        space, colors = "/DeviceRGB", 3
+    elif color == 0:
+        space, colors = "/DeviceGray", 1
+    else:
+        raise ValueError(f"PNG colour type {color} has alpha, which cannot be embedded")
+    data = b"".join(idat)
+    header = (f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+              f"/ColorSpace {space} /BitsPerComponent {depth} /Filter /FlateDecode "
+              f"/DecodeParms << /Predictor 15 /Colors {colors} /BitsPerComponent {depth} "
+              f"/Columns {width} >> /Length {len(data)} >>")
+    return header, data
+
+
+def _pdf_text(text):
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+class PdfSheet:
+    """Streamed multi-page contact sheet: add(label, png) per code, then close()."""
+    PAGE = (595.28, 841.89)     # A4 in points
+    MARGIN = 36
+    COLUMNS = 4
+    ROWS = 5
+    LABEL_SIZE = 7
+    LABEL_CHARS = 34
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.offsets = {}
+        self.next_id = 4        # 1 catalog, 2 page tree, 3 font
+        self.pages = []
+        self.cells = []         # (image id, label) of the page being filled
+        self.count = 0
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _object(self, header, stream=None, obj=None):
+        if obj is None:
+            obj, self.next_id = self.next_id, self.next_id + 1
+        self.offsets[obj] = self.file.tell()
+        self.file.write(f"{obj} 0 obj\n{header}\n".encode("latin-1"))
+        if stream is not None:
+            self.file.write(b"stream\n" + stream + b"\nendstream\n")
+        self.file.write(b"endobj\n")
+        return obj
+
+    def add(self, label, png):
+        header, data = png_image_object(png)
+        self.cells.append((self._object(header, data), label))
+        self.count += 1
+        if len(self.cells) == self.COLUMNS * self.ROWS:
+            self._flush_page()
+
+    def _flush_page(self):
+        if not self.cells:
+            return
+        page_w, page_h = self.PAGE
+        cell_w = (page_w - 2 * self.MARGIN) / self.COLUMNS
+        cell_h = (page_h - 2 * self.MARGIN) / self.ROWS
+        side = min(cell_w, cell_h - 2 * self.LABEL_SIZE) - 8
+        ops, images = [], []
+        for n, (image, label) in enumerate(self.cells):
+            col, row = n % self.COLUMNS, n // self.COLUMNS
+            x = self.MARGIN + col * cell_w + (cell_w - side) / 2
+            y = page_h - self.MARGIN - (row + 1) * cell_h + 2 * self.LABEL_SIZE
+            if len(label) > self.LABEL_CHARS:
+                label = label[:self.LABEL_CHARS - 3] + "..."
+            ops.append(f"q {side:.2f} 0 0 {side:.2f} {x:.2f} {y:.2f} cm /Im{n} Do Q")
+            ops.append(f"BT /F1 {self.LABEL_SIZE} Tf {x:.2f} {y - self.LABEL_SIZE - 2:.2f} Td "
+                       f"({_pdf_text(label)}) Tj ET")
+            images.append(f"/Im{n} {image} 0 R")
+        content = zlib.compress("\n".join(ops).encode("latin-1"))
+        contents = self._object(f"<< /Filter /FlateDecode /Length {len(content)} >>", content)
+        self.pages.append(self._object(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_w} {page_h}] "
+            f"/Resources << /XObject << {' '.join(images)} >> /Font << /F1 3 0 R >> >> "
+            f"/Contents {contents} 0 R >>"))
+        self.cells = []
+
+    def close(self):
+        """Write the last page, page tree and cross-reference table. Returns the page count."""
+        if self.file.closed:
+            return len(self.pages)
+        try:
+            self._flush_page()
+            self._object("<< /Type /Catalog /Pages 2 0 R >>", obj=1)
+            kids = " ".join(f"{page} 0 R" for page in self.pages)
+            self._object(f"<< /Type /Pages /Kids [{kids}] /Count {len(self.pages)} >>", obj=2)
+            self._object("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+                         "/Encoding /WinAnsiEncoding >>", obj=3)
+            xref = self.file.tell()
+            lines = [f"xref\n0 {self.next_id}\n", "0000000000 65535 f \n"]
+            lines += [f"{self.offsets[obj]:010d} 00000 n \n" for obj in range(1, self.next_id)]
+            lines.append(f"trailer\n<< /Size {self.next_id} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n")
+            self.file.write("".join(lines).encode("latin-1"))
+        finally:
+            self.file.close()
+        return len(self.pages)
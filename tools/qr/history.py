@@ -0,0 +1,131 @@
+# tools/qr/history.py
+"""
+Generation history for the QR GUI, with bounded memory.
+
+Only a preview-sized thumbnail of each code is kept, as PNG bytes (a few kB
+for a QR code). The newest `memory_items` entries hold their bytes in memory;
+older ones are spilled to PNG files in a per-window directory under
+Date/qr_history and read back only when the user selects them. Past
+`max_items` the oldest entries are dropped altogether, files included.
+
+Entries are ordered newest first, matching the GUI's history list, so an
+index into the Listbox is an index into the history. close() removes the
+window's directory; directories left behind by a crashed window are removed
+the next time a history is opened.
+"""
+import io
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from time import time
+
+from PIL import Image
+
+DEFAULT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "Date", "qr_history")
+MEMORY_ITEMS = 50
+MAX_ITEMS = 1000
+THUMBNAIL_SIZE = (400, 400)
+STALE_AFTER = 24 * 3600
+
+
+class HistoryEntry:
+    __slots__ = ("time", "label", "png", "path")
+
+    def __init__(self, time, label, png):
+        self.time = time
+        self.label = label
+        self.png = png          # thumbnail PNG bytes while in memory
+        self.path = None        # spill file once on disk
+
+
+class QRHistory:
+
+    def __init__(self, directory=DEFAULT_DIR, memory_items=MEMORY_ITEMS, max_items=MAX_ITEMS,
+                 thumbnail_size=THUMBNAIL_SIZE):
+        self.root = directory
+        self.memory_items = memory_items
+        self.max_items = max_items
+        self.thumbnail_size = thumbnail_size
+        self.entries = []       # newest first
+        self.directory = None   # created on the first spill
+        self._counter = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, content, img):
+        """Record a generated code. Returns (list label, number of oldest entries dropped)."""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        preview = content[:50] + "..." if len(content) > 50 else content
+        # RGB first: thumbnail() of a palette image would fall back to NEAREST
+        thumb = img.convert("RGB") if img.mode == "P" else img.copy()
+        thumb.thumbnail(self.thumbnail_size)
+        buffer = io.BytesIO()
+        thumb.save(buffer, "PNG")
+        entry = HistoryEntry(timestamp, f"{timestamp} - {preview}", buffer.getvalue())
+        self.entries.insert(0, entry)
+        if len(self.entries) > self.memory_items:
+            self._spill(self.entries[self.memory_items])
+        dropped = 0
+        while len(self.entries) > self.max_items:
+            self._discard(self.entries.pop())
+            dropped += 1
+        return entry.label, dropped
+
+    def image(self, index):
+        """The thumbnail of entry `index` (0 = newest), read from disk if it was spilled; None if gone."""
+        entry = self.entries[index]
+        if entry.png is not None:
+            return Image.open(io.BytesIO(entry.png))
+        try:
+            with Image.open(entry.path) as img:
+                img.load()
+                return img
+        except OSError:
+            return None
+
+    def in_memory(self):
+        return sum(entry.png is not None for entry in self.entries)
+
+    def close(self):
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+        self.entries = []
+
+    # ---------- spill store ----------
+    def _spill(self, entry):
+        if entry.png is None:
+            return
+        if self.directory is None:
+            self._remove_stale()
+            os.makedirs(self.root, exist_ok=True)
+            self.directory = tempfile.mkdtemp(prefix="session-", dir=self.root)
+        self._counter += 1
+        entry.path = os.path.join(self.directory, f"{self._counter:06d}.png")
+        with open(entry.path, "wb") as f:
+            f.write(entry.png)
+        entry.png = None
+
+    def _discard(self, entry):
+        if entry.path is not None:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _remove_stale(self):
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return
+        cutoff = time() - STALE_AFTER
+        for name in names:
+            path = os.path.join(self.root, name)
+            try:
+                if name.startswith("session-") and os.stat(path).st_mtime < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
@@ -0,0 +1,46 @@
+# tools/qr/logo.py
+"""
+Prepared logos for pasting into codes.
+
+Opening the logo file, the LANCZOS resize and drawing the circular mask cost
+far more than rendering a code, yet within a batch the logo, its size ratio and
+the code's pixel size hardly ever change. prepared_logo() keeps the resized
+logo (converted to the code's image mode) and its mask in an LRU cache keyed by
+
+    (absolute path, file mtime_ns, target width, image mode)
+
+so an edited logo file is picked up on the next code, and only the first code
+of each size pays for the preparation. Each process (GUI, batch worker) has its
+own cache; the cached images are never modified, only pasted from.
+"""
+import functools
+import os
+
+from PIL import Image, ImageDraw
+
+LOGO_CACHE_SIZE = 32
+
+
+@functools.lru_cache(maxsize=LOGO_CACHE_SIZE)
+def _prepare(path, mtime_ns, width, mode):
+    with Image.open(path) as source:
+        height = max(1, int(source.size[1] * width / float(source.size[0])))
+        logo = source.convert(mode) if source.mode != mode else source.copy()
+    logo = logo.resize((width, height), Image.LANCZOS)
+    mask = Image.new("L", logo.size, 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, logo.size[0], logo.size[1]), fill=255)
+    return logo, mask
+
+
+def prepared_logo(path, width, mode="RGB"):
+    """(logo, mask) for the logo file at `path` scaled to `width` pixels."""
+    path = os.path.abspath(path)
+    return _prepare(path, os.stat(path).st_mtime_ns, max(1, int(width)), mode)
+
+
+def cache_info():
+    return _prepare.cache_info()
+
+
+def clear_cache():
+    _prepare.cache_clear()
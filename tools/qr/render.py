@@ -0,0 +1,63 @@
+# tools/qr/render.py
+"""
+Matrix-to-image rendering.
+
+qrcode's PIL image factory draws every dark module as its own rectangle, in
+Python, then the result is converted to RGB: for a version 40 code that is
+about 15,000 draw calls per image. Here the module matrix is turned into
+pixels in one go instead:
+
+    matrix (n x n bool)  ->  np.repeat along both axes by box_size
+                         ->  uint8 indices 0 = background, 1 = module
+                         ->  "P" image with a two-colour palette
+
+render_matrix() returns that palette image. Converting it to RGB costs about
+as much as building it, so render_qr() only does so when asked: the GUI and
+the logo paste want RGB, the batch writer saves the palette image as is (a
+smaller PNG, written faster). Without NumPy the same indices are built from
+bytes and scaled by PIL's NEAREST resize, which gives identical pixels.
+
+Benchmark: python -m tools.qr.bench
+"""
+from PIL import Image, ImageColor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def palette_for(fg, bg):
+    """The 2-entry palette (background, module) for PIL colour strings or RGB tuples."""
+    back = ImageColor.getrgb(bg) if isinstance(bg, str) else tuple(bg)
+    front = ImageColor.getrgb(fg) if isinstance(fg, str) else tuple(fg)
+    return list(back[:3]) + list(front[:3])
+
+
+def _indices_numpy(matrix, box_size):
+    cells = np.asarray(matrix, dtype=np.uint8)
+    return np.repeat(np.repeat(cells, box_size, axis=0), box_size, axis=1)
+
+
+def render_matrix(matrix, box_size, fg="#000000", bg="#FFFFFF"):
+    """Palette ("P") image of a square module matrix (rows of bools, border included)."""
+    size = len(matrix)
+    if np is not None:
+        img = Image.fromarray(_indices_numpy(matrix, box_size), "P")
+    else:
+        cells = bytes(bool(cell) for row in matrix for cell in row)
+        img = Image.frombytes("P", (size, size), cells)
+        if box_size != 1:
+            img = img.resize((size * box_size, size * box_size), Image.NEAREST)
+    img.putpalette(palette_for(fg, bg))
+    return img
+
+
+def render_qr(qr, fg="#000000", bg="#FFFFFF", mode="RGB"):
+    """
+    Image of a made qrcode.QRCode, pixel-identical to
+    qr.make_image(fill_color=fg, back_color=bg).convert("RGB"). mode "P" skips
+    the conversion and returns the palette image.
+    """
+    img = render_matrix(qr.get_matrix(), qr.box_size, fg, bg)
+    return img if mode == "P" else img.convert(mode)
@@ -0,0 +1,25 @@
+# tools/tomlang_modules/__init__.py
+from .installer import (
+    DEFAULT_JOBS,
+    MANIFEST_NAME,
+    MODULES_DIR,
+    InstallError,
+    install,
+    install_one,
+    read_manifest,
+    resolve,
+)
+from .lockfile import LOCK_NAME, Lockfile
+
+__all__ = [
+    "DEFAULT_JOBS",
+    "MANIFEST_NAME",
+    "MODULES_DIR",
+    "InstallError",
+    "install",
+    "install_one",
+    "read_manifest",
+    "resolve",
+    "LOCK_NAME",
+    "Lockfile",
+]
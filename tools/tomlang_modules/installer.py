@@ -0,0 +1,304 @@
+# tools/tomlang_modules/installer.py
+"""
+TomLang module installer.
+
+Modules are git repositories checked out under .tomlang_modules/<name>.
+Every install is a shallow (--depth 1) clone, and several modules are
+installed at once on a thread pool (the work is git subprocesses and network,
+so threads are enough).
+
+Each module URL also gets a bare mirror in the object cache
+(.tomlang_modules/.cache/<name>-<url hash>.git, or $TOMLANG_MODULE_CACHE to
+share one cache between projects). Installing a module:
+
+  1. creates the mirror with `git clone --bare`, or brings an existing one up
+     to date with `git fetch`, which only transfers objects it lacks;
+  2. clones the working copy from the mirror with --depth 1 --reference
+     <mirror> --dissociate, so no object crosses the network twice, and the
+     checkout still owns its (snapshot-only) objects and keeps working if the
+     cache is deleted; origin is then pointed back at the real URL.
+
+A reinstall, or the same module in another project sharing the cache, only
+costs an up-to-date fetch. The mirror holds full history because git refuses
+a shallow repository as a --reference.
+
+Installs are recorded in a lockfile (lockfile.py). A checkout already at its
+locked commit is left alone; a missing one is cloned and moved to exactly that
+commit, which needs no network when the mirror already has it. `sync` instead
+moves every checkout to the latest upstream commit, in place: the mirror
+fetches what is new, and the checkout fetches just that commit from the mirror
+(--depth 1) and resets onto it with --keep, so local edits survive where
+git can keep them and nothing is deleted and re-cloned.
+
+A project lists its modules in MANIFEST_NAME, one name or URL per line (`#`
+starts a comment), and `install` with no arguments installs all of them in
+one concurrent pass.
+
+Clones go to a temporary directory that is renamed into place when complete,
+so an interrupted install never looks "already satisfied".
+"""
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from time import perf_counter
+
+MODULES_DIR = ".tomlang_modules"
+CACHE_ENV = "TOMLANG_MODULE_CACHE"
+MANIFEST_NAME = "tomlang-modules.txt"
+DEFAULT_JOBS = 4
+PART_SUFFIX = ".part"
+
+
+class InstallError(Exception):
+    pass
+
+
+# ---------------- names and paths ----------------
+def resolve(name_or_url, repo_root):
+    """(module name, clone URL) for a bare module name or a URL."""
+    if name_or_url.startswith("http") or "/" in name_or_url:
+        url = name_or_url
+    else:
+        url = f"{repo_root}{name_or_url}.git"
+    name = url.rstrip("/").split("/")[-1]
+    if name.endswith(".git"):
+        name = name[:-4]
+    return name, url
+
+
+def default_cache_dir(modules_dir=MODULES_DIR):
+    return os.environ.get(CACHE_ENV) or os.path.join(modules_dir, ".cache")
+
+
+def mirror_path(url, cache_dir):
+    name = resolve(url, "")[0]
+    return os.path.join(cache_dir, f"{name}-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:10]}.git")
+
+
+def read_manifest(path=MANIFEST_NAME):
+    """Module names / URLs listed in a manifest file, in order."""
+    modules = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                modules.append(line)
+    return modules
+
+
+# ---------------- git ----------------
+def git(*args, cwd=None):
+    """Run git quietly; returns stdout, raises InstallError with git's own message on failure."""
+    try:
+        done = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise InstallError("git is not installed or not on PATH") from None
+    if done.returncode != 0:
+        lines = [line for line in done.stderr.splitlines() if line.strip()]
+        raise InstallError(lines[-1] if lines else f"git {args[0]} failed ({done.returncode})")
+    return done.stdout
+
+
+def pack_kib(repo):
+    """Object storage of a repository in KiB (loose + packed), from git count-objects."""
+    sizes = {}
+    for line in git("count-objects", "-v", cwd=repo).splitlines():
+        key, _, value = line.partition(":")
+        sizes[key] = value.strip()
+    return int(sizes.get("size", 0)) + int(sizes.get("size-pack", 0))
+
+
+def update_mirror(url, cache_dir):
+    """Create or refresh the bare mirror of `url`. Returns (path, KiB transferred)."""
+    path = mirror_path(url, cache_dir)
+    if os.path.isdir(path):
+        before = pack_kib(path)
+        git("fetch", "--quiet", "--prune", "origin",
+            "+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*", cwd=path)
+        return path, max(pack_kib(path) - before, 0)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}{PART_SUFFIX}"
+    try:
+        git("clone", "--bare", "--quiet", url, tmp)
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            if not os.path.isdir(path):     # else someone else just created it
+                raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return path, pack_kib(path)
+
+
+def has_commit(repo, commit):
+    try:
+        git("cat-file", "-e", f"{commit}^{{commit}}", cwd=repo)
+        return True
+    except InstallError:
+        return False
+
+
+def head(repo):
+    return git("rev-parse", "HEAD", cwd=repo).strip()
+
+
+def source_for(url, cache_dir, use_cache, want=None):
+    """
+    Where to fetch `url` from, and KiB downloaded getting there: the mirror
+    (refreshed unless it already has commit `want`), or the URL itself.
+    """
+    if not use_cache:
+        return url, 0
+    path = mirror_path(url, cache_dir)
+    if not (want and os.path.isdir(path) and has_commit(path, want)):
+        path, kib = update_mirror(url, cache_dir)
+    else:
+        kib = 0
+    return "file://" + os.path.abspath(path).replace(os.sep, "/"), kib
+
+
+def move_to(checkout, source, ref):
+    """
+    Fetch `ref` (depth 1) from `source` and move the checkout there, keeping
+    local edits git can keep. Returns the KiB the checkout grew by.
+    """
+    before = pack_kib(checkout)
+    git("fetch", "--quiet", "--depth", "1", source, ref, cwd=checkout)
+    git("reset", "--quiet", "--keep", "FETCH_HEAD", cwd=checkout)
+    return max(pack_kib(checkout) - before, 0)
+
+
+# ---------------- installing ----------------
+class Result:
+    __slots__ = ("name", "url", "path", "status", "error", "kib", "seconds", "commit", "previous", "size")
+
+    def __init__(self, name, url, path, status, error=None, kib=0, seconds=0.0, commit=None,
+                 previous=None, size=0):
+        self.name = name
+        self.url = url
+        self.path = path
+        self.status = status        # "installed", "updated", "satisfied" or "failed"
+        self.error = error
+        self.kib = kib
+        self.seconds = seconds
+        self.commit = commit
+        self.previous = previous    # commit before an update
+        self.size = size            # object storage of the checkout, bytes (None: unchanged)
+
+    def line(self):
+        if self.status == "satisfied":
+            return f"Requirement already satisfied: {self.name} in {self.path}"
+        if self.status == "failed":
+            return f"ERROR: Could not install {self.name}: {self.error}"
+        if self.status == "updated":
+            return (f"Updated {self.name} {self.previous[:10]} -> {self.commit[:10]}"
+                    f"-{self.seconds:.2f}s [{self.kib:.1f} kB]")
+        if self.kib == 0:
+            return f"Using cached {self.name}-{self.seconds:.2f}s [nothing downloaded]"
+        speed = self.kib / self.seconds if self.seconds > 0 else self.kib
+        return f"Downloaded {self.name}-{self.seconds:.2f}s [{self.kib:.1f} kB @ {speed:.1f} kB/s]"
+
+
+def install_one(name, url, modules_dir=MODULES_DIR, cache_dir=None, use_cache=True, pin=None, sync=False):
+    """
+    Install one module (name, url), or bring an existing checkout to locked
+    commit `pin`; with `sync` it is moved to the latest upstream commit instead.
+    Never raises for git or network failures; see Result.status.
+    """
+    target = os.path.join(modules_dir, name)
+    cache_dir = cache_dir or default_cache_dir(modules_dir)
+    start = perf_counter()
+    if os.path.exists(target):
+        try:
+            return _update(name, url, target, cache_dir, use_cache, pin, sync, start)
+        except (InstallError, OSError) as e:
+            return Result(name, url, target, "failed", error=str(e), seconds=perf_counter() - start)
+    os.makedirs(modules_dir, exist_ok=True)
+    tmp = os.path.join(modules_dir, f".{name}.{os.getpid()}.{threading.get_ident()}{PART_SUFFIX}")
+    want = None if sync else pin
+    try:
+        source, kib = source_for(url, cache_dir, use_cache, want)
+        if use_cache:
+            mirror = source[len("file://"):]
+            git("clone", "--quiet", "--depth", "1", "--reference", mirror, "--dissociate", source, tmp)
+            git("remote", "set-url", "origin", url, cwd=tmp)
+        else:
+            git("clone", "--quiet", "--depth", "1", url, tmp)
+            kib = pack_kib(tmp)
+        if want and head(tmp) != want:
+            moved = move_to(tmp, source, want)
+            kib += 0 if use_cache else moved        # from the mirror it is a local copy
+        commit = head(tmp)
+        size = pack_kib(tmp) * 1024
+        os.rename(tmp, target)
+    except (InstallError, OSError) as e:
+        return Result(name, url, target, "failed", error=str(e), seconds=perf_counter() - start)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return Result(name, url, target, "installed", kib=kib, seconds=perf_counter() - start,
+                  commit=commit, size=size)
+
+
+def _update(name, url, target, cache_dir, use_cache, pin, sync, start):
+    """An existing checkout: left alone if it is where it should be, else fetched incrementally and moved."""
+    current = head(target)
+    if sync:
+        source, kib = source_for(url, cache_dir, use_cache)
+        ref = "HEAD"
+    elif pin is None or current == pin:
+        # a locked module already at its commit costs one rev-parse; its locked size stands
+        size = pack_kib(target) * 1024 if pin is None else None
+        return Result(name, url, target, "satisfied", commit=current, size=size)
+    else:
+        source, kib = source_for(url, cache_dir, use_cache, pin)
+        ref = pin
+    moved = move_to(target, source, ref)
+    kib += 0 if use_cache else moved
+    commit = head(target)
+    status = "satisfied" if commit == current else "updated"
+    return Result(name, url, target, status, kib=kib, seconds=perf_counter() - start,
+                  commit=commit, previous=current, size=pack_kib(target) * 1024)
+
+
+def install(modules, repo_root, jobs=DEFAULT_JOBS, modules_dir=MODULES_DIR, cache_dir=None,
+            use_cache=True, lock=None, sync=False, out=None):
+    """
+    Install `modules` (names or URLs) with up to `jobs` at once, printing
+    pip-style progress as each one finishes. With a lockfile.Lockfile, modules
+    are held at their locked commits and the lock is updated and saved; `sync`
+    moves every module to its latest upstream commit. Returns the Results in
+    input order.
+    """
+    out = out or sys.stdout
+    specs = {}
+    for entry in modules:
+        name, url = resolve(entry, repo_root)
+        specs.setdefault(name, url)
+    if not specs:
+        return []
+    out.write(f"{'Syncing' if sync else 'Collecting'} {', '.join(specs)}\n")
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(specs)))) as pool:
+        futures = {
+            pool.submit(install_one, name, url, modules_dir, cache_dir, use_cache,
+                        lock.pin(name, url) if lock is not None else None, sync): name
+            for name, url in specs.items()
+        }
+        for future in as_completed(futures):
+            result = results[futures[future]] = future.result()
+            out.write(result.line() + "\n")
+            out.flush()
+    ordered = [results[name] for name in specs]
+    installed = [r.name for r in ordered if r.status == "installed"]
+    if installed:
+        out.write(f"Successfully installed {' '.join(installed)}\n")
+    if lock is not None:
+        for r in ordered:
+            if r.status != "failed":
+                lock.record(r.name, r.url, r.commit, r.size)
+        lock.save()
+    return ordered
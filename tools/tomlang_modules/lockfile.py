@@ -0,0 +1,66 @@
+# tools/tomlang_modules/lockfile.py
+"""
+tomlang-modules.lock: what is installed, exactly.
+
+    {"version": 1,
+     "modules": {"<name>": {"url": "<clone url>", "commit": "<sha>", "size": <bytes>}}}
+
+`size` is the git object storage of the checkout. The file is written by every
+install and read by the next one: a module whose checkout is at its locked
+commit needs no git traffic at all, a missing or moved checkout is brought to
+exactly that commit, and only `install --sync` moves modules to the latest
+upstream commit and re-pins them.
+"""
+import json
+import os
+
+LOCK_NAME = "tomlang-modules.lock"
+LOCK_VERSION = 1
+
+
+class Lockfile:
+
+    def __init__(self, path=LOCK_NAME):
+        self.path = path
+        self.modules = {}
+        self.changed = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == LOCK_VERSION:
+            self.modules = data.get("modules", {})
+
+    def pin(self, name, url):
+        """The locked commit of `name`, if it was locked for the same URL."""
+        entry = self.modules.get(name)
+        if entry is None or entry.get("url") != url:
+            return None
+        return entry.get("commit")
+
+    def record(self, name, url, commit, size=None):
+        """Pin `name` at `commit`; a size of None keeps the recorded one."""
+        old = self.modules.get(name) or {}
+        if size is None:
+            size = old.get("size", 0)
+        entry = {"url": url, "commit": commit, "size": size}
+        if self.modules.get(name) != entry:
+            self.modules[name] = entry
+            self.changed = True
+
+    def urls(self):
+        return [entry["url"] for _, entry in sorted(self.modules.items())]
+
+    def save(self):
+        if not self.changed:
+            return
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": LOCK_VERSION, "modules": dict(sorted(self.modules.items()))}, f, indent=2)
+            f.write("\n")
+        os.replace(tmp, self.path)
+        self.changed = False
@@ -0,0 +1,18 @@
+# tools/xplusplus/__init__.py
+from .errors import XppError, XppSyntaxError, XppRuntimeError
+from .parser import parse_program
+from .compiler import Compiler, CompiledProgram
+from .interpreter import Interpreter, VMInterpreter
+from .cache import DiskCache
+
+__all__ = [
+    "XppError",
+    "XppSyntaxError",
+    "XppRuntimeError",
+    "parse_program",
+    "Compiler",
+    "CompiledProgram",
+    "Interpreter",
+    "VMInterpreter",
+    "DiskCache",
+]
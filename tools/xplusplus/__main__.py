@@ -0,0 +1,6 @@
+# tools/xplusplus/__main__.py
+import sys
+
+from .cli import main
+
+sys.exit(main())
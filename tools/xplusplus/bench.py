@@ -0,0 +1,220 @@
+# tools/xplusplus/bench.py
+"""
+X++ benchmarks.
+
+    python -m tools.xplusplus.bench parser [--lines 10000] [--depth 50]
+    python -m tools.xplusplus.bench micro [--scale 1.0] [--repeat 3]
+
+`parser` generates programs made of `depth`-level nested if blocks and times
+the legacy interpreter (which re-extracts every block at every nesting level)
+against the new pipeline (tokenize, parse, compile, run), then checks that
+parse time per line stays flat as the program grows. The first run of a
+program pays the whole cold compile, which on this shape costs more than a
+legacy run_block pass; only cached re-runs skip it, so both are reported
+against legacy.
+
+`micro` runs small compute workloads (recursive fib, nested loops, string
+building) on the Python-bytecode back end (Interpreter) and the stack VM
+(VMInterpreter). The legacy interpreter has no loops or functions, so where it
+can express a workload at all it is driven the way users had to: one REPL line
+per iteration, on a smaller count (per-iteration times are comparable).
+"""
+import argparse
+import sys
+from time import perf_counter
+
+from .compiler import Compiler, PythonCodegen
+from .interpreter import BUILTINS, Interpreter, VMInterpreter
+from .legacy import LegacyInterpreter
+from .lexer import tokenize
+from .parser import Parser
+
+
+def generate_nested_program(lines=10000, depth=50):
+    """
+    `depth` nested ifs wrapped around the whole program, with the statements
+    spread evenly over the levels (brace on its own line, which the legacy
+    interpreter accepts). Every block therefore contains most of the program.
+    """
+    per_level = max(1, (lines - 1) // depth - 3)
+    out = ["x = 0"]
+    for level in range(depth):
+        out.append(f"if x >= {level * per_level}:")
+        out.append("{")
+        out.extend(["x = x + 1"] * per_level)
+    out.extend("}" * depth)
+    return out
+
+
+def timed(fn, *args):
+    start = perf_counter()
+    result = fn(*args)
+    return perf_counter() - start, result
+
+
+def run_legacy(lines):
+    interp = LegacyInterpreter()
+    interp.run_block(lines)
+    return interp.env["x"]
+
+
+def bench_parser(lines, depth, out=sys.stdout):
+    program = generate_nested_program(lines, depth)
+    source = "\n".join(program)
+    out.write(f"Generated program: {len(program)} lines, nesting depth {depth}\n\n")
+
+    t_tokenize, (tokens, jump) = timed(tokenize, source)
+    t_parse, tree = timed(lambda: Parser(tokens, jump).parse_program())
+    t_codegen, module = timed(lambda: PythonCodegen(BUILTINS).module(tree))
+    t_compile, _ = timed(compile, module, "<bench>", "exec")
+
+    interp = Interpreter()
+    compiler = Compiler(BUILTINS)
+    t_first, compiled = timed(compiler.compile, source)
+    t_run, _ = timed(interp.execute, compiled)
+    t_cached, _ = timed(lambda: interp.execute(compiler.compile(source)))
+    t_legacy, legacy_x = timed(run_legacy, program)
+    if legacy_x != interp.env["x"]:
+        out.write(f"WARNING: results differ (legacy x={legacy_x}, compiled x={interp.env['x']})\n")
+
+    rows = [
+        ("tokenize", t_tokenize),
+        ("parse (jump table)", t_parse),
+        ("codegen", t_codegen),
+        ("python compile()", t_compile),
+        ("run compiled", t_run),
+        ("cold compile", t_first),
+        ("first run (cold)", t_first + t_run),
+        ("cached re-run", t_cached),
+        ("legacy run_block", t_legacy),
+    ]
+    out.write(f"{'stage':<22} {'ms':>10} {'us/line':>10} {'vs legacy':>10}\n")
+    for name, seconds in rows:
+        out.write(f"{name:<22} {seconds * 1000:>10.2f} {seconds * 1e6 / len(program):>10.2f} "
+                  f"{seconds / t_legacy:>9.3f}x\n")
+
+    out.write("\nScaling (tokenize + parse):\n")
+    out.write(f"{'lines':>8} {'ms':>10} {'us/line':>10}\n")
+    for size in (lines // 4, lines // 2, lines, lines * 2):
+        text = "\n".join(generate_nested_program(size, depth))
+        n = text.count("\n") + 1
+        seconds, _ = timed(lambda: Parser(*tokenize(text)).parse_program())
+        out.write(f"{n:>8} {seconds * 1000:>10.2f} {seconds * 1e6 / n:>10.2f}\n")
+
+
+# ---------------- micro ----------------
+def legacy_loops(n):
+    interp = LegacyInterpreter()
+    interp.run_line("total = 0")
+    for i in range(n):
+        for j in range(10):
+            interp.run_line(f"j = {j}")
+            interp.run_line("total = total + j")
+    return interp.env["total"]
+
+
+def legacy_strings(n):
+    interp = LegacyInterpreter()
+    interp.run_line('s = ""')
+    for i in range(n):
+        interp.run_line(f"i = {i}")
+        interp.run_line("s = s + str(i % 10)")
+    return len(interp.env["s"])
+
+
+# name -> (program template, default n, iterations per n, legacy driver, legacy n)
+MICRO_WORKLOADS = {
+    "fib": (
+        "func fib(n) {\n"
+        "    if n < 2 { return n }\n"
+        "    return fib(n - 1) + fib(n - 2)\n"
+        "}\n"
+        "result = fib({n})\n",
+        22, None, None, 0,
+    ),
+    "loops": (
+        "total = 0\n"
+        "for i in range({n}) {\n"
+        "    j = 0\n"
+        "    while j < 10 {\n"
+        "        total += j\n"
+        "        j += 1\n"
+        "    }\n"
+        "}\n"
+        "result = total\n",
+        20000, 10, legacy_loops, 200,
+    ),
+    "strings": (
+        "func build(n) {\n"
+        "    s = \"\"\n"
+        "    for i in range(n) { s = s + str(i % 10) }\n"
+        "    return s\n"
+        "}\n"
+        "result = len(build({n}))\n",
+        100000, 1, legacy_strings, 1000,
+    ),
+}
+
+
+def fib_calls(n):
+    a, b = 1, 1                 # calls made by fib(0), fib(1)
+    for _ in range(n - 1):
+        a, b = b, a + b + 1
+    return b if n else 1
+
+
+def best_of(repeat, fn):
+    best, result = None, None
+    for _ in range(repeat):
+        seconds, result = timed(fn)
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def run_engine(cls, source):
+    interp = cls()
+    interp.run(source)
+    return interp.env["result"]
+
+
+def bench_micro(scale=1.0, repeat=3, out=sys.stdout):
+    out.write(f"{'workload':<10} {'engine':<18} {'n':>8} {'ms':>10} {'us/iter':>10} {'vs python':>10}\n")
+    for name, (template, n, per_n, legacy, legacy_n) in MICRO_WORKLOADS.items():
+        n = max(1, int(n * scale)) if name != "fib" else n + round(scale - 1)
+        source = template.replace("{n}", str(n))
+        iterations = fib_calls(n) if per_n is None else n * per_n
+        rows = []
+        for label, cls in (("python bytecode", Interpreter), ("stack vm", VMInterpreter)):
+            seconds, result = best_of(repeat, lambda: run_engine(cls, source))
+            rows.append((label, n, seconds, iterations, result))
+        if legacy is not None:
+            seconds, result = best_of(1, lambda: legacy(legacy_n))
+            rows.append(("legacy (per line)", legacy_n, seconds, legacy_n * per_n, None))
+        results = {r[4] for r in rows if r[4] is not None}
+        if len(results) > 1:
+            out.write(f"WARNING: {name}: engines disagree: {sorted(results)}\n")
+        baseline = rows[0][2] / rows[0][3]
+        for label, count, seconds, iters, _ in rows:
+            per_iter = seconds / iters
+            out.write(f"{name:<10} {label:<18} {count:>8} {seconds * 1000:>10.2f} "
+                      f"{per_iter * 1e6:>10.3f} {per_iter / baseline:>9.1f}x\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tools.xplusplus.bench")
+    sub = parser.add_subparsers(dest="suite", required=True)
+    p = sub.add_parser("parser", help="nested-block parsing benchmark")
+    p.add_argument("--lines", type=int, default=10000)
+    p.add_argument("--depth", type=int, default=50)
+    p = sub.add_parser("micro", help="fib / loops / string building on each engine")
+    p.add_argument("--scale", type=float, default=1.0, help="multiply workload sizes")
+    p.add_argument("--repeat", type=int, default=3, help="report the best of this many runs")
+    args = parser.parse_args(argv)
+    if args.suite == "parser":
+        bench_parser(args.lines, args.depth)
+    elif args.suite == "micro":
+        bench_micro(args.scale, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# tools/xplusplus/cache.py
+"""
+Persistent compiled-program cache (.xppc files), the X++ analogue of __pycache__.
+
+One file per script, under Date/xpp_cache/ by default:
+
+    <stem>.<hash of the script's absolute path>.xppc
+
+holding a magic number followed by a marshal'd tuple
+(cache tag, source SHA-256, filename, code object). An entry is only used when
+the tag (X++ compiler version + Python bytecode tag) and the hash of the current
+source both match, so a hit skips lexing, parsing and compiling entirely; a
+stale entry is simply overwritten. Writes go through a temp file + os.replace,
+so a crashed or concurrent run never leaves a truncated artifact behind.
+"""
+import hashlib
+import marshal
+import os
+import sys
+
+from .compiler import VERSION, CompiledProgram
+
+MAGIC = b"XPPC\r\n\x00\x01"
+CACHE_TAG = f"xpp-{VERSION}-{sys.implementation.cache_tag}"
+SUFFIX = ".xppc"
+DEFAULT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "Date", "xpp_cache")
+
+
+class DiskCache:
+
+    def __init__(self, directory=DEFAULT_DIR):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0          # misses where an out-of-date entry was found
+        self.writes = 0
+
+    def path_for(self, filename):
+        filename = os.path.abspath(filename)
+        stem = os.path.splitext(os.path.basename(filename))[0]
+        tag = hashlib.sha1(filename.encode("utf-8", "surrogateescape")).hexdigest()[:12]
+        return os.path.join(self.directory, f"{stem}.{tag}{SUFFIX}")
+
+    def load(self, filename, digest):
+        """The cached CompiledProgram for this exact source, or None."""
+        path = self.path_for(filename)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        try:
+            if not data.startswith(MAGIC):
+                raise ValueError("bad magic")
+            tag, cached_digest, cached_filename, code = marshal.loads(data[len(MAGIC):])
+        except (ValueError, EOFError, TypeError):
+            tag = None
+        if tag != CACHE_TAG or cached_digest != digest or cached_filename != filename:
+            self.misses += 1
+            self.stale += 1
+            return None
+        self.hits += 1
+        return CompiledProgram(code, digest, filename)
+
+    def store(self, program):
+        path = self.path_for(program.filename)
+        data = MAGIC + marshal.dumps((CACHE_TAG, program.digest, program.filename, program.code))
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            # a read-only checkout just runs uncached
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+        self.writes += 1
+        return True
+
+    def entries(self):
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return [os.path.join(self.directory, n) for n in names if n.endswith(SUFFIX)]
+
+    def clear(self):
+        removed = 0
+        for path in self.entries():
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "stale": self.stale, "writes": self.writes}
@@ -0,0 +1,85 @@
+# tools/xplusplus/cli.py
+"""
+X++ command line.
+
+    xpp run <file.xpp> [...] [--no-cache] [--vm] [--stats]
+    xpp cache stats | clear
+
+Available as `python -m tools.xplusplus ...` and as the `xpp` shell command.
+Scripts share one interpreter, so later files see earlier files' variables.
+"""
+import argparse
+import os
+import sys
+from time import perf_counter
+
+from .cache import DEFAULT_DIR, DiskCache
+from .errors import XppError
+from .interpreter import Interpreter, VMInterpreter
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="xpp", description="Run X++ scripts.")
+    sub = parser.add_subparsers(dest="action", required=True)
+    p = sub.add_parser("run", help="run one or more .xpp files")
+    p.add_argument("files", nargs="+", metavar="file.xpp")
+    p.add_argument("--no-cache", action="store_true", help="neither read nor write .xppc files")
+    p.add_argument("--vm", action="store_true", help="run on the stack VM (memory cache only)")
+    p.add_argument("--stats", action="store_true", help="print cache statistics to stderr")
+    p.add_argument("--cache-dir", default=DEFAULT_DIR, help=argparse.SUPPRESS)
+    p = sub.add_parser("cache", help="inspect or clear the .xppc cache")
+    p.add_argument("op", choices=("stats", "clear"))
+    p.add_argument("--cache-dir", default=DEFAULT_DIR, help=argparse.SUPPRESS)
+    return parser
+
+
+def run_files(args, err=None):
+    err = err or sys.stderr
+    if args.vm:
+        interp = VMInterpreter()
+    else:
+        interp = Interpreter(cache_dir=None if args.no_cache else args.cache_dir)
+    status = 0
+    start = perf_counter()
+    for path in args.files:
+        try:
+            interp.run_file(path)
+        except OSError as e:
+            err.write(f"xpp: cannot open {path}: {e.strerror}\n")
+            status = 1
+            break
+        except XppError as e:
+            # the error may be inside a function defined by an earlier file
+            where = e.filename if e.filename and e.filename != os.path.abspath(path) else path
+            err.write(f"{where}: Error: {e}\n")
+            status = 1
+            break
+    if args.stats:
+        elapsed = (perf_counter() - start) * 1000
+        disk = interp.compiler.disk
+        if disk is None:
+            err.write(f"xpp: {len(args.files)} file(s) in {elapsed:.1f} ms, cache disabled\n")
+        else:
+            err.write(f"xpp: {len(args.files)} file(s) in {elapsed:.1f} ms, .xppc "
+                      f"{disk.hits} hit(s), {disk.misses} miss(es) ({disk.stale} stale), "
+                      f"{disk.writes} written\n")
+    return status
+
+
+def cache_command(args, out=None):
+    out = out or sys.stdout
+    disk = DiskCache(args.cache_dir)
+    if args.op == "clear":
+        out.write(f"removed {disk.clear()} cached program(s) from {disk.directory}\n")
+    else:
+        entries = disk.entries()
+        size = sum(os.path.getsize(p) for p in entries if os.path.exists(p))
+        out.write(f"{disk.directory}: {len(entries)} cached program(s), {size / 1024:.1f} KiB\n")
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.action == "run":
+        return run_files(args)
+    return cache_command(args)
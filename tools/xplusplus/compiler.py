@@ -0,0 +1,303 @@
+# tools/xplusplus/compiler.py
+"""
+X++ -> Python code object compiler.
+
+The X++ tree is translated to a Python `ast` module and handed to compile(), so
+a program is parsed once and then runs as ordinary Python bytecode. The
+top-level program becomes a function:
+
+    def __xpp_main__(__ns):
+        global v_f, v_y                          # functions and the globals they use
+        if 'v_x' in __ns: v_x = __ns['v_x']      # every other variable it assigns
+        try:
+            ...program...
+        finally:
+            __xpp_sync__(__ns, locals())
+
+X++ variables are renamed `v_<name>` and become fast locals (array slots in the
+frame), so there are no dict lookups or string substitutions while it runs.
+Functions defined by earlier runs may read any of them, so a top-level call
+of anything but a builtin first publishes main's locals to `__ns`:
+
+    (__xpp_sync__(__ns, locals()), v_f(...))[1]
+
+X++ functions cannot assign globals, so nothing needs copying back.
+X++ functions compile to nested Python functions whose parameters and assigned
+names are fast locals too.
+`__ns` is the interpreter's namespace: variables persist there between runs
+(REPL lines), and builtins are provided through its `__builtins__`.
+
+Compiled programs are cached by the SHA-256 of their source, in memory and,
+for script files, on disk (cache.DiskCache).
+"""
+import ast
+import gc
+import hashlib
+from collections import OrderedDict
+
+from . import nodes, scope
+from .errors import XppSyntaxError
+from .parser import parse_program
+
+VERSION = "0.7"         # bump when generated code changes; invalidates .xppc files
+PREFIX = "v_"
+MAIN_NAME = "__xpp_main__"
+
+BINOPS = {
+    "+": ast.Add, "-": ast.Sub, "*": ast.Mult, "/": ast.Div, "//": ast.FloorDiv,
+    "%": ast.Mod, "**": ast.Pow,
+}
+CMPOPS = {
+    "==": ast.Eq, "!=": ast.NotEq, "<": ast.Lt, "<=": ast.LtE, ">": ast.Gt, ">=": ast.GtE,
+}
+UNARYOPS = {"-": ast.USub, "+": ast.UAdd, "not": ast.Not}
+LOAD, STORE = ast.Load(), ast.Store()   # contexts are stateless; one instance serves every Name
+
+
+def mangle(name):
+    return PREFIX + name
+
+
+def demangle(name):
+    return name[len(PREFIX):]
+
+
+class CompiledProgram:
+    """A compiled X++ program: the code object of __xpp_main__ plus the source hash it came from."""
+    __slots__ = ("code", "digest", "filename")
+
+    def __init__(self, code, digest, filename):
+        self.code = code
+        self.digest = digest
+        self.filename = filename
+
+
+def source_digest(source):
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+# ---------------- code generation ----------------
+class PythonCodegen:
+
+    def __init__(self, builtins):
+        self.builtins = builtins
+        self.fast = frozenset()     # top-level variables kept as fast locals of main
+        self.depth = 0              # function nesting of the code being generated
+
+    def at(self, node, py):
+        py.lineno = py.end_lineno = node.line or 1
+        py.col_offset = py.end_col_offset = 0
+        return py
+
+    def name(self, name, line, store=False):
+        if store and name in self.builtins:
+            raise XppSyntaxError(f"cannot assign to builtin '{name}'", line)
+        return ast.Name(PREFIX + name, STORE if store else LOAD)
+
+    # expressions
+    def expr(self, node):
+        py = self.dispatch[type(node)](self, node)
+        py.lineno = py.end_lineno = node.line or 1
+        py.col_offset = py.end_col_offset = 0
+        return py
+
+    def expr_Const(self, node):
+        return ast.Constant(node.value)
+
+    def expr_Name(self, node):
+        return self.name(node.id, node.line)
+
+    def expr_BinOp(self, node):
+        left, right = self.expr(node.left), self.expr(node.right)
+        if node.op in CMPOPS:
+            return ast.Compare(left, [CMPOPS[node.op]()], [right])
+        return ast.BinOp(left, BINOPS[node.op](), right)
+
+    def expr_BoolOp(self, node):
+        op = ast.And() if node.op == "and" else ast.Or()
+        return ast.BoolOp(op, [self.expr(node.left), self.expr(node.right)])
+
+    def expr_UnaryOp(self, node):
+        return ast.UnaryOp(UNARYOPS[node.op](), self.expr(node.operand))
+
+    def expr_Call(self, node):
+        call = ast.Call(self.expr(node.func), [self.expr(a) for a in node.args], [])
+        if self.depth or not self.fast or (isinstance(node.func, nodes.Name) and node.func.id in self.builtins):
+            return call
+        sync = ast.Call(ast.Name("__xpp_sync__", ast.Load()),
+                        [ast.Name("__ns", ast.Load()), ast.Call(ast.Name("locals", ast.Load()), [], [])], [])
+        for py in ast.walk(sync):
+            self.at(node, py)
+        return ast.Subscript(self.at(node, ast.Tuple([sync, self.at(node, call)], ast.Load())),
+                             self.at(node, ast.Constant(1)), ast.Load())
+
+    def expr_Attribute(self, node):
+        return ast.Attribute(self.expr(node.value), node.attr, ast.Load())
+
+    def expr_Index(self, node):
+        return ast.Subscript(self.expr(node.value), self.expr(node.index), ast.Load())
+
+    def expr_ListLit(self, node):
+        return ast.List([self.expr(item) for item in node.items], ast.Load())
+
+    # statements
+    def block(self, body):
+        out = []
+        dispatch = self.dispatch
+        for stmt in body:
+            out.append(self.at(stmt, dispatch[type(stmt)](self, stmt)))
+        return out or [self.located(ast.Pass())]
+
+    def stmt_Assign(self, node):
+        return ast.Assign([self.at(node, self.name(node.target, node.line, store=True))], self.expr(node.value))
+
+    def stmt_ExprStmt(self, node):
+        return ast.Expr(self.expr(node.expr))
+
+    def stmt_AugAssign(self, node):
+        target = self.at(node, self.name(node.target, node.line, store=True))
+        return ast.AugAssign(target, BINOPS[node.op](), self.expr(node.value))
+
+    def stmt_If(self, node):
+        orelse = self.block(node.orelse) if node.orelse else []
+        return ast.If(self.expr(node.test), self.block(node.body), orelse)
+
+    def stmt_While(self, node):
+        return ast.While(self.expr(node.test), self.block(node.body), [])
+
+    def stmt_For(self, node):
+        target = self.at(node, self.name(node.target, node.line, store=True))
+        return ast.For(target, self.expr(node.iter), self.block(node.body), [])
+
+    def stmt_FuncDef(self, node):
+        self.name(node.name, node.line, store=True)
+        params = [self.at(node, ast.arg(mangle(p))) for p in node.params]
+        for p in node.params:
+            self.name(p, node.line, store=True)
+        self.depth += 1
+        try:
+            body = self.block(node.body)
+        finally:
+            self.depth -= 1
+        return ast.FunctionDef(
+            name=mangle(node.name),
+            args=ast.arguments(posonlyargs=[], args=params, kwonlyargs=[], kw_defaults=[], defaults=[]),
+            body=body,
+            decorator_list=[],
+            returns=None,
+        )
+
+    def stmt_Return(self, node):
+        return ast.Return(self.expr(node.value) if node.value is not None else None)
+
+    def stmt_Break(self, node):
+        return ast.Break()
+
+    def stmt_Continue(self, node):
+        return ast.Continue()
+
+    dispatch = {}
+
+    def module(self, program):
+        ns = ast.Name("__ns", ast.Load())
+        # Top-level names that functions use (and the functions themselves) must
+        # live in the namespace; everything else stays a fast local of main.
+        funcs = scope.functions(program)
+        shared = {f.name for f in funcs}
+        for f in funcs:
+            shared |= scope.FunctionScope(f).globals
+        top_level = scope.assigned_names(program.body)
+        declared = [mangle(var) for var in top_level if var in shared]
+        fast = [var for var in top_level if var not in shared]
+        self.fast = frozenset(fast)
+        body = self.block(program.body)
+        prologue = [self.located(ast.Global(declared))] if declared else []
+        prologue += [
+            ast.If(
+                ast.Compare(ast.Constant(mangle(var)), [ast.In()], [ns]),
+                [ast.Assign([ast.Name(mangle(var), ast.Store())],
+                            ast.Subscript(ns, ast.Constant(mangle(var)), ast.Load()))],
+                [],
+            )
+            for var in fast
+        ]
+        sync = ast.Expr(ast.Call(ast.Name("__xpp_sync__", ast.Load()),
+                                 [ns, ast.Call(ast.Name("locals", ast.Load()), [], [])], []))
+        # only the synthetic scaffolding needs locations; the program body already has X++ lines
+        for py in prologue[1 if declared else 0:] + [sync]:
+            ast.fix_missing_locations(py)
+        main = ast.FunctionDef(
+            name=MAIN_NAME,
+            args=ast.arguments(posonlyargs=[], args=[self.located(ast.arg("__ns"))], kwonlyargs=[],
+                               kw_defaults=[], defaults=[]),
+            body=prologue + [self.located(ast.Try(body, [], [], [sync]))],
+            decorator_list=[],
+            returns=None,
+        )
+        return ast.Module([self.located(main)], type_ignores=[])
+
+    def located(self, py, line=1):
+        py.lineno = py.end_lineno = line
+        py.col_offset = py.end_col_offset = 0
+        return py
+
+
+PythonCodegen.dispatch = {
+    getattr(nodes, name[5:]): method
+    for name, method in vars(PythonCodegen).items()
+    if name.startswith(("expr_", "stmt_"))
+}
+
+
+# ---------------- front end ----------------
+class Compiler:
+    """
+    Parses and compiles X++ source, caching the result by source hash.
+    `builtins` is the set of names the runtime provides (they may not be assigned).
+    `disk` is an optional cache.DiskCache consulted for script files on a memory miss.
+    """
+
+    def __init__(self, builtins=(), cache_size=256, disk=None):
+        self.builtins = frozenset(builtins)
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.disk = disk
+
+    def compile(self, source, filename="<xpp>"):
+        digest = source_digest(source)
+        key = (digest, filename)
+        program = self.cache.get(key)
+        if program is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return program
+        self.misses += 1
+        on_disk = self.disk is not None and not filename.startswith("<")
+        program = self.disk.load(filename, digest) if on_disk else None
+        if program is None:
+            program = self.compile_uncached(source, filename, digest)
+            if on_disk:
+                self.disk.store(program)
+        self.cache[key] = program
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return program
+
+    def compile_uncached(self, source, filename="<xpp>", digest=None):
+        # the trees built here are acyclic; pausing the cyclic GC saves it from
+        # rescanning tens of thousands of fresh nodes on large programs
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            code = self.generate(parse_program(source), filename)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return CompiledProgram(code, digest or source_digest(source), filename)
+
+    def generate(self, tree, filename):
+        """Back end hook: turn a nodes.Program into the code object CompiledProgram carries."""
+        module_code = compile(PythonCodegen(self.builtins).module(tree), filename, "exec")
+        return next(c for c in module_code.co_consts if getattr(c, "co_name", None) == MAIN_NAME)
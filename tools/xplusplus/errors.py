@@ -0,0 +1,22 @@
+# tools/xplusplus/errors.py
+
+
+class XppError(Exception):
+    """
+    Base class for X++ errors. `line` is the X++ source line and `filename`
+    the script it is in (either may be None).
+    """
+
+    def __init__(self, message, line=None, filename=None):
+        self.message = message
+        self.line = line
+        self.filename = filename
+        super().__init__(f"line {line}: {message}" if line else message)
+
+
+class XppSyntaxError(XppError, SyntaxError):
+    pass
+
+
+class XppRuntimeError(XppError):
+    pass
@@ -0,0 +1,152 @@
+# tools/xplusplus/interpreter.py
+"""
+X++ interpreter front ends.
+
+Interpreter compiles programs with compiler.Compiler and runs the resulting
+Python code objects against a persistent namespace. VMInterpreter runs the same
+language on the bytecode VM in vm.py.
+"""
+import builtins
+import os
+import re
+import types
+
+from .cache import DiskCache
+from .compiler import VERSION, Compiler, PREFIX, demangle, mangle
+from .errors import XppError, XppRuntimeError
+from .vm import Machine, VMCompiler
+
+
+def _xpp_input(prompt=""):
+    return builtins.input(prompt)
+
+
+BUILTINS = {
+    "print": print,
+    "input": _xpp_input,
+    "len": len,
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "abs": abs,
+    "min": min,
+    "max": max,
+    "round": round,
+    "range": range,
+    "list": list,
+    "sum": sum,
+    "sorted": sorted,
+}
+
+
+def _sync(ns, frame_locals):
+    for name, value in frame_locals.items():
+        if name.startswith(PREFIX):
+            ns[name] = value
+
+
+def _error_location(exc, filenames):
+    """(filename, line) of the innermost X++ frame, i.e. from any script run so far."""
+    location = (None, None)
+    tb = exc.__traceback__
+    while tb is not None:
+        if tb.tb_frame.f_code.co_filename in filenames:
+            location = (tb.tb_frame.f_code.co_filename, tb.tb_lineno)
+        tb = tb.tb_next
+    return location
+
+
+def _describe(exc):
+    if isinstance(exc, NameError):
+        name = getattr(exc, "name", None)
+        if not name:
+            match = re.search(r"'(\w+)'", str(exc))
+            name = match.group(1) if match else None
+        if name and name.startswith(PREFIX):
+            return f"undefined variable '{demangle(name)}'"
+    if isinstance(exc, RecursionError):
+        return "maximum recursion depth exceeded"
+    message = re.sub(rf"\b{PREFIX}(\w+)", r"\1", str(exc))
+    return f"{type(exc).__name__}: {message}"
+
+
+class Interpreter:
+    """
+    `cache_dir` enables the persistent .xppc cache for run_file (None = memory only;
+    cache.DEFAULT_DIR is Date/xpp_cache).
+    """
+
+    def __init__(self, cache_dir=None):
+        runtime = {mangle(name): fn for name, fn in BUILTINS.items()}
+        runtime["locals"] = locals
+        runtime["__xpp_sync__"] = _sync
+        self.ns = {"__builtins__": runtime}
+        self.filenames = set()      # of every program executed: their functions may be called later
+        self.compiler = Compiler(BUILTINS, disk=DiskCache(cache_dir) if cache_dir else None)
+
+    @property
+    def env(self):
+        """The program's variables, by their X++ names."""
+        return {demangle(k): v for k, v in self.ns.items() if k.startswith(PREFIX)}
+
+    def execute(self, program):
+        main = types.FunctionType(program.code, self.ns)
+        self.filenames.add(program.filename)
+        try:
+            main(self.ns)
+        except XppError:
+            raise
+        except Exception as e:
+            filename, line = _error_location(e, self.filenames)
+            raise XppRuntimeError(_describe(e), line, filename) from e
+
+    def run(self, source, filename="<xpp>"):
+        self.execute(self.compiler.compile(source, filename))
+
+    def run_file(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            source = f.read()
+        # absolute, so the .xppc entry does not depend on the working directory
+        self.run(source, filename=os.path.abspath(path))
+
+    def run_block(self, lines):
+        self.run("\n".join(lines))
+
+    def repl(self):
+        print(f"x v{VERSION} Interactive Mode | type 'exit' to quit")
+        buffer = []
+        depth = 0
+        while True:
+            line = input("... " if buffer else ">>> ")
+            if not buffer and line.strip().lower() == "exit":
+                break
+            buffer.append(line)
+            depth += line.count("{") - line.count("}")
+            if depth > 0:
+                continue
+            source = "\n".join(buffer)
+            buffer = []
+            depth = 0
+            try:
+                self.run(source, filename="<stdin>")
+            except XppError as e:
+                print(f"Error: {e}")
+
+
+class VMInterpreter(Interpreter):
+    """
+    Interpreter running on the stack VM (vm.Machine) instead of Python bytecode.
+    VM code is bound to its machine's global slots, so it is only cached in memory.
+    """
+
+    def __init__(self):
+        self.machine = Machine(BUILTINS)
+        self.compiler = VMCompiler(self.machine, BUILTINS)
+
+    @property
+    def env(self):
+        return {name: value for name, value in self.machine.globals.items() if name not in BUILTINS}
+
+    def execute(self, program):
+        self.machine.run(program.code, [])
@@ -0,0 +1,111 @@
+# tools/xplusplus/legacy.py
+"""
+The original X++ interpreter (substitutes variable values into the expression
+text with re.sub and eval()s the result on every evaluation).
+Kept as the reference implementation for behaviour checks and benchmarks.
+"""
+import re
+
+
+class LegacyInterpreter:
+    def __init__(self):
+        self.env = {}
+
+    def eval_expr(self, expr):
+        expr = expr.strip()
+        if expr.startswith('"') and expr.endswith('"'):
+            return expr[1:-1]
+        if expr in self.env:
+            return self.env[expr]
+        try:
+            if '.' in expr:
+                return float(expr)
+            return int(expr)
+        except:
+            pass
+        for var, val in self.env.items():
+            expr = re.sub(rf"\b{var}\b", repr(val), expr)
+        try:
+            return eval(expr)
+        except Exception as e:
+            raise SyntaxError(f"Expression evaluation failed: {expr}")
+
+    def run_line(self, line):
+        line = line.replace("：", ":").strip()
+        if not line:
+            return
+        if re.match(r"\w+\s*=\s*input\(\)", line):
+            var = line.split('=')[0].strip()
+            self.env[var] = input()
+            return
+        if re.match(r"\w+\s*=\s*.+", line):
+            var, expr = line.split('=', 1)
+            self.env[var.strip()] = self.eval_expr(expr)
+            return
+        if re.match(r"print\((.+)\)", line):
+            content = re.findall(r"print\((.+)\)", line)[0]
+            print(self.eval_expr(content))
+            return
+        raise SyntaxError(f"Invalid statement: {line}")
+
+    def extract_block(self, lines, start_index):
+        block = []
+        depth = 0
+        skip = 0
+        for j, raw in enumerate(lines[start_index:], start=start_index):
+            skip += 1
+            line = raw.strip()
+            if "{" in line:
+                depth += 1
+                if depth == 1:
+                    continue
+            if "}" in line:
+                depth -= 1
+                if depth == 0:
+                    break
+            if depth >= 1:
+                block.append(line)
+        return block, skip
+
+    def run_block(self, lines):
+        i = 0
+        while i < len(lines):
+            line = lines[i].strip().rstrip(";")
+            if not line or line.startswith("#"):
+                i += 1
+                continue
+            if line.startswith("if "):
+                cond = line[3:].rstrip(":").strip()
+                block, skip = self.extract_block(lines, i)
+                if self.eval_expr(cond):
+                    self.run_block(block)
+                i += skip
+                continue
+            if line.startswith("else"):
+                block, skip = self.extract_block(lines, i)
+                self.run_block(block)
+                i += skip
+                continue
+            self.run_line(line)
+            i += 1
+
+    def repl(self):
+        print("x v0.4 Interactive Mode | type 'exit' to quit")
+        buffer = []
+        in_block = False
+        while True:
+            line = input(">>> ")
+            if line.strip().lower() == "exit":
+                break
+            if "{" in line:
+                in_block = True
+                buffer.append(line)
+                continue
+            if in_block:
+                buffer.append(line)
+                if "}" in line:
+                    self.run_block(buffer)
+                    buffer = []
+                    in_block = False
+                continue
+            self.run_block([line])
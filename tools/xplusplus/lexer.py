@@ -0,0 +1,88 @@
+# tools/xplusplus/lexer.py
+"""
+X++ tokenizer.
+
+The whole program is tokenized in one regex pass. Token kinds: NUMBER, STRING,
+NAME, OP, NEWLINE (end of line or `;`) and EOF. Newlines inside ( ) and [ ]
+are ignored so long expressions may wrap.
+
+While scanning, braces are matched with a stack and recorded in a jump table
+(index of `{` token -> index of its `}` token), so the parser knows where every
+block ends without rescanning, and unbalanced braces are reported up front.
+"""
+import ast
+import re
+
+from .errors import XppSyntaxError
+
+# leading blanks are consumed by the same match as the token that follows them
+TOKEN_RE = re.compile(r"""
+    [ \t\r]*
+    (?:
+        (?P<name>[^\W\d]\w*)
+      | (?P<number>\d+\.\d*|\.\d+|\d+)
+      | (?P<op>\*\*|//|==|!=|<=|>=|\+=|-=|\*=|/=|%=|[-+*/%<>=(),\[\].{}:])
+      | (?P<newline>\n|;)
+      | (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+      | (?P<comment>\#[^\n]*)
+      | (?P<error>.)
+      | $
+    )
+""", re.VERBOSE)
+
+
+class Token:
+    __slots__ = ("kind", "value", "line")
+
+    def __init__(self, kind, value, line):
+        self.kind, self.value, self.line = kind, value, line
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.value!r}, line {self.line})"
+
+
+def tokenize(source, line=1):
+    """
+    Tokenize X++ source in a single pass.
+    Returns (tokens, jump) where jump maps each `{` token index to its `}` token index.
+    """
+    source = source.replace("：", ":")
+    tokens = []
+    append = tokens.append
+    jump = {}
+    braces = []             # indexes of open `{` tokens
+    nesting = 0             # ( and [ depth
+    for m in TOKEN_RE.finditer(source):
+        kind = m.lastgroup
+        if kind is None or kind == "comment":
+            continue
+        value = m.group(kind)
+        if kind == "newline":
+            if nesting == 0 and tokens and tokens[-1].kind != "NEWLINE":
+                append(Token("NEWLINE", None, line))
+            if value == "\n":
+                line += 1
+        elif kind == "name":
+            append(Token("NAME", value, line))
+        elif kind == "op":
+            if value in "([":
+                nesting += 1
+            elif value in ")]":
+                nesting = max(0, nesting - 1)
+            elif value == "{":
+                braces.append(len(tokens))
+            elif value == "}":
+                if not braces:
+                    raise XppSyntaxError("unmatched '}'", line)
+                jump[braces.pop()] = len(tokens)
+            append(Token("OP", value, line))
+        elif kind == "number":
+            append(Token("NUMBER", float(value) if "." in value else int(value), line))
+        elif kind == "string":
+            append(Token("STRING", ast.literal_eval(value), line))
+        else:
+            raise XppSyntaxError(f"unexpected character {value!r}", line)
+    if braces:
+        raise XppSyntaxError("missing '}'", tokens[braces[-1]].line)
+    append(Token("EOF", None, line))
+    return tokens, jump
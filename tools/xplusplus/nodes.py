@@ -0,0 +1,179 @@
+# tools/xplusplus/nodes.py
+"""
+X++ syntax tree. Every node carries the source line it came from so that the
+back ends can report errors against the X++ program, not the generated code.
+"""
+
+
+class Node:
+    __slots__ = ("line",)
+    fields = ()
+
+    def __repr__(self):
+        args = ", ".join(f"{f}={getattr(self, f)!r}" for f in self.fields)
+        return f"{type(self).__name__}({args})"
+
+
+# ---------------- expressions ----------------
+class Const(Node):
+    __slots__ = ("value",)
+    fields = ("value",)
+
+    def __init__(self, value, line=None):
+        self.value, self.line = value, line
+
+
+class Name(Node):
+    __slots__ = ("id",)
+    fields = ("id",)
+
+    def __init__(self, id, line=None):
+        self.id, self.line = id, line
+
+
+class BinOp(Node):
+    """Arithmetic and comparison operators: + - * / // % ** == != < <= > >="""
+    __slots__ = ("op", "left", "right")
+    fields = ("op", "left", "right")
+
+    def __init__(self, op, left, right, line=None):
+        self.op, self.left, self.right, self.line = op, left, right, line
+
+
+class BoolOp(Node):
+    """`and` / `or` with short-circuit evaluation."""
+    __slots__ = ("op", "left", "right")
+    fields = ("op", "left", "right")
+
+    def __init__(self, op, left, right, line=None):
+        self.op, self.left, self.right, self.line = op, left, right, line
+
+
+class UnaryOp(Node):
+    """`-x`, `+x`, `not x`"""
+    __slots__ = ("op", "operand")
+    fields = ("op", "operand")
+
+    def __init__(self, op, operand, line=None):
+        self.op, self.operand, self.line = op, operand, line
+
+
+class Call(Node):
+    __slots__ = ("func", "args")
+    fields = ("func", "args")
+
+    def __init__(self, func, args, line=None):
+        self.func, self.args, self.line = func, args, line
+
+
+class Attribute(Node):
+    __slots__ = ("value", "attr")
+    fields = ("value", "attr")
+
+    def __init__(self, value, attr, line=None):
+        self.value, self.attr, self.line = value, attr, line
+
+
+class Index(Node):
+    __slots__ = ("value", "index")
+    fields = ("value", "index")
+
+    def __init__(self, value, index, line=None):
+        self.value, self.index, self.line = value, index, line
+
+
+class ListLit(Node):
+    __slots__ = ("items",)
+    fields = ("items",)
+
+    def __init__(self, items, line=None):
+        self.items, self.line = items, line
+
+
+# ---------------- statements ----------------
+class Assign(Node):
+    __slots__ = ("target", "value")
+    fields = ("target", "value")
+
+    def __init__(self, target, value, line=None):
+        self.target, self.value, self.line = target, value, line
+
+
+class ExprStmt(Node):
+    __slots__ = ("expr",)
+    fields = ("expr",)
+
+    def __init__(self, expr, line=None):
+        self.expr, self.line = expr, line
+
+
+class AugAssign(Node):
+    """`x += v` and friends; `op` is the binary operator (`+`, `-`, ...)."""
+    __slots__ = ("target", "op", "value")
+    fields = ("target", "op", "value")
+
+    def __init__(self, target, op, value, line=None):
+        self.target, self.op, self.value, self.line = target, op, value, line
+
+
+class If(Node):
+    __slots__ = ("test", "body", "orelse")
+    fields = ("test", "body", "orelse")
+
+    def __init__(self, test, body, orelse, line=None):
+        self.test, self.body, self.orelse, self.line = test, body, orelse, line
+
+
+class While(Node):
+    __slots__ = ("test", "body")
+    fields = ("test", "body")
+
+    def __init__(self, test, body, line=None):
+        self.test, self.body, self.line = test, body, line
+
+
+class For(Node):
+    """`for target in iter { body }`"""
+    __slots__ = ("target", "iter", "body")
+    fields = ("target", "iter", "body")
+
+    def __init__(self, target, iter, body, line=None):
+        self.target, self.iter, self.body, self.line = target, iter, body, line
+
+
+class FuncDef(Node):
+    __slots__ = ("name", "params", "body")
+    fields = ("name", "params", "body")
+
+    def __init__(self, name, params, body, line=None):
+        self.name, self.params, self.body, self.line = name, params, body, line
+
+
+class Return(Node):
+    __slots__ = ("value",)
+    fields = ("value",)
+
+    def __init__(self, value, line=None):
+        self.value, self.line = value, line
+
+
+class Break(Node):
+    __slots__ = ()
+
+    def __init__(self, line=None):
+        self.line = line
+
+
+class Continue(Node):
+    __slots__ = ()
+
+    def __init__(self, line=None):
+        self.line = line
+
+
+class Program(Node):
+    __slots__ = ("body",)
+    fields = ("body",)
+
+    def __init__(self, body, line=1):
+        self.body, self.line = body, line
@@ -0,0 +1,372 @@
+# tools/xplusplus/parser.py
+"""
+X++ parser: source text -> nodes.Program.
+
+Statements end at a newline or `;`:
+    x = <expr>              (also += -= *= /= %=)
+    name = input()
+    print(<expr>, ...)
+    if <cond> {            (the `{` may also sit alone on the next line)
+        ...
+    } else if <cond> {
+        ...
+    } else {
+        ...
+    }
+    while <cond> { ... }
+    for <name> in <expr> { ... }
+    func <name>(<param>, ...) { ... return <expr> }     (top level only)
+    break / continue
+Expressions follow Python precedence: or, and, not, comparisons, + -, * / // %,
+unary -, **, then calls / indexing / attributes.
+
+The parser is a single recursive-descent pass over the token list from
+lexer.tokenize. Blocks are bounded by the lexer's brace jump table, so each
+token is visited once no matter how deeply blocks are nested.
+"""
+from . import nodes
+from .errors import XppSyntaxError
+from .lexer import tokenize
+
+COMPARE_OPS = frozenset(("==", "!=", "<", "<=", ">", ">="))
+CONSTANTS = {"true": True, "True": True, "false": False, "False": False, "none": None, "None": None}
+KEYWORDS = frozenset((
+    "if", "else", "elif", "and", "or", "not", "while", "for", "in",
+    "func", "def", "return", "break", "continue",
+))
+AUG_OPS = {"+=": "+", "-=": "-", "*=": "*", "/=": "/", "%=": "%"}
+
+AND_PREC, NOT_PREC, COMPARE_PREC = 2, 3, 4
+BINARY_PREC = {
+    "or": 1, "and": AND_PREC,
+    "==": COMPARE_PREC, "!=": COMPARE_PREC, "<": COMPARE_PREC, "<=": COMPARE_PREC,
+    ">": COMPARE_PREC, ">=": COMPARE_PREC,
+    "+": 5, "-": 5,
+    "*": 6, "/": 6, "//": 6, "%": 6,
+}
+
+
+# ---------------- expressions ----------------
+class ExprParser:
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos]
+
+    def advance(self):
+        tok = self.tokens[self.pos]
+        self.pos += 1
+        return tok
+
+    def check(self, value):
+        tok = self.tokens[self.pos]
+        return tok.value == value and tok.kind in ("OP", "NAME")
+
+    def accept(self, value):
+        if self.check(value):
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, value):
+        tok = self.peek()
+        if not self.accept(value):
+            found = "end of line" if tok.kind == "EOF" else repr(tok.value)
+            raise XppSyntaxError(f"expected {value!r}, found {found}", tok.line)
+        return tok
+
+    def expect_end(self):
+        tok = self.peek()
+        if tok.kind != "EOF":
+            raise XppSyntaxError(f"unexpected {tok.value!r}", tok.line)
+
+    def parse_expr(self, min_prec=1):
+        """Precedence climbing over BINARY_PREC; `not` binds between `and` and comparisons."""
+        tokens = self.tokens
+        tok = tokens[self.pos]
+        if tok.kind == "NAME" and tok.value == "not" and min_prec <= NOT_PREC:
+            self.pos += 1
+            left = nodes.UnaryOp("not", self.parse_expr(NOT_PREC), tok.line)
+        else:
+            left = self.parse_unary()
+        while True:
+            tok = tokens[self.pos]
+            if tok.kind != "OP" and tok.kind != "NAME":
+                return left
+            prec = BINARY_PREC.get(tok.value)
+            if prec is None or prec < min_prec:
+                return left
+            self.pos += 1
+            right = self.parse_expr(prec + 1)
+            if prec == COMPARE_PREC:
+                left = nodes.BinOp(tok.value, left, right, tok.line)
+                nxt = tokens[self.pos]
+                if nxt.kind == "OP" and nxt.value in COMPARE_OPS:
+                    raise XppSyntaxError("chained comparisons are not supported, use 'and'", nxt.line)
+            elif prec <= AND_PREC:
+                left = nodes.BoolOp(tok.value, left, right, tok.line)
+            else:
+                left = nodes.BinOp(tok.value, left, right, tok.line)
+
+    def parse_unary(self):
+        tok = self.peek()
+        if tok.kind == "OP" and tok.value in ("-", "+"):
+            self.pos += 1
+            operand = self.parse_unary()
+            if isinstance(operand, nodes.Const) and isinstance(operand.value, (int, float)) \
+                    and not isinstance(operand.value, bool):
+                return nodes.Const(-operand.value if tok.value == "-" else operand.value, tok.line)
+            return nodes.UnaryOp(tok.value, operand, tok.line)
+        return self.parse_power()
+
+    def parse_power(self):
+        base = self.parse_postfix()
+        tok = self.peek()
+        if tok.kind == "OP" and tok.value == "**":
+            self.pos += 1
+            return nodes.BinOp("**", base, self.parse_unary(), tok.line)
+        return base
+
+    def parse_postfix(self):
+        expr = self.parse_atom()
+        while True:
+            tok = self.peek()
+            if tok.kind != "OP":
+                return expr
+            if tok.value == "(":
+                self.pos += 1
+                expr = nodes.Call(expr, self.parse_items(")"), tok.line)
+            elif tok.value == "[":
+                self.pos += 1
+                index = self.parse_expr()
+                self.expect("]")
+                expr = nodes.Index(expr, index, tok.line)
+            elif tok.value == ".":
+                self.pos += 1
+                name = self.advance()
+                if name.kind != "NAME" or name.value.startswith("_"):
+                    raise XppSyntaxError("invalid attribute name", name.line)
+                expr = nodes.Attribute(expr, name.value, tok.line)
+            else:
+                return expr
+
+    def parse_items(self, closing):
+        items = []
+        if self.accept(closing):
+            return items
+        while True:
+            items.append(self.parse_expr())
+            if self.accept(closing):
+                return items
+            self.expect(",")
+            if self.accept(closing):
+                return items
+
+    def parse_atom(self):
+        tok = self.advance()
+        if tok.kind in ("NUMBER", "STRING"):
+            return nodes.Const(tok.value, tok.line)
+        if tok.kind == "NAME":
+            if tok.value in CONSTANTS:
+                return nodes.Const(CONSTANTS[tok.value], tok.line)
+            if tok.value in KEYWORDS:
+                raise XppSyntaxError(f"unexpected '{tok.value}' in expression", tok.line)
+            return nodes.Name(tok.value, tok.line)
+        if tok.kind == "OP" and tok.value == "(":
+            expr = self.parse_expr()
+            self.expect(")")
+            return expr
+        if tok.kind == "OP" and tok.value == "[":
+            return nodes.ListLit(self.parse_items("]"), tok.line)
+        found = "end of line" if tok.kind == "EOF" else repr(tok.value)
+        raise XppSyntaxError(f"unexpected {found} in expression", tok.line)
+
+
+def parse_expression(text, line=1):
+    tokens, _ = tokenize(text, line)
+    parser = ExprParser(tokens)
+    expr = parser.parse_expr()
+    parser.expect_end()
+    return expr
+
+
+# ---------------- statements / blocks ----------------
+class Parser(ExprParser):
+
+    def __init__(self, tokens, jump):
+        super().__init__(tokens)
+        self.jump = jump
+        self.depth = 0          # block nesting
+        self.loops = 0          # enclosing loops (reset inside a function)
+        self.in_function = False
+
+    def skip_newlines(self):
+        tokens = self.tokens
+        while tokens[self.pos].kind == "NEWLINE":
+            self.pos += 1
+
+    def end_statement(self):
+        tok = self.peek()
+        if tok.kind == "NEWLINE":
+            self.pos += 1
+        elif tok.kind != "EOF" and not (tok.kind == "OP" and tok.value == "}"):
+            raise XppSyntaxError(f"unexpected {tok.value!r} after statement", tok.line)
+
+    def parse_program(self):
+        body = self.parse_statements(len(self.tokens) - 1)
+        return nodes.Program(body)
+
+    def parse_statements(self, end):
+        """Parse statements up to (not including) token index `end`."""
+        body = []
+        while True:
+            self.skip_newlines()
+            if self.pos >= end:
+                break
+            body.append(self.parse_statement())
+        if self.pos != end:
+            raise XppSyntaxError("statement runs past the end of its block", self.tokens[end].line)
+        return body
+
+    def parse_block(self):
+        self.skip_newlines()
+        tok = self.peek()
+        if not (tok.kind == "OP" and tok.value == "{"):
+            raise XppSyntaxError("expected '{'", tok.line)
+        end = self.jump[self.pos]
+        self.pos += 1
+        self.depth += 1
+        body = self.parse_statements(end)
+        self.depth -= 1
+        self.pos = end + 1
+        return body
+
+    def parse_loop_body(self):
+        self.loops += 1
+        body = self.parse_block()
+        self.loops -= 1
+        return body
+
+    def parse_statement(self):
+        tok = self.peek()
+        if tok.kind == "NAME":
+            keyword = self.statement_keywords.get(tok.value)
+            if keyword is not None:
+                return keyword(self)
+            if tok.value in ("else", "elif"):
+                raise XppSyntaxError(f"'{tok.value}' without a matching 'if'", tok.line)
+            nxt = self.tokens[self.pos + 1]
+            if nxt.kind == "OP" and (nxt.value == "=" or nxt.value in AUG_OPS):
+                if tok.value in CONSTANTS or tok.value in KEYWORDS:
+                    raise XppSyntaxError(f"cannot assign to {tok.value}", tok.line)
+                self.pos += 2
+                value = self.parse_expr()
+                if nxt.value == "=":
+                    node = nodes.Assign(tok.value, value, tok.line)
+                else:
+                    node = nodes.AugAssign(tok.value, AUG_OPS[nxt.value], value, tok.line)
+                self.end_statement()
+                return node
+        expr = self.parse_expr()
+        if not isinstance(expr, nodes.Call):
+            raise XppSyntaxError("Invalid statement: expected an assignment or a call", tok.line)
+        self.end_statement()
+        return nodes.ExprStmt(expr, tok.line)
+
+    def parse_if(self):
+        line = self.advance().line
+        test = self.parse_expr()
+        self.accept(":")
+        body = self.parse_block()
+        orelse = []
+        mark = self.pos
+        self.skip_newlines()
+        if self.check("elif"):
+            orelse = [self.parse_if()]
+        elif self.check("else"):
+            self.pos += 1
+            if self.check("if"):
+                orelse = [self.parse_if()]
+            else:
+                self.accept(":")
+                orelse = self.parse_block()
+        else:
+            self.pos = mark
+        return nodes.If(test, body, orelse, line)
+
+    def parse_while(self):
+        line = self.advance().line
+        test = self.parse_expr()
+        self.accept(":")
+        return nodes.While(test, self.parse_loop_body(), line)
+
+    def parse_for(self):
+        line = self.advance().line
+        target = self.advance()
+        if target.kind != "NAME" or target.value in KEYWORDS or target.value in CONSTANTS:
+            raise XppSyntaxError("expected a variable name after 'for'", target.line)
+        self.expect("in")
+        iterable = self.parse_expr()
+        self.accept(":")
+        return nodes.For(target.value, iterable, self.parse_loop_body(), line)
+
+    def parse_func(self):
+        line = self.advance().line
+        if self.depth or self.in_function:
+            raise XppSyntaxError("functions can only be defined at the top level", line)
+        name = self.advance()
+        if name.kind != "NAME" or name.value in KEYWORDS or name.value in CONSTANTS:
+            raise XppSyntaxError("expected a function name", name.line)
+        self.expect("(")
+        params = []
+        while not self.accept(")"):
+            param = self.advance()
+            if param.kind != "NAME" or param.value in KEYWORDS or param.value in params:
+                raise XppSyntaxError("invalid parameter list", param.line)
+            params.append(param.value)
+            if not self.check(")"):
+                self.expect(",")
+        self.accept(":")
+        self.in_function, loops, self.loops = True, self.loops, 0
+        try:
+            body = self.parse_block()
+        finally:
+            self.in_function, self.loops = False, loops
+        return nodes.FuncDef(name.value, params, body, line)
+
+    def parse_return(self):
+        tok = self.advance()
+        if not self.in_function:
+            raise XppSyntaxError("'return' outside a function", tok.line)
+        nxt = self.peek()
+        value = None
+        if nxt.kind not in ("NEWLINE", "EOF") and not (nxt.kind == "OP" and nxt.value == "}"):
+            value = self.parse_expr()
+        self.end_statement()
+        return nodes.Return(value, tok.line)
+
+    def parse_jump(self):
+        tok = self.advance()
+        if not self.loops:
+            raise XppSyntaxError(f"'{tok.value}' outside a loop", tok.line)
+        self.end_statement()
+        return nodes.Break(tok.line) if tok.value == "break" else nodes.Continue(tok.line)
+
+    statement_keywords = {
+        "if": lambda self: self.parse_if(),
+        "while": lambda self: self.parse_while(),
+        "for": lambda self: self.parse_for(),
+        "func": lambda self: self.parse_func(),
+        "def": lambda self: self.parse_func(),
+        "return": lambda self: self.parse_return(),
+        "break": lambda self: self.parse_jump(),
+        "continue": lambda self: self.parse_jump(),
+    }
+
+
+def parse_program(source):
+    tokens, jump = tokenize(source)
+    return Parser(tokens, jump).parse_program()
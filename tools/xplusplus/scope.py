@@ -0,0 +1,82 @@
+# tools/xplusplus/scope.py
+"""
+Name analysis shared by the back ends.
+
+X++ scoping: a function's locals are its parameters plus every name it assigns
+(=, +=, for-targets); any other name it reads is global (a top-level variable,
+a function or a builtin). Top-level code has no locals of its own.
+"""
+from . import nodes
+
+
+def _walk(node):
+    """Yield every node in a subtree, not descending into nested function bodies."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, nodes.FuncDef):
+            continue
+        for field in node.fields:
+            value = getattr(node, field)
+            if isinstance(value, nodes.Node):
+                stack.append(value)
+            elif isinstance(value, list):
+                stack.extend(v for v in reversed(value) if isinstance(v, nodes.Node))
+
+
+def _walk_body(body):
+    for stmt in body:
+        yield from _walk(stmt)
+
+
+def _statements(body):
+    """Every statement in `body` and its nested blocks, not descending into function bodies."""
+    stack = list(reversed(body))
+    while stack:
+        stmt = stack.pop()
+        yield stmt
+        if isinstance(stmt, nodes.FuncDef):
+            continue
+        # the only list fields of a statement are its blocks; expressions are not entered
+        for field in stmt.fields:
+            value = getattr(stmt, field)
+            if isinstance(value, list):
+                stack.extend(reversed(value))
+
+
+def assigned_names(body):
+    """Names bound in `body` (excluding nested function bodies), in first-binding order."""
+    seen = {}
+    for node in _statements(body):
+        if isinstance(node, (nodes.Assign, nodes.AugAssign, nodes.For)):
+            seen.setdefault(node.target, None)
+        elif isinstance(node, nodes.FuncDef):
+            seen.setdefault(node.name, None)
+    return list(seen)
+
+
+def read_names(body):
+    """Names read in `body` (excluding nested function bodies)."""
+    names = set()
+    for node in _walk_body(body):
+        if isinstance(node, nodes.Name):
+            names.add(node.id)
+        elif isinstance(node, nodes.AugAssign):
+            names.add(node.target)
+    return names
+
+
+class FunctionScope:
+    """Locals (parameters first, then assigned names) and globals of one function."""
+
+    def __init__(self, func):
+        self.locals = list(func.params)
+        for name in assigned_names(func.body):
+            if name not in self.locals:
+                self.locals.append(name)
+        self.globals = read_names(func.body) - set(self.locals)
+
+
+def functions(program):
+    return [stmt for stmt in program.body if isinstance(stmt, nodes.FuncDef)]
@@ -0,0 +1,533 @@
+# tools/xplusplus/vm.py
+"""
+X++ bytecode VM.
+
+A compact stack machine, independent of Python's compiler:
+
+    VMCode.ops      flat list [op, arg, op, arg, ...]; jump args are ops indexes
+    VMCode.consts   constant pool (numbers, strings, attribute names, functions)
+    VMCode.lines    X++ source line of every instruction (same index as ops)
+
+Inside a function, parameters and assigned names are locals addressed by slot
+number in a plain list. Everything else (top-level variables, functions and
+builtins) lives in a GlobalTable: a values list plus a name -> slot map that is
+only consulted while compiling. At run time every variable access is a list
+index, never a dict lookup.
+
+Unlike the default back end (compiler.PythonCodegen -> Python bytecode), the
+VM does not depend on CPython's code object format, so its programs can be
+inspected, serialised or retargeted. It is slower, since the dispatch loop is
+itself Python code; `python -m tools.xplusplus.bench micro` compares the two.
+"""
+import operator
+
+from . import nodes, scope
+from .compiler import Compiler
+from .errors import XppError, XppRuntimeError, XppSyntaxError
+
+# Opcodes, in the order the dispatch loop tests them (most frequent first).
+# ADD_CONST/SUB_CONST (`x + 1`) and JUMP_IF_LESS/JUMP_IF_NOT_LESS (`if a < b`)
+# are superinstructions: every instruction saved is one less trip round the
+# Python-level dispatch loop.
+OPNAMES = [
+    "LOAD_LOCAL", "LOAD_CONST", "STORE_LOCAL", "LOAD_GLOBAL", "STORE_GLOBAL",
+    "ADD", "ADD_CONST", "SUB", "SUB_CONST", "LESS",
+    "JUMP_IF_LESS", "JUMP_IF_NOT_LESS", "JUMP_IF_FALSE", "JUMP_IF_TRUE", "JUMP", "FOR_ITER",
+    "CALL", "RETURN", "POP", "BINARY", "COMPARE", "UNARY",
+    "JUMP_IF_FALSE_OR_POP", "JUMP_IF_TRUE_OR_POP", "GET_ITER", "INDEX", "LOAD_ATTR", "BUILD_LIST",
+]
+(LOAD_LOCAL, LOAD_CONST, STORE_LOCAL, LOAD_GLOBAL, STORE_GLOBAL,
+ ADD, ADD_CONST, SUB, SUB_CONST, LESS,
+ JUMP_IF_LESS, JUMP_IF_NOT_LESS, JUMP_IF_FALSE, JUMP_IF_TRUE, JUMP, FOR_ITER,
+ CALL, RETURN, POP, BINARY, COMPARE, UNARY,
+ JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP, GET_ITER, INDEX, LOAD_ATTR, BUILD_LIST) = range(len(OPNAMES))
+
+# argument tables for BINARY / COMPARE / UNARY
+BINARY_OPS = ["*", "/", "//", "%", "**"]
+BINARY_FUNCS = [operator.mul, operator.truediv, operator.floordiv, operator.mod, operator.pow]
+COMPARE_OPS = ["==", "!=", "<=", ">", ">="]
+COMPARE_FUNCS = [operator.eq, operator.ne, operator.le, operator.gt, operator.ge]
+UNARY_OPS = ["-", "+", "not"]
+UNARY_FUNCS = [operator.neg, operator.pos, operator.not_]
+
+
+class _Undefined:
+    __slots__ = ()
+
+    def __repr__(self):
+        return "<undefined>"
+
+
+UNDEFINED = _Undefined()
+
+
+class VMCode:
+    __slots__ = ("name", "ops", "consts", "lines", "argcount", "varnames", "padding", "filename")
+
+    def __init__(self, name, ops, consts, lines, argcount=0, varnames=(), filename=None):
+        self.name = name
+        self.filename = filename
+        self.ops = ops
+        self.consts = consts
+        self.lines = lines
+        self.argcount = argcount
+        self.varnames = list(varnames)
+        # unassigned locals, appended to the arguments to build a frame
+        self.padding = [UNDEFINED] * (len(self.varnames) - argcount)
+
+    def disassemble(self, globals_table=None):
+        """Human-readable listing, one instruction per line."""
+        out = []
+        for pc in range(0, len(self.ops), 2):
+            op, arg = self.ops[pc], self.ops[pc + 1]
+            note = ""
+            if op in (LOAD_CONST, LOAD_ATTR, ADD_CONST, SUB_CONST):
+                note = repr(self.consts[arg])
+            elif op in (LOAD_LOCAL, STORE_LOCAL):
+                note = self.varnames[arg]
+            elif op in (LOAD_GLOBAL, STORE_GLOBAL) and globals_table is not None:
+                note = globals_table.names[arg]
+            elif op == BINARY:
+                note = BINARY_OPS[arg]
+            elif op == COMPARE:
+                note = COMPARE_OPS[arg]
+            elif op == UNARY:
+                note = UNARY_OPS[arg]
+            out.append(f"{self.lines[pc] or '':>5} {pc:>6} {OPNAMES[op]:<22} {arg:<6} {note}".rstrip())
+        return "\n".join(out)
+
+
+class VMFunction:
+    """A user function; callable from Python (e.g. as a builtin's argument) as well."""
+    __slots__ = ("code", "machine")
+
+    def __init__(self, code, machine):
+        self.code = code
+        self.machine = machine
+
+    def __call__(self, *args):
+        return self.machine.call(self, list(args), None)
+
+    def __repr__(self):
+        return f"<function {self.code.name}>"
+
+
+class GlobalTable:
+    """Slot-addressed global variables. `index` is used at compile time only."""
+
+    def __init__(self, initial=None):
+        self.names = []
+        self.values = []
+        self.index = {}
+        for name, value in (initial or {}).items():
+            self.values[self.slot(name)] = value
+
+    def slot(self, name):
+        slot = self.index.get(name)
+        if slot is None:
+            slot = self.index[name] = len(self.names)
+            self.names.append(name)
+            self.values.append(UNDEFINED)
+        return slot
+
+    def items(self):
+        return [(n, v) for n, v in zip(self.names, self.values) if v is not UNDEFINED]
+
+
+# ---------------- code generation ----------------
+class _Loop:
+    """Jump targets of the innermost loop; forward jumps are patched when the loop ends."""
+    __slots__ = ("continue_at", "continues", "breaks")
+
+    def __init__(self, continue_at):
+        self.continue_at = continue_at
+        self.continues = []
+        self.breaks = []
+
+
+class VMCodegen:
+    """Compiles one code unit (the top-level program or one function) to a VMCode."""
+
+    def __init__(self, table, builtins, machine, local_names=None, filename=None):
+        self.table = table
+        self.filename = filename
+        self.builtins = builtins
+        self.machine = machine
+        self.locals = {name: i for i, name in enumerate(local_names)} if local_names is not None else None
+        self.ops = []
+        self.lines = []
+        self.consts = []
+        self.const_index = {}
+        self.loops = []
+        self.line = None
+
+    def emit(self, op, arg=0):
+        self.ops += (op, arg)
+        self.lines += (self.line, self.line)
+        return len(self.ops) - 1           # index of the argument, for patching
+
+    def patch(self, at, target=None):
+        self.ops[at] = len(self.ops) if target is None else target
+
+    def const(self, value):
+        key = id(value) if isinstance(value, VMFunction) else (type(value), repr(value))
+        slot = self.const_index.get(key)
+        if slot is None:
+            slot = self.const_index[key] = len(self.consts)
+            self.consts.append(value)
+        return slot
+
+    def load(self, name):
+        if self.locals is not None and name in self.locals:
+            self.emit(LOAD_LOCAL, self.locals[name])
+        else:
+            self.emit(LOAD_GLOBAL, self.table.slot(name))
+
+    def store(self, name, line):
+        if name in self.builtins:
+            raise XppSyntaxError(f"cannot assign to builtin '{name}'", line)
+        if self.locals is not None:
+            self.emit(STORE_LOCAL, self.locals[name])
+        else:
+            self.emit(STORE_GLOBAL, self.table.slot(name))
+
+    def finish(self, name, argcount=0):
+        self.emit(LOAD_CONST, self.const(None))
+        self.emit(RETURN)
+        varnames = list(self.locals) if self.locals is not None else []
+        return VMCode(name, self.ops, self.consts, self.lines, argcount, varnames, self.filename)
+
+    # expressions
+    def expr(self, node):
+        self.line = node.line
+        self.dispatch[type(node)](self, node)
+
+    def expr_Const(self, node):
+        self.emit(LOAD_CONST, self.const(node.value))
+
+    def expr_Name(self, node):
+        self.load(node.id)
+
+    def expr_BinOp(self, node):
+        self.expr(node.left)
+        if node.op in ("+", "-") and type(node.right) is nodes.Const:
+            self.line = node.line
+            self.emit(ADD_CONST if node.op == "+" else SUB_CONST, self.const(node.right.value))
+            return
+        self.expr(node.right)
+        self.line = node.line
+        self.binary(node.op)
+
+    def jump_if(self, test, truth):
+        """Emit `test` and a jump taken when it is truthy/falsy; returns the arg to patch."""
+        if type(test) is nodes.BinOp and test.op == "<":
+            self.expr(test.left)
+            self.expr(test.right)
+            self.line = test.line
+            return self.emit(JUMP_IF_LESS if truth else JUMP_IF_NOT_LESS)
+        self.expr(test)
+        return self.emit(JUMP_IF_TRUE if truth else JUMP_IF_FALSE)
+
+    def binary(self, op):
+        if op == "+":
+            self.emit(ADD)
+        elif op == "-":
+            self.emit(SUB)
+        elif op == "<":
+            self.emit(LESS)
+        elif op in COMPARE_OPS:
+            self.emit(COMPARE, COMPARE_OPS.index(op))
+        else:
+            self.emit(BINARY, BINARY_OPS.index(op))
+
+    def expr_BoolOp(self, node):
+        self.expr(node.left)
+        jump = self.emit(JUMP_IF_FALSE_OR_POP if node.op == "and" else JUMP_IF_TRUE_OR_POP)
+        self.expr(node.right)
+        self.patch(jump)
+
+    def expr_UnaryOp(self, node):
+        self.expr(node.operand)
+        self.line = node.line
+        self.emit(UNARY, UNARY_OPS.index(node.op))
+
+    def expr_Call(self, node):
+        self.expr(node.func)
+        for arg in node.args:
+            self.expr(arg)
+        self.line = node.line
+        self.emit(CALL, len(node.args))
+
+    def expr_Attribute(self, node):
+        self.expr(node.value)
+        self.line = node.line
+        self.emit(LOAD_ATTR, self.const(node.attr))
+
+    def expr_Index(self, node):
+        self.expr(node.value)
+        self.expr(node.index)
+        self.line = node.line
+        self.emit(INDEX)
+
+    def expr_ListLit(self, node):
+        for item in node.items:
+            self.expr(item)
+        self.line = node.line
+        self.emit(BUILD_LIST, len(node.items))
+
+    # statements
+    def block(self, body):
+        dispatch = self.dispatch
+        for stmt in body:
+            self.line = stmt.line
+            dispatch[type(stmt)](self, stmt)
+
+    def stmt_Assign(self, node):
+        self.expr(node.value)
+        self.store(node.target, node.line)
+
+    def stmt_AugAssign(self, node):
+        self.expr_BinOp(nodes.BinOp(node.op, nodes.Name(node.target, node.line), node.value, node.line))
+        self.store(node.target, node.line)
+
+    def stmt_ExprStmt(self, node):
+        self.expr(node.expr)
+        self.emit(POP)
+
+    def stmt_If(self, node):
+        to_else = self.jump_if(node.test, False)
+        self.block(node.body)
+        if node.orelse:
+            to_end = self.emit(JUMP)
+            self.patch(to_else)
+            self.block(node.orelse)
+            self.patch(to_end)
+        else:
+            self.patch(to_else)
+
+    def stmt_While(self, node):
+        # test at the bottom: one conditional jump per iteration instead of two jumps
+        to_test = self.emit(JUMP)
+        top = len(self.ops)
+        loop = _Loop(None)
+        self.loops.append(loop)
+        self.block(node.body)
+        self.loops.pop()
+        self.patch(to_test)
+        for at in loop.continues:
+            self.patch(at)
+        self.patch(self.jump_if(node.test, True), top)
+        for at in loop.breaks:
+            self.patch(at)
+
+    def stmt_For(self, node):
+        # the iterator stays on the stack for the whole loop; FOR_ITER pops it when
+        # exhausted, `break` lands on a POP that discards it
+        self.expr(node.iter)
+        self.line = node.line
+        self.emit(GET_ITER)
+        top = len(self.ops)
+        exhausted = self.emit(FOR_ITER)
+        self.store(node.target, node.line)
+        loop = _Loop(top)
+        self.loops.append(loop)
+        self.block(node.body)
+        self.loops.pop()
+        self.line = node.line
+        self.emit(JUMP, top)
+        if loop.breaks:
+            for at in loop.breaks:
+                self.patch(at)
+            self.emit(POP)
+        self.patch(exhausted)
+
+    def stmt_FuncDef(self, node):
+        if node.name in self.builtins:
+            raise XppSyntaxError(f"cannot assign to builtin '{node.name}'", node.line)
+        for param in node.params:
+            if param in self.builtins:
+                raise XppSyntaxError(f"cannot assign to builtin '{param}'", node.line)
+        body = VMCodegen(self.table, self.builtins, self.machine, scope.FunctionScope(node).locals,
+                         self.filename)
+        body.line = node.line
+        body.block(node.body)
+        function = VMFunction(body.finish(node.name, len(node.params)), self.machine)
+        self.line = node.line
+        self.emit(LOAD_CONST, self.const(function))
+        self.store(node.name, node.line)
+
+    def stmt_Return(self, node):
+        if node.value is None:
+            self.emit(LOAD_CONST, self.const(None))
+        else:
+            self.expr(node.value)
+        self.line = node.line
+        self.emit(RETURN)
+
+    def stmt_Break(self, node):
+        self.loops[-1].breaks.append(self.emit(JUMP))
+
+    def stmt_Continue(self, node):
+        loop = self.loops[-1]
+        if loop.continue_at is None:
+            loop.continues.append(self.emit(JUMP))
+        else:
+            self.emit(JUMP, loop.continue_at)
+
+    dispatch = {}
+
+
+VMCodegen.dispatch = {
+    getattr(nodes, name[5:]): method
+    for name, method in vars(VMCodegen).items()
+    if name.startswith(("expr_", "stmt_"))
+}
+
+
+class VMCompiler(Compiler):
+    """Compiler whose back end emits VMCode bound to one machine's global table."""
+
+    def __init__(self, machine, builtins=(), cache_size=256):
+        super().__init__(builtins, cache_size)
+        self.machine = machine
+
+    def generate(self, tree, filename):
+        codegen = VMCodegen(self.machine.globals, self.builtins, self.machine, filename=filename)
+        codegen.block(tree.body)
+        return codegen.finish("<module>")
+
+
+# ---------------- execution ----------------
+class Machine:
+    """Runs VMCode against a GlobalTable."""
+
+    def __init__(self, builtins):
+        self.globals = GlobalTable(builtins)
+
+    def call(self, function, args, line, filename=None):
+        code = function.code
+        if len(args) != code.argcount:
+            raise XppRuntimeError(
+                f"{code.name}() takes {code.argcount} argument(s), {len(args)} given", line, filename)
+        return self.run(code, args + code.padding)
+
+    def run(self, code, fast):
+        ops = code.ops
+        consts = code.consts
+        values = self.globals.values
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+        try:
+            while True:
+                op = ops[pc]
+                arg = ops[pc + 1]
+                pc += 2
+                if op == LOAD_LOCAL:
+                    value = fast[arg]
+                    if value is UNDEFINED:
+                        raise XppRuntimeError(f"undefined variable '{code.varnames[arg]}'",
+                                              code.lines[pc - 2], code.filename)
+                    push(value)
+                elif op == LOAD_CONST:
+                    push(consts[arg])
+                elif op == STORE_LOCAL:
+                    fast[arg] = pop()
+                elif op == LOAD_GLOBAL:
+                    value = values[arg]
+                    if value is UNDEFINED:
+                        raise XppRuntimeError(f"undefined variable '{self.globals.names[arg]}'",
+                                              code.lines[pc - 2], code.filename)
+                    push(value)
+                elif op == STORE_GLOBAL:
+                    values[arg] = pop()
+                elif op == ADD:
+                    right = pop()
+                    stack[-1] = stack[-1] + right
+                elif op == ADD_CONST:
+                    stack[-1] = stack[-1] + consts[arg]
+                elif op == SUB:
+                    right = pop()
+                    stack[-1] = stack[-1] - right
+                elif op == SUB_CONST:
+                    stack[-1] = stack[-1] - consts[arg]
+                elif op == LESS:
+                    right = pop()
+                    stack[-1] = stack[-1] < right
+                elif op == JUMP_IF_LESS:
+                    right = pop()
+                    if pop() < right:
+                        pc = arg
+                elif op == JUMP_IF_NOT_LESS:
+                    right = pop()
+                    if not pop() < right:
+                        pc = arg
+                elif op == JUMP_IF_FALSE:
+                    if not pop():
+                        pc = arg
+                elif op == JUMP_IF_TRUE:
+                    if pop():
+                        pc = arg
+                elif op == JUMP:
+                    pc = arg
+                elif op == FOR_ITER:
+                    for value in stack[-1]:
+                        push(value)
+                        break
+                    else:
+                        pop()
+                        pc = arg
+                elif op == CALL:
+                    if arg:
+                        args = stack[-arg:]
+                        del stack[-arg:]
+                    else:
+                        args = []
+                    function = pop()
+                    if type(function) is VMFunction:
+                        push(self.call(function, args, code.lines[pc - 2], code.filename))
+                    else:
+                        push(function(*args))
+                elif op == RETURN:
+                    return pop()
+                elif op == POP:
+                    pop()
+                elif op == BINARY:
+                    right = pop()
+                    stack[-1] = BINARY_FUNCS[arg](stack[-1], right)
+                elif op == COMPARE:
+                    right = pop()
+                    stack[-1] = COMPARE_FUNCS[arg](stack[-1], right)
+                elif op == UNARY:
+                    stack[-1] = UNARY_FUNCS[arg](stack[-1])
+                elif op == JUMP_IF_FALSE_OR_POP:
+                    if stack[-1]:
+                        pop()
+                    else:
+                        pc = arg
+                elif op == JUMP_IF_TRUE_OR_POP:
+                    if stack[-1]:
+                        pc = arg
+                    else:
+                        pop()
+                elif op == GET_ITER:
+                    stack[-1] = iter(stack[-1])
+                elif op == INDEX:
+                    index = pop()
+                    stack[-1] = stack[-1][index]
+                elif op == LOAD_ATTR:
+                    stack[-1] = getattr(stack[-1], consts[arg])
+                elif op == BUILD_LIST:
+                    items = stack[-arg:] if arg else []
+                    del stack[len(stack) - arg:]
+                    push(items)
+                else:
+                    raise XppRuntimeError(f"bad opcode {op}", code.lines[pc - 2], code.filename)
+        except XppError:
+            raise
+        except RecursionError:
+            raise XppRuntimeError("maximum recursion depth exceeded", code.lines[pc - 2], code.filename) from None
+        except Exception as e:
+            raise XppRuntimeError(f"{type(e).__name__}: {e}", code.lines[pc - 2],
+                                  code.filename) from e